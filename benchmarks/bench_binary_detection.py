@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Serialization time on an asset-heavy archive, with and without sniffing.
+
+Builds a zip that mixes a few hundred small source files with large
+vendored binaries (images, fonts, shared objects) and times ``write_output``
+with the current prefix-sniffing reader against the previous behaviour of
+reading every file in full and waiting for UTF-8 decoding to fail.
+
+Usage:
+    python benchmarks/bench_binary_detection.py [--binaries 40] [--binary-mb 8]
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.archive import iter_zip_members  # noqa: E402
+from src.core.jsonl_writer import encode_record  # noqa: E402
+from src.core.records import binary_record, decode_text, file_record  # noqa: E402
+from src.extract_github import get_file_language, write_members, write_output  # noqa: E402
+
+BINARY_KINDS = [
+    ("assets/img{}.png", b"\x89PNG\r\n\x1a\n"),
+    ("vendor/lib{}.so", b"\x7fELF\x02\x01\x01"),
+    ("fonts/font{}.woff2", b"wOF2"),
+    ("data/blob{}", b"\xde\xad\xbe\xef"),
+]
+
+
+def build_corpus(zip_path, binaries, binary_mb, sources):
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        for index in range(sources):
+            zip_ref.writestr(f"repo-main/src/module{index}.py", f"value = {index}\n" * 50)
+        for index in range(binaries):
+            pattern, magic = BINARY_KINDS[index % len(BINARY_KINDS)]
+            body = magic + os.urandom(binary_mb * 1024 * 1024 - len(magic))
+            zip_ref.writestr(f"repo-main/{pattern.format(index)}", body)
+
+
+def read_everything(members, writer, incremental=None):
+    """The previous reader: full read, then decode-and-fail."""
+    for member in members:
+        data = member.read()
+        try:
+            content = decode_text(data)
+            record = file_record(member.name, member.path, get_file_language(member.path),
+                                 content)
+        except UnicodeDecodeError:
+            record = binary_record(member.name, member.path)
+        writer.write_bytes(encode_record(record))
+
+
+def time_run(zip_path, output_file, process):
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with zipfile.ZipFile(zip_path) as zip_ref:
+            write_output(iter_zip_members(zip_ref), output_file, process=process)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--binaries", type=int, default=40)
+    parser.add_argument("--binary-mb", type=int, default=8)
+    parser.add_argument("--sources", type=int, default=500)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_path = Path(temp_dir) / "assets.zip"
+        output_file = Path(temp_dir) / "assets_contents.jsonl"
+        build_corpus(zip_path, options.binaries, options.binary_mb, options.sources)
+
+        before = time_run(zip_path, output_file, read_everything)
+        after = time_run(zip_path, output_file, write_members)
+        print(f"archive: {options.binaries} x {options.binary_mb} MB binaries, "
+              f"{options.sources} source files")
+        print(f"full read + decode: {before:.2f}s")
+        print(f"prefix sniffing:    {after:.2f}s ({before / after:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
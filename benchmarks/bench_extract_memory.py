@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Peak memory of extract_repository's download path against archive size.
+
+Serves synthetic zip archives from a local HTTP server and downloads each one
+in a fresh child process, once the old way (``response.content`` wrapped in
+``BytesIO``) and once through ``spool_archive``. The child reports its peak
+RSS after extracting the archive; the interpreter and its imports account
+for a constant few tens of megabytes of that.
+
+Usage:
+    python benchmarks/bench_extract_memory.py [--sizes 16,64,256] [--threshold 32]
+"""
+
+import argparse
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tests.local_server import LocalServer, send_bytes  # noqa: E402
+
+
+def peak_rss_mb():
+    # ru_maxrss survives exec() on Linux, so it would include the parent's
+    # footprint at fork time; VmHWM is reset by exec
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def build_archive(size_mb):
+    """Build an incompressible zip of roughly ``size_mb`` megabytes."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zip_ref:
+        for index in range(size_mb):
+            zip_ref.writestr(f"repo-main/blob{index}.bin", os.urandom(1024 * 1024))
+    return buffer.getvalue()
+
+
+def run_child(mode, url, threshold_mb):
+    from src.core.extract_github import spool_archive
+    from src.services.http_session import get_client
+
+    response = get_client().get(url, stream=mode == "streaming")
+    if mode == "buffered":
+        source = io.BytesIO(response.content)
+    else:
+        source = spool_archive(response, url, threshold_mb * 1024 * 1024)
+    with tempfile.TemporaryDirectory() as output_dir:
+        with zipfile.ZipFile(source) as zip_ref:
+            zip_ref.extractall(output_dir)
+    source.close()
+    print(f"{peak_rss_mb():.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="16,64,256", help="Archive sizes in MB")
+    parser.add_argument("--threshold", type=int, default=32, help="Spool threshold in MB")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "URL"), help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.child:
+        run_child(options.child[0], options.child[1], options.threshold)
+        return
+
+    print(f"{'archive MB':>10} {'buffered RSS MB':>16} {'streaming RSS MB':>17}")
+    for size_mb in (int(size) for size in options.sizes.split(",")):
+        archive = build_archive(size_mb)
+        routes = {"/archive.zip": lambda handler, data=archive: send_bytes(handler, data)}
+        with LocalServer(routes) as server:
+            row = []
+            for mode in ("buffered", "streaming"):
+                result = subprocess.run(
+                    [sys.executable, __file__, "--threshold", str(options.threshold),
+                     "--child", mode, f"{server.url}/archive.zip"],
+                    capture_output=True, text=True, check=True, cwd=ROOT,
+                )
+                row.append(float(result.stdout.strip().splitlines()[-1]))
+        print(f"{size_mb:>10} {row[0]:>16.1f} {row[1]:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Throughput of language detection.
+
+Times ``detect_language`` on a realistic mix of paths against the previous
+implementation, which rebuilt its extension dict on every call, and
+separately times content sniffing for files without a known name.
+
+Usage:
+    python benchmarks/bench_languages.py [--paths 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.languages import detect_language  # noqa: E402
+
+NAMES = [
+    "main.py", "index.js", "App.tsx", "lib.rs", "server.go", "Main.java", "util.cpp",
+    "style.css", "README.md", "config.yml", "Makefile", "Dockerfile", "LICENSE",
+    "data.json", "notes.txt", "build.gradle", "schema.sql", "deploy", "photo.PNG",
+]
+PREFIXES = [b"#!/usr/bin/env python3\n", b"#!/bin/sh\n", b"# vim: ft=ruby\n", b"plain text\n"]
+
+
+def previous_language(file_path):
+    extensions = {
+        '.py': 'python', '.js': 'javascript', '.jsx': 'javascript', '.ts': 'typescript',
+        '.tsx': 'typescript', '.html': 'html', '.css': 'css', '.md': 'markdown',
+        '.json': 'json', '.yml': 'yaml', '.yaml': 'yaml', '.sh': 'bash', '.bash': 'bash',
+        '.sql': 'sql', '.txt': 'text',
+    }
+    ext = Path(file_path).suffix.lower()
+    return extensions.get(ext, 'text')
+
+
+def rate(function, items):
+    started = time.perf_counter()
+    for item in items:
+        function(*item)
+    return len(items) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    options = parser.parse_args()
+
+    rng = random.Random(0)
+    paths = [(f"pkg{rng.randrange(50)}/sub{rng.randrange(20)}/{rng.choice(NAMES)}",)
+             for _ in range(options.paths)]
+    sniffed = [(f"bin/tool{i}", rng.choice(PREFIXES)) for i in range(options.paths // 10)]
+
+    print(f"{'variant':>22} {'paths/s':>12}")
+    print(f"{'previous (dict/call)':>22} {rate(previous_language, paths):>12.0f}")
+    print(f"{'detect_language':>22} {rate(detect_language, paths):>12.0f}")
+    print(f"{'detect_language+sniff':>22} {rate(detect_language, sniffed):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Lookup latency of the sidecar output index.
+
+Writes a synthetic JSONL output, builds its index and compares fetching
+random files through ``OutputReader`` with scanning the output line by
+line, which is what consumers had to do before.
+
+Usage:
+    python benchmarks/bench_output_index.py [--files 200000] [--file-size 4096]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.jsonl_writer import get_serializer  # noqa: E402
+from src.core.output_index import OutputReader, build_index  # noqa: E402
+from src.core.records import file_record  # noqa: E402
+
+
+def build_output(output_file, files, file_size):
+    encode = get_serializer("auto")
+    body = "x = 1\n" * (file_size // 6)
+    with open(output_file, "wb", buffering=1024 * 1024) as f:
+        for index in range(files):
+            path = f"pkg{index % 100}/module{index}.py"
+            f.write(encode(file_record(f"module{index}.py", path, "python", body)))
+
+
+def scan(output_file, path):
+    with open(output_file, "rb") as f:
+        for line in f:
+            record = json.loads(line)
+            if record["metadata"]["path"] == path:
+                return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=200_000)
+    parser.add_argument("--file-size", type=int, default=4096)
+    parser.add_argument("--lookups", type=int, default=1000)
+    options = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_file = Path(temp_dir) / "corpus_contents.jsonl"
+        build_output(output_file, options.files, options.file_size)
+        size_mb = output_file.stat().st_size / 1024 / 1024
+
+        started = time.perf_counter()
+        build_index(output_file)
+        print(f"output {size_mb:.0f} MB, index built in {time.perf_counter() - started:.2f}s")
+
+        paths = [f"pkg{i % 100}/module{i}.py"
+                 for i in (rng.randrange(options.files) for _ in range(options.lookups))]
+        started = time.perf_counter()
+        with OutputReader(output_file) as reader:
+            for path in paths:
+                reader.content(path)
+        indexed = (time.perf_counter() - started) / len(paths)
+        print(f"indexed lookup: {indexed * 1000:.3f} ms")
+
+        started = time.perf_counter()
+        for path in paths[:3]:
+            scan(output_file, path)
+        scanned = (time.perf_counter() - started) / 3
+        print(f"linear scan:    {scanned * 1000:.1f} ms ({scanned / indexed:.0f}x slower)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Record throughput of serial vs. process-pool serialization.
+
+Builds a synthetic zip of small text files and times ``write_output`` with
+the serial ``write_members`` and with ``write_members_parallel`` at
+increasing worker counts.
+
+Usage:
+    python benchmarks/bench_parallel.py [--files 100000] [--file-size 4096]
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import zipfile
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.archive import iter_zip_members  # noqa: E402
+from src.extract_github import write_members, write_members_parallel, write_output  # noqa: E402
+
+
+def build_corpus(zip_path, files, file_size):
+    rng = random.Random(0)
+    alphabet = string.ascii_letters + string.digits + " \n(){}=:;"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+        for index in range(files):
+            body = "".join(rng.choices(alphabet, k=file_size))
+            zip_ref.writestr(f"repo-main/pkg{index % 100}/module{index}.py", body)
+
+
+def time_run(zip_path, output_file, process):
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with zipfile.ZipFile(zip_path) as zip_ref:
+            write_output(iter_zip_members(zip_ref), output_file, process=process)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--file-size", type=int, default=4096)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_path = Path(temp_dir) / "corpus.zip"
+        output_file = Path(temp_dir) / "corpus_contents.jsonl"
+        build_corpus(zip_path, options.files, options.file_size)
+
+        serial = time_run(zip_path, output_file, write_members)
+        print(f"{'workers':>8} {'seconds':>8} {'files/s':>10} {'speedup':>8}")
+        print(f"{'serial':>8} {serial:>8.2f} {options.files / serial:>10.0f} {1:>8.2f}")
+
+        workers = 2
+        while workers <= options.max_workers:
+            process = partial(write_members_parallel, zip_path=zip_path, workers=workers)
+            elapsed = time_run(zip_path, output_file, process)
+            print(f"{workers:>8} {elapsed:>8.2f} {options.files / elapsed:>10.0f} "
+                  f"{serial / elapsed:>8.2f}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
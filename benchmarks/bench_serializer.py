@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Record throughput of the available JSONL serializers.
+
+Builds a synthetic zip of small text files and times ``write_output`` once
+per installed serializer, plus the raw encoding cost of the same records
+without any archive reading or writing.
+
+Usage:
+    python benchmarks/bench_serializer.py [--files 100000] [--file-size 512]
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.archive import iter_zip_members  # noqa: E402
+from src.core.jsonl_writer import available_serializers, get_serializer  # noqa: E402
+from src.core.records import file_record  # noqa: E402
+from src.extract_github import write_output  # noqa: E402
+
+
+def build_corpus(zip_path, files, file_size):
+    rng = random.Random(0)
+    alphabet = string.ascii_letters + string.digits + " \n(){}=:;\"é"
+    bodies = ["".join(rng.choices(alphabet, k=file_size)) for _ in range(256)]
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zip_ref:
+        for index in range(files):
+            zip_ref.writestr(f"repo-main/pkg{index % 100}/module{index}.py",
+                             bodies[index % len(bodies)])
+    return bodies
+
+
+def time_run(zip_path, output_file, serializer):
+    started = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        with zipfile.ZipFile(zip_path) as zip_ref:
+            write_output(iter_zip_members(zip_ref), output_file, serializer=serializer)
+    return time.perf_counter() - started
+
+
+def time_encode(records, serializer):
+    encode = get_serializer(serializer)
+    started = time.perf_counter()
+    for record in records:
+        encode(record)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--file-size", type=int, default=512)
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        zip_path = Path(temp_dir) / "corpus.zip"
+        output_file = Path(temp_dir) / "corpus_contents.jsonl"
+        bodies = build_corpus(zip_path, options.files, options.file_size)
+        records = [file_record(f"module{i}.py", f"pkg{i % 100}/module{i}.py", "python",
+                               bodies[i % len(bodies)]) for i in range(options.files)]
+
+        baseline = None
+        print(f"{'serializer':>10} {'encode rec/s':>13} {'end-to-end rec/s':>17} {'speedup':>8}")
+        for name in available_serializers():
+            encoded = options.files / time_encode(records, name)
+            elapsed = time_run(zip_path, output_file, name)
+            baseline = baseline or elapsed
+            print(f"{name:>10} {encoded:>13.0f} {options.files / elapsed:>17.0f} "
+                  f"{baseline / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
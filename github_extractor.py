@@ -6,33 +6,232 @@ A tool to extract and analyze GitHub repositories.
 
 import sys
 import os
+import argparse
+import functools
+import signal
 
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import the GUI application
-from src.ui.github_extractor_gui import main as run_gui
 # Import core functionality for CLI usage
 from src.core.extract_github import extract_repository
+from src.core.batch import DEFAULT_WORKERS, extract_batch, read_repo_urls
+from src.core.archive_cache import DEFAULT_CACHE_SIZE, ArchiveCache
+from src.core.cancellation import CancellationToken
+from src.core.download import StagingArea
+from src.core.filters import DEFAULT_EXCLUDES, FilterRules
+from src.core.progress import ConsoleProgress, ProgressReporter
+from src.extract_github import extract_repo
+
+# Exit status after a cancellation, as for a process stopped by SIGINT
+EXIT_CANCELLED = 130
 
 def print_usage():
     """Print usage information for CLI mode."""
     print("GitHub Repository Extractor")
     print("Usage:")
-    print("  GUI Mode: github_extractor.py")
-    print("  CLI Mode: github_extractor.py <repository_url> [output_directory]")
+    print("  GUI Mode:   github_extractor.py")
+    print("  CLI Mode:   github_extractor.py <repository_url> [output_directory]")
+    print("  Batch Mode: github_extractor.py --batch <file|-> [--workers N] [output_directory]")
+    print("  Pipe Mode:  github_extractor.py --stdout <repository_url> | consumer")
+    print("Options:")
+    print("  --cache-dir DIR   Reuse unchanged archives cached in DIR")
+    print("  --cache-size MB   Evict least recently used archives above this size")
+    print("  --staging-dir DIR Keep interrupted downloads in DIR and resume them")
+    print("  --include GLOB    Only extract matching files (repeatable)")
+    print("  --exclude GLOB    Skip matching files, .gitignore syntax (repeatable)")
+    print("                    Directory extraction keeps every other file; --stdout")
+    print("                    also always skips " + ", ".join(DEFAULT_EXCLUDES))
+    print("  --max-file-size KB Skip files larger than this")
+    print("  --skip-linguist   Skip files marked linguist-vendored/-generated in .gitattributes")
+    print("  --stdout          Stream JSONL records to stdout, progress to stderr")
 
-if __name__ == "__main__":
-    if len(sys.argv) == 1:
+def build_parser():
+    """Build the command-line argument parser."""
+    parser = argparse.ArgumentParser(prog="github_extractor.py", add_help=False)
+    parser.add_argument('-h', '--help', action='store_true')
+    parser.add_argument('--batch', metavar='FILE',
+                        help="File with one repository URL per line ('-' for stdin)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Number of repositories to extract concurrently")
+    parser.add_argument('--cache-dir', metavar='DIR',
+                        help="Directory for the archive cache (disabled if omitted)")
+    parser.add_argument('--cache-size', type=int, metavar='MB',
+                        default=DEFAULT_CACHE_SIZE // (1024 * 1024),
+                        help="Maximum size of the archive cache in megabytes")
+    parser.add_argument('--staging-dir', metavar='DIR',
+                        help="Directory for resumable partial downloads")
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                        help="Only extract files matching this pattern")
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help="Skip files matching this pattern")
+    parser.add_argument('--max-file-size', type=int, metavar='KB',
+                        help="Skip files larger than this many kilobytes")
+    parser.add_argument('--skip-linguist', action='store_true',
+                        help="Skip files marked linguist-vendored or linguist-generated")
+    parser.add_argument('--stdout', action='store_true',
+                        help="Write JSONL records to stdout instead of extracting files")
+    parser.add_argument('args', nargs='*')
+    return parser
+
+def build_filters(options):
+    """
+    Build the filter rules asked for on the command line.
+
+    Directory extraction keeps every file unless told otherwise, while the
+    JSONL output of ``--stdout`` always skips ``DEFAULT_EXCLUDES``; a flag
+    only adds to those defaults, it never changes them.
+
+    Args:
+        options (argparse.Namespace): Parsed arguments
+
+    Returns:
+        FilterRules: The rules, or None if no filter flag was given
+    """
+    if not (options.include or options.exclude or options.max_file_size is not None
+            or options.skip_linguist):
+        return None
+    defaults = DEFAULT_EXCLUDES if options.stdout else ()
+    return FilterRules(
+        include=tuple(options.include),
+        exclude=defaults + tuple(options.exclude),
+        max_file_size=(options.max_file_size * 1024
+                       if options.max_file_size is not None else None),
+        exclude_vendored=options.skip_linguist,
+        exclude_generated=options.skip_linguist,
+    )
+
+def run_batch(batch_file, output_dir, workers, extract=extract_repository, cancel_token=None):
+    """
+    Extract every repository listed in a batch file.
+
+    Args:
+        batch_file (str): Path to the URL list, or '-' to read from stdin
+        output_dir (str): Directory to save the extracted repositories
+        workers (int): Number of concurrent workers
+        extract (Callable[[str, str], bool]): Extraction function per repository
+        cancel_token (CancellationToken): Skips the remaining repositories
+            once cancelled
+
+    Returns:
+        int: Process exit code, non-zero if any repository failed
+    """
+    if batch_file == '-':
+        repo_urls = read_repo_urls(sys.stdin)
+    else:
+        with open(batch_file, 'r', encoding='utf-8') as f:
+            repo_urls = read_repo_urls(f)
+
+    def report(result):
+        status = "✅" if result.success else "❌"
+        line = f"{status} {result.repo_url} ({result.elapsed:.1f}s)"
+        if result.error:
+            line += f": {result.error}"
+        print(line, flush=True)
+
+    results = extract_batch(repo_urls, output_dir, workers=workers,
+                            extract=extract, on_result=report, cancel_token=cancel_token)
+    failed = [result for result in results if not result.success]
+    print(f"\nExtracted {len(results) - len(failed)}/{len(results)} repositories")
+    for result in failed:
+        print(f"  failed: {result.repo_url}")
+    return 1 if failed else 0
+
+def cancel_on_sigint(cancel_token):
+    """
+    Turn Ctrl-C into a cooperative cancellation.
+
+    The first SIGINT cancels the token, so running extractions stop at the
+    next chunk or file and clean up their partial output; a second one
+    interrupts immediately.
+
+    Args:
+        cancel_token (CancellationToken): Token shared by the extractions
+    """
+    def handle(signum, frame):
+        if cancel_token.cancelled:
+            raise KeyboardInterrupt
+        cancel_token.cancel()
+        print("\nCancelling... press Ctrl-C again to abort immediately", file=sys.stderr)
+
+    signal.signal(signal.SIGINT, handle)
+
+def run_stream(repo_url, stream=None, **extract_options):
+    """
+    Stream a repository's JSONL records to stdout.
+
+    Records are written while the tar.gz archive is still downloading, and
+    all progress output goes to stderr, so the records can be piped straight
+    into another process.
+
+    Args:
+        repo_url (str): URL of the GitHub repository
+        stream (BinaryIO): Destination, ``sys.stdout.buffer`` by default
+        **extract_options: Cache and filter options for ``extract_repo``
+
+    Returns:
+        int: Process exit code
+    """
+    stream = stream or sys.stdout.buffer
+    ok = extract_repo(repo_url, engine="tar", output=stream, **extract_options)
+    try:
+        stream.flush()
+    except BrokenPipeError:
+        # The consumer exited early; keep the interpreter from failing
+        # again when it flushes stdout at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        ok = False
+    return 0 if ok else 1
+
+def main(argv=None):
+    """Command-line entry point."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
         # No arguments - launch the GUI
+        from src.ui.github_extractor_gui import main as run_gui
         run_gui()
-    elif len(sys.argv) >= 2:
-        # CLI mode
-        if sys.argv[1] in ['-h', '--help']:
-            print_usage()
-        else:
-            repo_url = sys.argv[1]
-            output_dir = sys.argv[2] if len(sys.argv) > 2 else './output'
-            extract_repository(repo_url, output_dir)
+        return 0
+
+    options = build_parser().parse_args(argv)
+    if options.help:
+        print_usage()
+        return 0
+
+    extract_options = {}
+    if options.cache_dir:
+        extract_options['cache'] = ArchiveCache(
+            options.cache_dir, max_bytes=options.cache_size * 1024 * 1024
+        )
+    if options.staging_dir:
+        extract_options['staging'] = StagingArea(options.staging_dir)
+    filters = build_filters(options)
+    if filters is not None:
+        extract_options['filters'] = filters
+    if options.stdout and (options.batch or len(options.args) != 1):
+        print("--stdout streams exactly one repository", file=sys.stderr)
+        return 1
+    if not options.batch and not options.args:
+        print_usage()
+        return 1
+
+    cancel_token = CancellationToken()
+    extract_options['cancel_token'] = cancel_token
+    cancel_on_sigint(cancel_token)
+
+    if options.stdout:
+        status = run_stream(options.args[0], **extract_options)
+    elif options.batch:
+        extract = functools.partial(extract_repository, **extract_options)
+        output_dir = options.args[0] if options.args else './output'
+        status = run_batch(options.batch, output_dir, options.workers, extract, cancel_token)
     else:
-        print_usage()
\ No newline at end of file
+        repo_url = options.args[0]
+        output_dir = options.args[1] if len(options.args) > 1 else './output'
+        progress = ProgressReporter(ConsoleProgress(sys.stderr))
+        status = 0 if extract_repository(repo_url, output_dir, progress=progress,
+                                         **extract_options) else 1
+    return EXIT_CANCELLED if cancel_token.cancelled else status
+
+if __name__ == "__main__":
+    sys.exit(main())
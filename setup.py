@@ -8,6 +8,14 @@ setup(
         "requests>=2.25.0",
         "PyQt6>=6.0.0",
     ],
+    extras_require={
+        # Faster JSONL serializers
+        "fast": ["orjson>=3.6", "msgspec>=0.16"],
+        # zstd output and Parquet/Arrow exports
+        "formats": ["zstandard>=0.18", "pyarrow>=10.0"],
+        # extract_repository_async
+        "async": ["aiohttp>=3.8"],
+    },
     entry_points={
         "console_scripts": [
             "github-extractor=github_extractor:main",
@@ -0,0 +1,113 @@
+"""
+Member iteration over downloaded repository archives.
+
+GitHub archives wrap the whole tree in a single top-level directory
+(``<repo>-<ref>/``). The helpers here strip that prefix and expose each file
+as an ``ArchiveMember`` that can be read straight from the archive, without
+extracting anything to disk first.
+"""
+
+import posixpath
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterator, Optional
+
+
+@dataclass
+class ArchiveMember:
+    """A single regular file inside a repository archive."""
+
+    path: str
+    size: int
+    opener: Callable[[], BinaryIO]
+    # CRC-32 from the archive metadata, when the format stores one (zip)
+    crc32: Optional[int] = None
+    # Name of the entry inside the archive, including the root directory
+    archive_name: Optional[str] = None
+
+    @property
+    def name(self):
+        """str: Base name of the file."""
+        return posixpath.basename(self.path)
+
+    def open(self):
+        """Open the member for reading as a binary stream."""
+        return self.opener()
+
+    def read(self):
+        """Read the whole member into memory.
+
+        Returns:
+            bytes: Raw content of the file
+        """
+        with self.open() as handle:
+            return handle.read()
+
+
+def strip_archive_root(member_name):
+    """
+    Strip the top-level ``<repo>-<ref>/`` directory from an archive path.
+
+    Args:
+        member_name (str): Path of the member as stored in the archive
+
+    Returns:
+        str: Path relative to the repository root, or None for entries that
+        live outside the root directory
+    """
+    if member_name.startswith("./"):
+        member_name = member_name[2:]
+    parts = member_name.split("/", 1)
+    if len(parts) < 2 or not parts[1]:
+        return None
+    return parts[1]
+
+
+def iter_zip_members(zip_ref) -> Iterator[ArchiveMember]:
+    """
+    Yield the regular files of an open zip archive in archive order.
+
+    Args:
+        zip_ref (zipfile.ZipFile): Archive opened for reading
+
+    Yields:
+        ArchiveMember: One entry per file, readable directly from the zip
+    """
+    for info in zip_ref.infolist():
+        if info.is_dir():
+            continue
+        relative_path = strip_archive_root(info.filename)
+        if relative_path is None:
+            continue
+        yield ArchiveMember(
+            path=relative_path,
+            size=info.file_size,
+            opener=lambda info=info: zip_ref.open(info, "r"),
+            crc32=info.CRC,
+            archive_name=info.filename,
+        )
+
+
+def iter_tar_members(tar_ref) -> Iterator[ArchiveMember]:
+    """
+    Yield the regular files of a tar archive in archive order.
+
+    Works with archives opened in streaming mode (``"r|gz"``), where each
+    member has to be read before advancing to the next one.
+
+    Args:
+        tar_ref (tarfile.TarFile): Archive opened for reading
+
+    Yields:
+        ArchiveMember: One entry per regular file
+    """
+    for info in tar_ref:
+        if not info.isfile():
+            continue
+        relative_path = strip_archive_root(info.name)
+        if relative_path is None:
+            continue
+        yield ArchiveMember(
+            path=relative_path,
+            size=info.size,
+            opener=lambda info=info: tar_ref.extractfile(info),
+        )
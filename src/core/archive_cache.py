@@ -0,0 +1,280 @@
+"""
+Local cache of downloaded repository archives.
+
+Archives are stored once per commit under ``objects/`` and referenced from
+an index keyed by download URL. Each index entry remembers the ``ETag`` the
+archive was served with, so the next download can be sent as a conditional
+request and an unchanged repository costs a single ``304 Not Modified``.
+The cache is kept under a size cap by evicting the least recently used
+archives.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+DEFAULT_CACHE_SIZE = 2 * 1024 ** 3
+
+# codeload.github.com serves archives with the commit SHA as a strong ETag
+_COMMIT_ETAG = re.compile(r'^(?:W/)?"?(?P<sha>[0-9a-f]{40})"?$')
+
+
+def commit_from_etag(etag):
+    """
+    Extract the commit SHA from a codeload ``ETag``.
+
+    Args:
+        etag (str): ``ETag`` header value
+
+    Returns:
+        str: Commit SHA, or None if the tag is not one
+    """
+    match = _COMMIT_ETAG.match(etag or "")
+    return match.group("sha") if match else None
+
+
+@dataclass
+class CacheEntry:
+    """Index record for one cached download URL."""
+
+    etag: str
+    commit: str
+    file: str
+    size: int
+    last_used: float
+
+
+class CacheWriter:
+    """Writes a downloaded archive into the cache.
+
+    Use as a context manager: the archive is added to the cache when the
+    block exits cleanly and discarded if it raises.
+    """
+
+    def __init__(self, cache, key, etag, archive_ext):
+        self.cache = cache
+        self.key = key
+        self.etag = etag
+        self.archive_ext = archive_ext
+        self.path = None
+        self._hash = hashlib.sha256()
+        self._size = 0
+        fd, self._temp_path = tempfile.mkstemp(dir=cache.objects_dir, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk):
+        """Append a chunk of the archive."""
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self._size += len(chunk)
+
+    def tee(self, chunks):
+        """
+        Write chunks to the cache while passing them through.
+
+        Args:
+            chunks (Iterable[bytes]): Downloaded chunks
+
+        Yields:
+            bytes: The same chunks, unchanged
+        """
+        for chunk in chunks:
+            if chunk:
+                self.write(chunk)
+            yield chunk
+
+    def commit(self):
+        """
+        Add the written archive to the cache.
+
+        Returns:
+            Path: Location of the cached archive
+        """
+        self._file.close()
+        commit = commit_from_etag(self.etag) or self._hash.hexdigest()
+        self.path = self.cache._store(
+            self.key, self.etag, commit, self.archive_ext, self._temp_path, self._size
+        )
+        return self.path
+
+    def discard(self):
+        """Drop the partially written archive."""
+        self._file.close()
+        try:
+            os.unlink(self._temp_path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+
+class ArchiveCache:
+    """Content-addressed archive store with LRU eviction."""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_SIZE, clock=time.time):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): Directory holding the index and archives
+            max_bytes (int): Total archive size to keep before evicting
+            clock (Callable[[], float]): Returns the current Unix time
+        """
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self):
+        if not self.index_file.exists():
+            return {}
+        try:
+            raw = json.loads(self.index_file.read_text(encoding="utf-8"))
+            return {key: CacheEntry(**value) for key, value in raw.items()}
+        except (OSError, ValueError, TypeError) as e:
+            logging.warning(f"Ignoring unreadable archive cache index {self.index_file}: {e}")
+            return {}
+
+    def _save_index(self):
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({key: asdict(entry) for key, entry in self._index.items()}, f)
+        os.replace(temp_path, self.index_file)
+
+    def lookup(self, key):
+        """
+        Find the cached archive for a download URL.
+
+        Args:
+            key (str): Download URL
+
+        Returns:
+            CacheEntry: Entry whose archive is present on disk, or None
+        """
+        with self._lock:
+            entry = self._index.get(key)
+            if entry and not (self.objects_dir / entry.file).exists():
+                del self._index[key]
+                entry = None
+            return entry
+
+    def conditional_headers(self, key):
+        """
+        Request headers that turn a download into a conditional request.
+
+        Args:
+            key (str): Download URL
+
+        Returns:
+            dict: ``If-None-Match`` header, or empty if nothing is cached
+        """
+        entry = self.lookup(key)
+        return {"If-None-Match": entry.etag} if entry else {}
+
+    def open_cached(self, key):
+        """
+        Mark a cached archive as used and return its location.
+
+        Args:
+            key (str): Download URL that was answered with 304
+
+        Returns:
+            Path: Location of the cached archive
+
+        Raises:
+            KeyError: If nothing is cached for ``key``
+        """
+        with self._lock:
+            entry = self._index[key]
+            entry.last_used = self._clock()
+            self._save_index()
+            return self.objects_dir / entry.file
+
+    def writer(self, key, etag, archive_ext):
+        """
+        Start caching a freshly downloaded archive.
+
+        Args:
+            key (str): Download URL
+            etag (str): ``ETag`` the archive was served with
+            archive_ext (str): ``"zip"`` or ``"tar.gz"``
+
+        Returns:
+            CacheWriter: Writer to stream the archive into
+        """
+        return CacheWriter(self, key, etag, archive_ext)
+
+    def store_file(self, key, etag, archive_ext, path):
+        """
+        Move an already downloaded archive into the cache.
+
+        Args:
+            key (str): Download URL
+            etag (str): ``ETag`` the archive was served with
+            archive_ext (str): ``"zip"`` or ``"tar.gz"``
+            path (Path): Archive to move into the cache
+
+        Returns:
+            Path: Location of the cached archive
+        """
+        commit = commit_from_etag(etag)
+        if commit is None:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            commit = digest.hexdigest()
+        return self._store(key, etag, commit, archive_ext, path, os.path.getsize(path))
+
+    def _store(self, key, etag, commit, archive_ext, temp_path, size):
+        file_name = f"{commit}.{archive_ext}"
+        with self._lock:
+            shutil.move(temp_path, self.objects_dir / file_name)
+            self._index[key] = CacheEntry(etag, commit, file_name, size, self._clock())
+            self._evict(keep=file_name)
+            self._save_index()
+        return self.objects_dir / file_name
+
+    def total_size(self):
+        """int: Combined size of all cached archives in bytes."""
+        with self._lock:
+            return sum({entry.file: entry.size for entry in self._index.values()}.values())
+
+    def _evict(self, keep):
+        files = {}
+        for entry in self._index.values():
+            previous = files.get(entry.file)
+            files[entry.file] = (max(entry.last_used, previous[0]) if previous else entry.last_used,
+                                 entry.size)
+        total = sum(size for _, size in files.values())
+        for file_name, (_, size) in sorted(files.items(), key=lambda item: item[1][0]):
+            if total <= self.max_bytes:
+                break
+            if file_name == keep:
+                continue
+            for key in [k for k, e in self._index.items() if e.file == file_name]:
+                del self._index[key]
+            try:
+                os.unlink(self.objects_dir / file_name)
+            except FileNotFoundError:
+                pass
+            total -= size
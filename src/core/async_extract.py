@@ -0,0 +1,317 @@
+"""
+Asyncio extraction core for large fleets of repositories.
+
+``extract_repository_async`` mirrors ``extract_repository`` but downloads
+with aiohttp, so one event loop can keep hundreds of archives in flight
+without an OS thread per repository. Only network I/O runs on the loop:
+unpacking the downloaded archive (decompression and writing files) is handed
+to an executor. Extractions sharing an ``AsyncExtractor`` also share its
+connection cap and its global bandwidth budget.
+
+Archive caching and resumable staging are not supported here; a dropped
+connection fails the repository instead of being resumed.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from urllib.parse import urlparse
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # pragma: no cover - optional dependency
+
+from src.core.batch import BatchResult
+from src.core.cancellation import CancellationToken, Cancelled
+from src.core.extract_github import (
+    DEFAULT_SPOOL_THRESHOLD, DOWNLOAD_CHUNK_SIZE, extract_members, remove_extracted
+)
+from src.services.github_archive import normalize_repo_url
+from src.services.http_session import (
+    RetryPolicy, auth_headers, get_rate_limiter, github_token
+)
+
+DEFAULT_MAX_CONNECTIONS = 100
+# Seconds allowed for connecting and between two reads; time spent queued
+# for a free connection does not count
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 60
+
+
+class BandwidthLimiter:
+    """Token bucket capping the combined download rate of one event loop."""
+
+    def __init__(self, bytes_per_second, burst=DOWNLOAD_CHUNK_SIZE,
+                 clock=time.monotonic, sleep=asyncio.sleep):
+        """
+        Initialize the limiter.
+
+        Args:
+            bytes_per_second (float): Sustained rate shared by all downloads
+            burst (int): Bytes that may be received at once after an idle
+                period
+            clock (Callable[[], float]): Monotonic time in seconds
+            sleep (Callable[[float], Awaitable]): Used to wait for budget
+        """
+        if bytes_per_second <= 0:
+            raise ValueError("bytes_per_second must be positive")
+        self.bytes_per_second = bytes_per_second
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        # Time at which the bucket will be full again
+        self._full_at = 0.0
+
+    async def consume(self, size):
+        """
+        Account for ``size`` received bytes, waiting while over budget.
+
+        Args:
+            size (int): Number of bytes received
+        """
+        now = self._clock()
+        self._full_at = max(self._full_at, now) + size / self.bytes_per_second
+        delay = self._full_at - now - self.burst / self.bytes_per_second
+        if delay > 0:
+            await self._sleep(delay)
+
+
+class AsyncExtractor:
+    """Shared HTTP session, connection cap, bandwidth budget and executor."""
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS, max_bytes_per_second=None,
+                 executor=None, retry=None, memory_threshold=DEFAULT_SPOOL_THRESHOLD,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 rate_limiter=None, token=None):
+        """
+        Initialize the extractor; use it as an ``async with`` context.
+
+        Args:
+            max_connections (int): Most connections open at once, across
+                all repositories; further downloads wait for a free one
+            max_bytes_per_second (float): Global download rate cap, or None
+                for no limit
+            executor (concurrent.futures.Executor): Runs archive unpacking,
+                defaults to the event loop's default thread pool
+            retry (RetryPolicy): Retry settings for server errors and
+                failed connections, defaults to ``RetryPolicy()``
+            memory_threshold (int): Largest archive buffered in memory per
+                download; bigger ones are spooled to a temporary file
+            connect_timeout (float): Seconds allowed to open a connection
+            read_timeout (float): Seconds allowed between two reads
+            rate_limiter (RateLimiter): Paces requests, defaults to the
+                limiter shared with the synchronous client
+            token (str): Auth token sent to GitHub, defaults to the one in
+                ``GITHUB_TOKEN`` or ``GH_TOKEN``
+        """
+        if aiohttp is None:
+            raise ValueError("Async extraction needs the aiohttp package")
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1")
+        self.max_connections = max_connections
+        self.bandwidth = (BandwidthLimiter(max_bytes_per_second)
+                          if max_bytes_per_second else None)
+        self.executor = executor
+        self.retry = retry or RetryPolicy()
+        self.memory_threshold = memory_threshold
+        self.timeout = aiohttp.ClientTimeout(total=None, sock_connect=connect_timeout,
+                                             sock_read=read_timeout)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.token = token or github_token()
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                         limit_per_host=self.max_connections)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close the HTTP session and its pooled connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _get(self, url):
+        host = urlparse(url).hostname
+        for attempt in range(self.retry.max_retries + 1):
+            last_attempt = attempt == self.retry.max_retries
+            delay = self.rate_limiter.reserve(host)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                response = await self.session.get(url, headers=auth_headers(url, self.token))
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    raise
+                logging.warning(f"Request to {url} failed ({e}), retrying")
+                await asyncio.sleep(self.retry.backoff(attempt))
+                continue
+            self.rate_limiter.update(response.status, response.headers,
+                                     response.url.host or host)
+            delay = None
+            if not last_attempt:
+                delay = self.retry.retry_delay(response.status, response.headers, attempt)
+            if delay is None:
+                return response
+            response.release()
+            logging.warning(f"Request to {url} returned {response.status}, "
+                            f"retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _download(self, response, on_chunk):
+        spool = tempfile.SpooledTemporaryFile(max_size=self.memory_threshold)
+        try:
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                spool.write(chunk)
+                on_chunk(len(chunk))
+                if self.bandwidth is not None:
+                    await self.bandwidth.consume(len(chunk))
+            spool.seek(0)
+        except BaseException:
+            spool.close()
+            raise
+        return spool
+
+    async def _unpack(self, archive, output_dir, filters, progress, cancel_token, extracted):
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(self.executor, extract_members, archive, output_dir,
+                                   filters, progress, cancel_token, extracted)
+        try:
+            await asyncio.shield(job)
+        except asyncio.CancelledError:
+            # The worker keeps running until it sees the token; wait for it
+            # so its files can be removed
+            cancel_token.cancel()
+            await asyncio.wait([job])
+            raise
+
+    async def extract(self, repo_url, output_dir='./output', filters=None, progress=None,
+                      cancel_token=None):
+        """
+        Extract a repository, see ``extract_repository_async``.
+
+        Returns:
+            bool: True if extraction was successful, False otherwise
+        """
+        if self.session is None:
+            raise RuntimeError("AsyncExtractor must be used as an async context manager")
+        logging.info(f"Extracting repository: {repo_url}")
+        # A task of its own, so cancelling this extraction leaves others
+        # sharing ``cancel_token`` running
+        cancel_token = cancel_token.child() if cancel_token else CancellationToken()
+
+        def on_chunk(size):
+            if progress is not None:
+                progress.add_bytes(size)
+            cancel_token.raise_if_cancelled()
+
+        archive = None
+        extracted = []
+        success = False
+        try:
+            download_url = f"{normalize_repo_url(repo_url)}/archive/HEAD.zip"
+            response = await self._get(download_url)
+            async with response:
+                if response.status != 200:
+                    error_message = f"Failed to download repository: {response.status}"
+                    if response.status == 404:
+                        error_message += " (Repository not found or is private)"
+                    logging.error(error_message)
+                    return False
+                logging.info(f"Requested archive: {response.url}")
+                if progress is not None:
+                    progress.start_download(response.content_length)
+                archive = await self._download(response, on_chunk)
+
+            os.makedirs(output_dir, exist_ok=True)
+            if progress is not None:
+                progress.start_processing()
+            await self._unpack(archive, output_dir, filters, progress, cancel_token, extracted)
+
+            logging.info(f"Repository extracted to: {output_dir}")
+            success = True
+            return True
+
+        except (Cancelled, asyncio.CancelledError) as e:
+            logging.warning("Extraction cancelled, removing partial output")
+            cancel_token.cancel()
+            remove_extracted(extracted, output_dir)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return False
+        except Exception as e:
+            logging.error(f"Error extracting repository: {str(e)}")
+            return False
+        finally:
+            if archive is not None:
+                archive.close()
+            if progress is not None:
+                progress.finish(success, cancelled=cancel_token.cancelled)
+            cancel_token.detach()
+
+    async def extract_all(self, repo_urls, output_dir='./output', filters=None,
+                          cancel_token=None, on_result=None):
+        """
+        Extract many repositories concurrently.
+
+        Every repository is started at once; the connection cap and the
+        bandwidth budget decide how many actually download in parallel.
+
+        Args:
+            repo_urls (Iterable[str]): Repository URLs to extract
+            output_dir (str): Directory to save the extracted repositories
+            filters (FilterRules): Optional include/exclude rules
+            cancel_token (CancellationToken): Cancels every extraction
+            on_result (Callable[[BatchResult], None]): Called as each
+                repository finishes, in completion order
+
+        Returns:
+            list: One ``BatchResult`` per URL, in input order
+        """
+        async def run_one(repo_url):
+            started = time.monotonic()
+            success = await self.extract(repo_url, output_dir, filters,
+                                         cancel_token=cancel_token)
+            result = BatchResult(repo_url, success, time.monotonic() - started,
+                                 None if success else "extraction failed")
+            if on_result:
+                on_result(result)
+            return result
+
+        return list(await asyncio.gather(*(run_one(url) for url in repo_urls)))
+
+
+async def extract_repository_async(repo_url, output_dir='./output', filters=None,
+                                   progress=None, cancel_token=None, extractor=None):
+    """
+    Extract a GitHub repository without blocking the event loop.
+
+    Args:
+        repo_url (str): Repository URL or ``owner/repo`` shorthand; any
+            ``http(s)`` base URL is accepted, so local mirrors work too
+        output_dir (str): Directory to save the extracted repository
+        filters (FilterRules): Optional include/exclude rules; files they
+            reject are never decompressed
+        progress (ProgressReporter): Optional receiver of download and
+            extraction progress
+        cancel_token (CancellationToken): Cancelling it stops the download
+            or extraction at the next chunk or file; cancelling the task
+            does the same. Files already extracted are removed again
+        extractor (AsyncExtractor): Open extractor whose session and limits
+            are shared with other extractions; a private one with default
+            limits is used otherwise
+
+    Returns:
+        bool: True if extraction was successful, False otherwise
+    """
+    if extractor is not None:
+        return await extractor.extract(repo_url, output_dir, filters, progress, cancel_token)
+    async with AsyncExtractor() as extractor:
+        return await extractor.extract(repo_url, output_dir, filters, progress, cancel_token)
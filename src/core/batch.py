@@ -0,0 +1,118 @@
+"""
+Batch extraction of many repositories with a bounded worker pool.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Optional
+
+from src.core.extract_github import extract_repository
+
+DEFAULT_WORKERS = 4
+CANCELLED = "cancelled"
+
+
+@dataclass
+class BatchResult:
+    """Outcome of extracting one repository in a batch."""
+
+    repo_url: str
+    success: bool
+    elapsed: float
+    error: Optional[str] = None
+
+
+def read_repo_urls(lines):
+    """
+    Parse repository URLs from a batch file.
+
+    Blank lines and lines starting with ``#`` are ignored.
+
+    Args:
+        lines (Iterable[str]): Lines of the batch file
+
+    Returns:
+        list: Repository URLs in file order
+    """
+    urls = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            urls.append(line)
+    return urls
+
+
+def _run_one(extract, repo_url, output_dir, cancel_token=None):
+    if cancel_token is not None and cancel_token.cancelled:
+        return BatchResult(repo_url, False, 0.0, CANCELLED)
+    started = time.monotonic()
+    try:
+        success = bool(extract(repo_url, output_dir))
+        error = None if success else "extraction failed"
+    except Exception as e:
+        success, error = False, str(e)
+    if not success and cancel_token is not None and cancel_token.cancelled:
+        error = CANCELLED
+    return BatchResult(repo_url, success, time.monotonic() - started, error)
+
+
+def extract_batch(repo_urls, output_dir='./output', workers=DEFAULT_WORKERS,
+                  extract=extract_repository, on_result=None, cancel_token=None):
+    """
+    Extract several repositories concurrently.
+
+    Args:
+        repo_urls (Iterable[str]): Repository URLs to extract
+        output_dir (str): Directory to save the extracted repositories
+        workers (int): Maximum number of repositories processed at once
+        extract (Callable[[str, str], bool]): Extraction function to run for
+            each repository
+        on_result (Callable[[BatchResult], None]): Called as each repository
+            finishes, in completion order
+        cancel_token (CancellationToken): Once cancelled, repositories that
+            have not started yet are skipped and reported as cancelled; the
+            token must also be passed to ``extract`` to stop running ones
+
+    Returns:
+        list: One ``BatchResult`` per URL, in input order
+    """
+    repo_urls = list(repo_urls)
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    results = [None] * len(repo_urls)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    futures = {
+        executor.submit(_run_one, extract, url, output_dir, cancel_token): index
+        for index, url in enumerate(repo_urls)
+    }
+    try:
+        for future in as_completed(futures):
+            index = futures[future]
+            if future.cancelled():
+                result = BatchResult(repo_urls[index], False, 0.0, CANCELLED)
+            else:
+                result = future.result()
+            results[index] = result
+            if result.success:
+                logging.info(f"Extracted {result.repo_url} in {result.elapsed:.1f}s")
+            else:
+                logging.error(f"Failed to extract {result.repo_url}: {result.error}")
+            if on_result:
+                on_result(result)
+            if cancel_token is not None and cancel_token.cancelled:
+                _cancel_pending(futures)
+    except BaseException:
+        # A second Ctrl-C: stop waiting for the running extractions
+        _cancel_pending(futures)
+        executor.shutdown(wait=False)
+        raise
+    executor.shutdown()
+    return results
+
+
+def _cancel_pending(futures):
+    for future in futures:
+        future.cancel()
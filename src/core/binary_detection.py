@@ -0,0 +1,97 @@
+"""
+Cheap binary file detection.
+
+Deciding that a file is binary used to mean reading all of it and waiting
+for UTF-8 decoding to fail. The checks here look at the extension and at a
+small prefix of the content instead, so images, archives, fonts and
+vendored binaries can be classified without reading them in full.
+
+The prefix check only rejects content that is already invalid UTF-8 within
+its first bytes, and files that pass it are still fully decoded, so it
+agrees with full decoding. The extension table does not: a non-empty file
+with a listed extension is binary even if it happens to decode, such as a
+PDF made of ASCII only. Empty files decode to empty text whatever their
+extension, so they are never classified by it.
+"""
+
+import codecs
+import posixpath
+
+# Bytes read from the start of a file to classify it
+SNIFF_SIZE = 8192
+
+# Formats whose content is practically never valid UTF-8. Extensions that are also used
+# for text (".obj" Wavefront models, ".pth" path files, ".bin", ".db", ...)
+# or whose files can be plain ASCII (".tar", ".a", protocol 0 pickles) are
+# left to the content sniff.
+BINARY_EXTENSIONS = frozenset({
+    # Images
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".icns", ".tif", ".tiff",
+    ".webp", ".psd", ".heic", ".avif",
+    # Audio and video
+    ".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a", ".mp4", ".m4v", ".mov",
+    ".avi", ".mkv", ".webm", ".wmv",
+    # Archives and compressed data
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".zst", ".7z", ".rar", ".jar",
+    ".war", ".ear", ".whl", ".egg", ".apk", ".aar", ".nupkg", ".deb", ".rpm",
+    ".dmg", ".iso",
+    # Executables, libraries and object code
+    ".exe", ".dll", ".so", ".dylib", ".o", ".class",
+    ".pyc", ".pyo", ".pyd", ".wasm", ".elf",
+    # Fonts
+    ".ttf", ".otf", ".woff", ".woff2", ".eot",
+    # Documents and data stores
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".odt",
+    ".sqlite", ".sqlite3", ".mdb", ".parquet", ".npy", ".npz",
+    ".h5", ".hdf5", ".onnx", ".pt", ".tflite",
+})
+
+
+def has_binary_extension(path):
+    """
+    Check whether a path has an extension that is always binary.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        bool: True for known binary formats
+    """
+    return posixpath.splitext(path)[1].lower() in BINARY_EXTENSIONS
+
+
+def is_known_binary(path, size):
+    """
+    Check whether a file can be classified as binary without reading it.
+
+    Args:
+        path (str): File path
+        size (int): File size in bytes
+
+    Returns:
+        bool: True for non-empty files with a known binary extension
+    """
+    return size > 0 and has_binary_extension(path)
+
+
+def looks_binary(prefix):
+    """
+    Classify content from its first bytes.
+
+    Args:
+        prefix (bytes): Up to ``SNIFF_SIZE`` bytes from the start of a file
+
+    Returns:
+        bool: True if the prefix is not UTF-8, so the whole file cannot be
+    """
+    return bool(prefix) and not _is_utf8(prefix)
+
+
+def _is_utf8(prefix):
+    # The prefix may end in the middle of a multi-byte character, so decode
+    # incrementally without finalizing
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
@@ -0,0 +1,142 @@
+"""
+Content-addressed storage for deduplicated file contents.
+
+In deduplicated mode the extractor stores each distinct text file once in a
+``BlobStore`` shared across repositories, and the JSONL records reference
+it by the SHA-256 of the original file bytes instead of embedding the
+content. Forks and vendored libraries then cost one small record per copy.
+A file whose bytes are already in the store is not decoded or serialized
+again. ``rehydrate`` and ``iter_records`` turn the records back into the
+regular format.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def content_digest(data):
+    """
+    Hash raw file bytes into a blob key.
+
+    Args:
+        data (bytes): Content as stored in the archive
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlobStore:
+    """Directory of blobs stored as ``objects/<2 hex>/<62 hex>``.
+
+    Writes are atomic, so several extractions, threads or worker processes
+    can share one store. The store only holds a path, so it can be passed
+    to worker processes.
+    """
+
+    def __init__(self, root):
+        """
+        Initialize the store, creating its directory if needed.
+
+        Args:
+            root (str): Store directory
+        """
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest):
+        """Path of the blob with a given digest."""
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def has(self, digest):
+        """bool: Whether a blob is stored."""
+        return self.path(digest).exists()
+
+    def put(self, digest, content):
+        """
+        Store a blob unless it is already present.
+
+        Args:
+            digest (str): Key from ``content_digest``
+            content (bytes): UTF-8 encoded text to store
+
+        Returns:
+            bool: True if the blob was written, False if it already existed
+        """
+        path = self.path(digest)
+        if path.exists():
+            return False
+        path.parent.mkdir(exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return True
+
+    def get(self, digest):
+        """
+        Read a blob.
+
+        Args:
+            digest (str): Key from ``content_digest``
+
+        Returns:
+            bytes: The stored UTF-8 text
+
+        Raises:
+            KeyError: If the blob is not in the store
+        """
+        try:
+            return self.path(digest).read_bytes()
+        except FileNotFoundError:
+            raise KeyError(digest) from None
+
+    def __getstate__(self):
+        return {"root": str(self.root)}
+
+    def __setstate__(self, state):
+        self.__init__(state["root"])
+
+
+def rehydrate(record, store):
+    """
+    Turn a deduplicated record back into a regular one.
+
+    Args:
+        record (dict): Record as written by the extractor
+        store (BlobStore): Store the record's blob lives in
+
+    Returns:
+        dict: The record with its ``content`` restored; records without a
+        blob are returned unchanged
+    """
+    if "blob" not in record:
+        return record
+    record = dict(record)
+    record["content"] = store.get(record.pop("blob")).decode("utf-8")
+    return record
+
+
+def iter_records(stream, store):
+    """
+    Read a deduplicated JSONL output as regular records.
+
+    Args:
+        stream (BinaryIO): JSONL stream, see ``open_jsonl``
+        store (BlobStore): Store the output's blobs live in
+
+    Yields:
+        dict: Records with their content restored
+    """
+    for line in stream:
+        if line.strip():
+            yield rehydrate(json.loads(line), store)
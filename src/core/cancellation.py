@@ -0,0 +1,81 @@
+"""
+Cooperative cancellation of running extractions.
+
+A ``CancellationToken`` is shared between the code that runs an extraction
+and whoever may want to stop it: a GUI Cancel button, or the CLI's SIGINT
+handler. The download loops check it on every received chunk and the
+writers before every archive member, raising ``Cancelled``; the
+extractors then delete their partial output and temporary files. How
+quickly a cancellation takes effect is bounded by one chunk read (itself
+bounded by the HTTP read timeout) or one member.
+"""
+
+import threading
+
+
+class Cancelled(Exception):
+    """Raised inside an extraction once its token has been cancelled."""
+
+
+class CancellationToken:
+    """Thread-safe flag asking an extraction to stop."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._parent = None
+        # Keyed by id so cancel can snapshot them without taking a lock
+        self._children = {}
+
+    def cancel(self):
+        """Ask the extraction to stop; safe to call from any thread or a signal handler."""
+        self._event.set()
+        for child in tuple(self._children.values()):
+            child.cancel()
+
+    def child(self):
+        """
+        Create a token that is cancelled with this one but can also be
+        cancelled on its own, stopping a single extraction of a group.
+
+        Call ``detach`` on the child once its extraction has finished, so
+        a long-lived parent does not keep it alive.
+
+        Returns:
+            CancellationToken: New child token
+        """
+        token = CancellationToken()
+        token._parent = self
+        self._children[id(token)] = token
+        if self.cancelled:
+            token.cancel()
+        return token
+
+    def detach(self):
+        """Stop following the parent token, if this is a child."""
+        if self._parent is not None:
+            self._parent._children.pop(id(self), None)
+            self._parent = None
+
+    @property
+    def cancelled(self):
+        """bool: Whether ``cancel`` has been called."""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """
+        Stop the calling extraction if it was cancelled.
+
+        Raises:
+            Cancelled: If ``cancel`` has been called
+        """
+        if self._event.is_set():
+            raise Cancelled("Extraction cancelled")
+
+    def wait(self, timeout=None):
+        """
+        Sleep until cancelled or until ``timeout`` seconds have passed.
+
+        Returns:
+            bool: True if the token was cancelled
+        """
+        return self._event.wait(timeout)
@@ -0,0 +1,87 @@
+"""
+Splitting of large text files into bounded chunks.
+
+Huge generated files would otherwise become a single multi-megabyte JSONL
+line. ``iter_text_chunks`` cuts a file's byte stream into pieces of at most
+``max_bytes`` raw bytes, preferably at line ends and never inside a UTF-8
+character or a ``\\r\\n`` pair, so each piece decodes on its own and only
+one chunk is held in memory at a time.
+"""
+
+from src.core.records import decode_text
+
+# Bytes read from the member per iteration while chunking
+READ_SIZE = 64 * 1024
+
+
+def split_point(buffer, max_bytes):
+    """
+    Find where to cut the first chunk off a buffer.
+
+    Args:
+        buffer (bytearray): Pending bytes, longer than ``max_bytes``
+        max_bytes (int): Largest chunk size
+
+    Returns:
+        int: Length of the first chunk
+    """
+    cut = buffer.rfind(b"\n", 0, max_bytes) + 1
+    if cut > 0:
+        return cut
+    # No line end in range: cut hard, but not inside a character or a CRLF
+    cut = max_bytes
+    while cut > 0 and buffer[cut] & 0xC0 == 0x80:
+        cut -= 1
+    if cut > 0 and buffer[cut - 1] == 0x0D and buffer[cut] == 0x0A:
+        cut -= 1
+    return cut or max_bytes
+
+
+def iter_text_chunks(blocks, max_bytes, strict_first=True):
+    """
+    Decode a byte stream into bounded text chunks.
+
+    Args:
+        blocks (Iterable[bytes]): File content in arbitrary pieces
+        max_bytes (int): Largest chunk, measured in raw file bytes
+        strict_first (bool): Raise ``UnicodeDecodeError`` if the first chunk
+            is not valid UTF-8. Later chunks are decoded with replacement
+            characters, since earlier ones may already have been written
+
+    Yields:
+        tuple: ``(byte_offset, line_offset, text)`` per chunk, where the
+        offsets give the chunk's start in the file
+    """
+    buffer = bytearray()
+    byte_offset = 0
+    line_offset = 0
+
+    def decode(data):
+        errors = "strict" if strict_first and byte_offset == 0 else "replace"
+        return decode_text(bytes(data), errors)
+
+    for block in blocks:
+        buffer += block
+        while len(buffer) > max_bytes:
+            cut = split_point(buffer, max_bytes)
+            text = decode(buffer[:cut])
+            yield byte_offset, line_offset, text
+            byte_offset += cut
+            line_offset += text.count("\n")
+            del buffer[:cut]
+    if buffer or byte_offset == 0:
+        yield byte_offset, line_offset, decode(buffer)
+
+
+def iter_blocks(handle, size=READ_SIZE):
+    """
+    Read a binary stream in fixed-size blocks.
+
+    Args:
+        handle (BinaryIO): Stream to read
+        size (int): Block size in bytes
+
+    Yields:
+        bytes: Non-empty blocks until the end of the stream
+    """
+    return iter(lambda: handle.read(size), b"")
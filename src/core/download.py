@@ -0,0 +1,234 @@
+"""
+Resumable archive downloads.
+
+A dropped connection no longer means starting over: ``iter_resumable``
+re-requests the rest of the body with an HTTP ``Range`` header and carries
+on where the transfer stopped. ``StagingArea`` keeps partial downloads on
+disk between runs so an interrupted multi-GB archive can be resumed by the
+next invocation, and validates the finished file before handing it over.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import zipfile
+from pathlib import Path
+
+import requests
+
+DEFAULT_MAX_RESUMES = 5
+_CONTENT_RANGE = re.compile(r"bytes (?P<start>\d+)-\d+/(?P<total>\d+|\*)")
+_RESUMABLE_ERRORS = (
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+
+class DownloadError(Exception):
+    """Raised when a download cannot be completed or fails validation."""
+
+
+def expected_total(response):
+    """
+    Work out the full size of the resource a response is serving.
+
+    Args:
+        response (requests.Response): A 200 or 206 response
+
+    Returns:
+        int: Total size in bytes, or None if the server did not say
+    """
+    if response.status_code == 206:
+        match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+        if match and match.group("total") != "*":
+            return int(match.group("total"))
+        return None
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def range_start(response):
+    """int: Offset the body of a response starts at."""
+    if response.status_code == 206:
+        match = _CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+        if match:
+            return int(match.group("start"))
+    return 0
+
+
+def resume_headers(position, etag):
+    """
+    Headers requesting the rest of a resource from ``position`` on.
+
+    ``If-Range`` makes the server send the whole (new) resource instead of a
+    partial one if it changed in the meantime.
+    """
+    headers = {"Range": f"bytes={position}-"}
+    if etag:
+        headers["If-Range"] = etag
+    return headers
+
+
+def iter_resumable(client, url, response, chunk_size=8192, max_resumes=DEFAULT_MAX_RESUMES):
+    """
+    Yield the body of a response, resuming after dropped connections.
+
+    Args:
+        client (HttpClient): Client used to re-request the remainder
+        url (str): URL the response was fetched from
+        response (requests.Response): Streaming 200 or 206 response
+        chunk_size (int): Size of the chunks to read
+        max_resumes (int): How many times to resume before giving up
+
+    Yields:
+        bytes: Body chunks, in order and without gaps or overlaps
+
+    Raises:
+        DownloadError: If the server cannot resume the transfer or the body
+            is shorter than advertised
+    """
+    position = range_start(response)
+    total = expected_total(response)
+    etag = response.headers.get("ETag")
+    resumes = 0
+    while True:
+        try:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    position += len(chunk)
+                    yield chunk
+            if total is None or position >= total:
+                break
+            error = DownloadError(f"connection closed at {position} of {total} bytes")
+        except _RESUMABLE_ERRORS as e:
+            error = e
+        finally:
+            response.close()
+
+        if resumes >= max_resumes:
+            raise DownloadError(f"download failed after {resumes} resumes: {error}")
+        resumes += 1
+        logging.warning(f"Download interrupted at {position} bytes ({error}), resuming")
+        response = client.get(url, headers=resume_headers(position, etag), stream=True)
+        if response.status_code != 206 or range_start(response) != position:
+            response.close()
+            raise DownloadError(
+                f"server did not resume the download (status {response.status_code})"
+            )
+
+
+class StagingArea:
+    """Persistent storage for partially downloaded archives."""
+
+    def __init__(self, staging_dir):
+        """
+        Initialize the staging area.
+
+        Args:
+            staging_dir (str): Directory holding partial downloads
+        """
+        self.staging_dir = Path(staging_dir)
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url):
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        return self.staging_dir / f"{name}.part", self.staging_dir / f"{name}.json"
+
+    def _load_meta(self, url):
+        part_path, meta_path = self._paths(url)
+        if not part_path.exists() or not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("url") == url else None
+
+    def resume_headers(self, url):
+        """
+        Headers to resume a partial download left by an earlier run.
+
+        Args:
+            url (str): Download URL
+
+        Returns:
+            dict: ``Range``/``If-Range`` headers, or empty if there is nothing
+            usable to resume
+        """
+        meta = self._load_meta(url)
+        part_path, _ = self._paths(url)
+        if meta is None or not meta.get("etag"):
+            return {}
+        size = part_path.stat().st_size
+        if size == 0 or (meta.get("total") is not None and size >= meta["total"]):
+            self.discard(url)
+            return {}
+        return resume_headers(size, meta["etag"])
+
+    def download(self, client, url, response, archive_ext="zip", on_chunk=None,
+                 chunk_size=8192, max_resumes=DEFAULT_MAX_RESUMES):
+        """
+        Download a response body into the staging area.
+
+        A 206 response continues the partial file left by an earlier run; a
+        200 response starts it over.
+
+        Args:
+            client (HttpClient): Client used to resume interrupted transfers
+            url (str): Download URL
+            response (requests.Response): Streaming 200 or 206 response
+            archive_ext (str): Archive format, used for validation
+            on_chunk (Callable[[int], None]): Called with the size of every chunk
+            chunk_size (int): Size of the chunks to read
+            max_resumes (int): How many times to resume within this run
+
+        Returns:
+            Path: Location of the complete, validated archive
+
+        Raises:
+            DownloadError: If the download fails validation
+        """
+        part_path, meta_path = self._paths(url)
+        start = range_start(response)
+        if start and (not part_path.exists() or part_path.stat().st_size != start):
+            response.close()
+            self.discard(url)
+            raise DownloadError("partial download no longer matches the staged file")
+
+        total = expected_total(response)
+        meta_path.write_text(json.dumps({
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "total": total,
+        }), encoding="utf-8")
+
+        if start and on_chunk:
+            on_chunk(start)
+        with open(part_path, "ab" if start else "wb") as f:
+            for chunk in iter_resumable(client, url, response, chunk_size, max_resumes):
+                f.write(chunk)
+                if on_chunk:
+                    on_chunk(len(chunk))
+
+        self._validate(url, part_path, total, archive_ext)
+        return part_path
+
+    def _validate(self, url, part_path, total, archive_ext):
+        size = part_path.stat().st_size
+        if total is not None and size != total:
+            self.discard(url)
+            raise DownloadError(f"downloaded {size} bytes, expected {total}")
+        if archive_ext == "zip" and not zipfile.is_zipfile(part_path):
+            self.discard(url)
+            raise DownloadError("downloaded archive is not a valid zip file")
+
+    def discard(self, url):
+        """Delete the staged download for a URL."""
+        for path in self._paths(url):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
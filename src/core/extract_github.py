@@ -3,27 +3,101 @@ Core functionality for extracting GitHub repositories.
 """
 
 import os
-import requests
 import zipfile
-import io
 import logging
 import re
+import tempfile
 from urllib.parse import urlparse
 
-def extract_repository(repo_url, output_dir='./output'):
+from src.core.archive import iter_zip_members
+from src.core.cancellation import Cancelled
+from src.core.download import expected_total, iter_resumable
+from src.core.filters import MemberFilter
+from src.core.output_formats import open_jsonl
+from src.core.stats import (
+    DEFAULT_DIRECTORY_DEPTH, DEFAULT_TOP_FILES, RepositoryStats, stats_from_directory,
+    stats_from_jsonl, stats_from_zip
+)
+from src.services.github_archive import request_archive
+from src.services.http_session import get_client
+
+# Archives smaller than this are buffered in memory, larger ones spill to disk
+DEFAULT_SPOOL_THRESHOLD = 32 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+def spool_archive(response, download_url, memory_threshold=DEFAULT_SPOOL_THRESHOLD,
+                  client=None, on_chunk=None):
+    """
+    Stream an archive response into a spooled temporary file.
+
+    Only ``memory_threshold`` bytes are ever held in memory; larger archives
+    are rolled over to a temporary file on disk.
+    
+    Args:
+        response (requests.Response): Streaming 200 response
+        download_url (str): URL the response was fetched from
+        memory_threshold (int): Largest archive kept in memory, in bytes
+        client (HttpClient): Client used to resume dropped connections
+        on_chunk (Callable[[int], None]): Called with the size of every chunk
+    
+    Returns:
+        tempfile.SpooledTemporaryFile: Archive positioned at the start
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=memory_threshold)
+    try:
+        for chunk in iter_resumable(client or get_client(), download_url, response,
+                                    chunk_size=DOWNLOAD_CHUNK_SIZE):
+            spool.write(chunk)
+            if on_chunk:
+                on_chunk(len(chunk))
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+def extract_repository(repo_url, output_dir='./output', cache=None, staging=None,
+                       memory_threshold=DEFAULT_SPOOL_THRESHOLD, filters=None, progress=None,
+                       cancel_token=None):
     """
     Extract a GitHub repository to the specified output directory.
     
     Args:
         repo_url (str): URL of the GitHub repository
         output_dir (str): Directory to save the extracted repository
+        cache (ArchiveCache): Optional archive cache; unchanged repositories
+            are then served from disk after a single conditional request
+        staging (StagingArea): Optional staging area; interrupted downloads
+            are kept there and resumed with Range requests on the next run
+        memory_threshold (int): Largest archive buffered in memory; bigger
+            downloads are spooled to a temporary file
+        filters (FilterRules): Optional include/exclude rules; files they
+            reject are never decompressed
+        progress (ProgressReporter): Optional receiver of download and
+            extraction progress
+        cancel_token (CancellationToken): Cancelling it stops the download
+            or extraction at the next chunk or file; files already extracted
+            by this call are removed again
     
     Returns:
         bool: True if extraction was successful, False otherwise
     """
     logging.info(f"Extracting repository: {repo_url}")
     
+    def on_chunk(size):
+        if progress is not None:
+            progress.add_bytes(size)
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+
+    response = None
+    archive_source = None
+    extracted = []
+    success = False
     try:
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+
         # Clean and normalize the GitHub URL
         repo_url = normalize_github_url(repo_url)
         if not repo_url:
@@ -39,44 +113,147 @@ def extract_repository(repo_url, output_dir='./output'):
             
         logging.info(f"Attempting to download repository: {owner}/{repo}")
         
-        # Try main branch first
-        download_url = f"https://github.com/{owner}/{repo}/archive/refs/heads/main.zip"
-        logging.info(f"Trying main branch: {download_url}")
-        response = requests.get(download_url)
-        
-        # If main branch fails, try master branch
-        if response.status_code != 200:
-            download_url = f"https://github.com/{owner}/{repo}/archive/refs/heads/master.zip"
-            logging.info(f"Trying master branch: {download_url}")
-            response = requests.get(download_url)
-            
-        # If both fail, try default branch (which GitHub will redirect to)
-        if response.status_code != 200:
-            download_url = f"https://github.com/{owner}/{repo}/archive/HEAD.zip"
-            logging.info(f"Trying default branch: {download_url}")
-            response = requests.get(download_url)
+        # Resolve the default branch once instead of probing main/master/HEAD
+        response, download_url = request_archive(
+            f"https://github.com/{owner}/{repo}", "zip", cache=cache,
+            staging=staging, stream=True
+        )
+        logging.info(f"Requested archive: {download_url}")
         
         # Check if we got a successful response
-        if response.status_code != 200:
+        etag = response.headers.get("ETag")
+        if progress is not None and response.status_code in (200, 206):
+            progress.start_download(expected_total(response))
+        if response.status_code == 304:
+            logging.info("Archive unchanged, using cached copy")
+            archive_source = cache.open_cached(download_url)
+        elif response.status_code not in (200, 206):
             error_message = f"Failed to download repository: {response.status_code}"
             if response.status_code == 404:
                 error_message += " (Repository not found or is private)"
             logging.error(error_message)
             return False
+        elif staging is not None:
+            archive_source = staging.download(get_client(), download_url, response, "zip",
+                                              on_chunk=on_chunk)
+            if cache is not None and etag:
+                archive_source = cache.store_file(download_url, etag, "zip", archive_source)
+        elif cache is not None and etag:
+            with cache.writer(download_url, etag, "zip") as writer:
+                for chunk in iter_resumable(get_client(), download_url, response,
+                                            chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    writer.write(chunk)
+                    on_chunk(len(chunk))
+            archive_source = writer.path
+        else:
+            archive_source = spool_archive(response, download_url, memory_threshold,
+                                           on_chunk=on_chunk)
         
         # Create output directory if it doesn't exist
         os.makedirs(output_dir, exist_ok=True)
         
         # Extract the zip file
-        with zipfile.ZipFile(io.BytesIO(response.content)) as zip_ref:
-            zip_ref.extractall(output_dir)
+        if progress is not None:
+            progress.start_processing()
+        extract_members(archive_source, output_dir, filters, progress, cancel_token, extracted)
+        if staging is not None:
+            staging.discard(download_url)
             
         logging.info(f"Repository extracted to: {output_dir}")
+        success = True
         return True
         
+    except Cancelled:
+        logging.warning("Extraction cancelled, removing partial output")
+        remove_extracted(extracted, output_dir)
+        return False
     except Exception as e:
         logging.error(f"Error extracting repository: {str(e)}")
         return False
+    finally:
+        if response is not None:
+            response.close()
+        if hasattr(archive_source, "close"):
+            archive_source.close()
+        if progress is not None:
+            progress.finish(success, cancelled=cancel_token is not None and cancel_token.cancelled)
+
+def extract_members(archive_source, output_dir, filters=None, progress=None,
+                    cancel_token=None, extracted=None):
+    """
+    Extract the members of a zip archive selected by the filter rules.
+
+    Args:
+        archive_source: Path or binary file object of the zip archive
+        output_dir (str): Directory to extract into
+        filters (FilterRules): Optional include/exclude rules
+        progress (ProgressReporter): Optional receiver of a file count
+        cancel_token (CancellationToken): Checked before every member
+        extracted (list): When given, receives every file and directory
+            this call newly creates, as it is created, so a cancelled run
+            can be rolled back without touching files that already existed
+
+    Returns:
+        list: Paths newly created by this call
+    """
+    extracted = [] if extracted is None else extracted
+    root = os.path.abspath(output_dir)
+    with zipfile.ZipFile(archive_source) as zip_ref:
+        selected = zip_ref.namelist()
+        if filters is not None:
+            member_filter = MemberFilter(filters)
+            members = list(iter_zip_members(zip_ref))
+            member_filter.preload(members)
+            selected = [m.archive_name for m in member_filter.apply(members)]
+        for name in selected:
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            target = os.path.abspath(os.path.join(output_dir, name))
+            created = _missing_paths(target, root)
+            path = zip_ref.extract(name, output_dir)
+            # zipfile sanitizes odd names; only paths we checked beforehand
+            # are known to be new
+            if os.path.abspath(path) == target:
+                extracted.extend(created)
+            if progress is not None:
+                progress.add_file()
+    return extracted
+
+def _missing_paths(path, root):
+    """Paths from ``root`` (exclusive) down to ``path`` that do not exist yet."""
+    missing = []
+    while path != root and path.startswith(root + os.sep) and not os.path.lexists(path):
+        missing.append(path)
+        path = os.path.dirname(path)
+    return missing[::-1]
+
+def remove_extracted(paths, output_dir):
+    """
+    Delete the files and directories created by a cancelled run.
+
+    Directories are only removed once empty, so anything else written
+    into them is kept.
+
+    Args:
+        paths (list): Paths recorded by ``extract_members``
+        output_dir (str): Directory the files were extracted to
+    """
+    root = os.path.abspath(output_dir)
+    directories = []
+    for path in paths:
+        path = os.path.abspath(path)
+        if not path.startswith(root + os.sep):
+            continue
+        if os.path.isdir(path):
+            directories.append(path)
+        elif os.path.lexists(path):
+            os.remove(path)
+    # Deepest first, so parents are empty by the time they are tried
+    for directory in sorted(directories, key=len, reverse=True):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            pass
 
 def normalize_github_url(url):
     """
@@ -130,19 +307,29 @@ def parse_github_url(url):
     
     return None, None
 
-def analyze_repository(repo_path):
+def analyze_repository(repo_path, top_files=DEFAULT_TOP_FILES,
+                       directory_depth=DEFAULT_DIRECTORY_DEPTH):
     """
     Analyze a repository to extract useful information.
+
+    Files are read once, in a single streaming pass, so memory use stays
+    bounded for very large repositories.
     
     Args:
-        repo_path (str): Path to the extracted repository
+        repo_path (str): Path to the extracted repository, its zip archive,
+            or a ``{repo}_contents.jsonl`` output (optionally compressed)
+        top_files (int): Number of largest files to report
+        directory_depth (int): Deepest directory level with its own totals
         
     Returns:
-        dict: Repository analysis results
+        dict: Repository analysis results, see ``RepositoryStats.result``
     """
-    # This is a placeholder for future implementation
-    return {
-        "files_count": 0,
-        "languages": [],
-        "size": 0
-    } 
\ No newline at end of file
+    stats = RepositoryStats(top_files, directory_depth)
+    if os.path.isdir(repo_path):
+        stats_from_directory(repo_path, stats)
+    elif zipfile.is_zipfile(repo_path):
+        stats_from_zip(repo_path, stats)
+    else:
+        with open_jsonl(repo_path) as stream:
+            stats_from_jsonl(stream, stats)
+    return stats.result()
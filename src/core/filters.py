@@ -0,0 +1,266 @@
+"""
+Member filtering for repository archives.
+
+Filters are evaluated against archive metadata (path and size) before a
+member is read, so excluded files are never decompressed. Patterns follow
+``.gitignore`` syntax, and files marked ``linguist-vendored`` or
+``linguist-generated`` in the repository's ``.gitattributes`` files can be
+left out as well when asked for.
+"""
+
+import io
+import posixpath
+import re
+from dataclasses import dataclass, field, replace
+from typing import Optional, Tuple
+
+# Matches the previous hard-coded skip list, but at any depth
+DEFAULT_EXCLUDES = (".git/", "node_modules/", ".env*")
+LINGUIST_ATTRIBUTES = ("linguist-vendored", "linguist-generated")
+
+
+def translate_pattern(pattern):
+    """
+    Translate a ``.gitignore``-style glob into a regular expression.
+
+    Args:
+        pattern (str): Glob without negation or trailing slash
+
+    Returns:
+        re.Pattern: Expression matching full relative paths
+    """
+    anchored = "/" in pattern.rstrip("/")
+    pattern = pattern.lstrip("/")
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                parts.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                parts.append(f"[{body}]")
+                i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    prefix = "" if anchored else "(?:.*/)?"
+    return re.compile(f"^{prefix}{''.join(parts)}$")
+
+
+@dataclass
+class PathPattern:
+    """A single compiled ``.gitignore``-style pattern."""
+
+    regex: re.Pattern
+    negated: bool = False
+    directory_only: bool = False
+
+    @classmethod
+    def parse(cls, pattern):
+        """
+        Compile a pattern line.
+
+        Args:
+            pattern (str): e.g. ``"build/"``, ``"*.min.js"``, ``"!keep.txt"``
+
+        Returns:
+            PathPattern: Compiled pattern
+        """
+        negated = pattern.startswith("!")
+        if negated:
+            pattern = pattern[1:]
+        directory_only = pattern.endswith("/")
+        return cls(translate_pattern(pattern.rstrip("/")), negated, directory_only)
+
+    def matches(self, path):
+        """
+        Check a file path against the pattern.
+
+        A pattern that matches one of the file's parent directories matches
+        the file too, as in ``.gitignore``.
+
+        Args:
+            path (str): File path relative to the repository root
+
+        Returns:
+            bool: True if the pattern applies to the file
+        """
+        parts = path.split("/")
+        for depth in range(1, len(parts)):
+            if self.regex.match("/".join(parts[:depth])):
+                return True
+        return not self.directory_only and bool(self.regex.match(path))
+
+
+def _compile(patterns):
+    return [PathPattern.parse(p.strip()) for p in patterns
+            if p.strip() and not p.strip().startswith("#")]
+
+
+def parse_gitattributes(text):
+    """
+    Extract linguist attributes from a ``.gitattributes`` file.
+
+    Args:
+        text (str): File content
+
+    Returns:
+        list: ``(regex, {attribute: bool or None})`` in file order; None
+        means the attribute was explicitly unspecified with ``!attr``
+    """
+    rules = []
+    for line in text.splitlines():
+        fields = line.split()
+        if not fields or fields[0].startswith("#"):
+            continue
+        attributes = {}
+        for token in fields[1:]:
+            name, _, value = token.partition("=")
+            if name.startswith("-"):
+                name, state = name[1:], False
+            elif name.startswith("!"):
+                name, state = name[1:], None
+            else:
+                state = value.lower() not in ("false", "0") if value else True
+            if name in LINGUIST_ATTRIBUTES:
+                attributes[name] = state
+        if attributes:
+            rules.append((translate_pattern(fields[0]), attributes))
+    return rules
+
+
+@dataclass
+class FilterRules:
+    """What to keep out of the output."""
+
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = DEFAULT_EXCLUDES
+    max_file_size: Optional[int] = None
+    # Opt-in, so the default output keeps every file
+    exclude_vendored: bool = False
+    exclude_generated: bool = False
+
+
+@dataclass
+class MemberFilter:
+    """Applies ``FilterRules`` to archive members of one repository."""
+
+    rules: FilterRules = field(default_factory=FilterRules)
+
+    def __post_init__(self):
+        self._include = _compile(self.rules.include)
+        self._exclude = _compile(self.rules.exclude)
+        # .gitattributes rules per directory, "" being the repository root
+        self._attributes = {}
+
+    @property
+    def uses_attributes(self):
+        """bool: Whether ``.gitattributes`` files affect the result."""
+        return self.rules.exclude_vendored or self.rules.exclude_generated
+
+    def load_gitattributes(self, path, data):
+        """
+        Register the rules of a ``.gitattributes`` file.
+
+        Args:
+            path (str): Path of the file relative to the repository root
+            data (bytes): File content
+        """
+        directory = posixpath.dirname(path)
+        self._attributes[directory] = parse_gitattributes(data.decode("utf-8", "replace"))
+
+    def preload(self, members):
+        """
+        Load every ``.gitattributes`` file in a fully listed archive.
+
+        Args:
+            members (list): All members of the archive
+        """
+        if self.uses_attributes:
+            for member in members:
+                if member.name == ".gitattributes":
+                    self.load_gitattributes(member.path, member.read())
+
+    def _attribute(self, path, name):
+        state = None
+        # Shallower files first so that deeper ones override them
+        for directory in sorted(self._attributes, key=lambda d: d.count("/") + bool(d)):
+            if directory and not path.startswith(directory + "/"):
+                continue
+            relative = path[len(directory) + 1:] if directory else path
+            for regex, attributes in self._attributes[directory]:
+                if name in attributes and regex.match(relative):
+                    state = attributes[name]
+        return bool(state)
+
+    def accepts(self, member):
+        """
+        Decide from metadata alone whether a member belongs in the output.
+
+        Args:
+            member (ArchiveMember): Member to check
+
+        Returns:
+            bool: True to keep the member
+        """
+        path = member.path
+        if self.rules.max_file_size is not None and member.size > self.rules.max_file_size:
+            return False
+        if self._include and not any(p.matches(path) for p in self._include):
+            return False
+
+        # The last matching pattern wins; unlike git, a negation can bring
+        # back a file inside an excluded directory
+        excluded = False
+        for pattern in self._exclude:
+            if pattern.matches(path):
+                excluded = not pattern.negated
+        if excluded:
+            return False
+
+        if self.rules.exclude_vendored and self._attribute(path, "linguist-vendored"):
+            return False
+        if self.rules.exclude_generated and self._attribute(path, "linguist-generated"):
+            return False
+        return True
+
+    def apply(self, members):
+        """
+        Filter a stream of members.
+
+        ``.gitattributes`` files met along the way are loaded before any
+        later member is checked, which covers streamed archives where the
+        whole listing is not known up front.
+
+        Args:
+            members (Iterable[ArchiveMember]): Members in archive order
+
+        Yields:
+            ArchiveMember: Members that pass the filter
+        """
+        for member in members:
+            if (self.uses_attributes and member.name == ".gitattributes"
+                    and posixpath.dirname(member.path) not in self._attributes):
+                data = member.read()
+                self.load_gitattributes(member.path, data)
+                # Streamed members can only be read once
+                member = replace(member, opener=lambda data=data: io.BytesIO(data))
+            if self.accepts(member):
+                yield member
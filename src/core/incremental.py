@@ -0,0 +1,236 @@
+"""
+Incremental re-extraction.
+
+Next to each ``{repo}_contents.jsonl`` the extractor can keep a manifest
+recording, for every file, its size, CRC-32 and where its record sits in the
+output. On the next run, files whose size and checksum are unchanged have
+their records copied over byte for byte; only added or modified files are
+decoded and serialized again. The changes can also be written to a delta
+JSONL for downstream consumers.
+
+Records also depend on how they were built: the serializer, chunking and
+blob-store options, and the language and binary detection tables. These
+are summed up in a fingerprint stored in the manifest; when it differs, the
+output is rebuilt from scratch instead of reusing stale records.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from src.core import binary_detection, languages
+
+MANIFEST_VERSION = 4
+
+
+def options_fingerprint(**options):
+    """
+    Digest of everything, besides file content, that records depend on.
+
+    Args:
+        **options: JSON-serializable record options, such as the
+            serializer name and the chunk size
+
+    Returns:
+        str: Hex digest; equal digests mean records can be reused
+    """
+    tables = (
+        languages.EXTENSIONS, languages.FILENAMES, languages.FILENAME_PREFIXES,
+        languages.INTERPRETERS, languages.MODELINE_ALIASES,
+        binary_detection.BINARY_EXTENSIONS,
+    )
+    payload = json.dumps({
+        "manifest": MANIFEST_VERSION,
+        "options": options,
+        # repr of sorted contents, so set ordering does not matter
+        "tables": [repr(sorted(table.items()) if isinstance(table, dict) else sorted(table))
+                   for table in tables],
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def manifest_path(output_file):
+    """Path of the manifest kept next to an output file."""
+    output_file = Path(output_file)
+    return output_file.with_name(f"{output_file.stem}.manifest.json")
+
+
+def delta_path(output_file):
+    """Path of the delta JSONL written next to an output file."""
+    output_file = Path(output_file)
+    return output_file.with_name(f"{output_file.stem}.delta.jsonl")
+
+
+@dataclass
+class ManifestEntry:
+    """Where a file's record lives in the output and what it was built from."""
+
+    size: int
+    crc32: int
+    offset: int
+    length: int
+
+    def matches(self, size, crc32):
+        """bool: Whether a file with this size and checksum is unchanged."""
+        return self.size == size and self.crc32 == crc32
+
+
+class IncrementalUpdate:
+    """Tracks one incremental rewrite of an output file."""
+
+    def __init__(self, output_file, delta_writer=None, fingerprint=None):
+        """
+        Load the previous manifest and output, if they are consistent.
+
+        Args:
+            output_file (Path): JSONL output being rewritten
+            delta_writer (JsonlWriter): Where to write change records, if any
+            fingerprint (str): ``options_fingerprint`` of this run; previous
+                records are only reused if they were built with the same one
+        """
+        self.output_file = Path(output_file)
+        self.delta_writer = delta_writer
+        self.fingerprint = fingerprint
+        self.previous = {}
+        self.entries = {}
+        self._previous_output = None
+
+        manifest = self._load_manifest()
+        if manifest is not None:
+            self.previous = manifest
+            self._previous_output = open(self.output_file, "rb")
+
+    def _load_manifest(self):
+        path = manifest_path(self.output_file)
+        if not path.exists() or not self.output_file.exists():
+            return None
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            if raw.get("version") != MANIFEST_VERSION:
+                return None
+            if raw.get("fingerprint") != self.fingerprint:
+                logging.info(f"{self.output_file} was built with other options, "
+                             "rebuilding it from scratch")
+                return None
+            if raw.get("output_size") != self.output_file.stat().st_size:
+                logging.warning(f"{self.output_file} changed since its manifest was written, "
+                                "rebuilding it from scratch")
+                return None
+            return {path: ManifestEntry(**entry) for path, entry in raw["files"].items()}
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable manifest {path}: {e}")
+            return None
+
+    def lookup(self, path):
+        """
+        Get the previous manifest entry of a file.
+
+        Args:
+            path (str): File path relative to the repository root
+
+        Returns:
+            ManifestEntry: Previous entry, or None if the file is new
+        """
+        return self.previous.get(path)
+
+    def reuse(self, path, previous, writer):
+        """
+        Copy an unchanged file's record from the previous output.
+
+        Args:
+            path (str): File path relative to the repository root
+            previous (ManifestEntry): Entry returned by ``lookup``
+            writer (JsonlWriter): Writer for the new output
+
+        Returns:
+            bytes: The copied record(s)
+        """
+        self._previous_output.seek(previous.offset)
+        data = self._previous_output.read(previous.length)
+        offset, length = writer.write_bytes(data)
+        self.entries[path] = ManifestEntry(previous.size, previous.crc32, offset, length)
+        return data
+
+    def track(self, path, size, crc32, span, line=None):
+        """
+        Record a freshly serialized file.
+
+        Args:
+            path (str): File path relative to the repository root
+            size (int): File size in bytes
+            crc32 (int): CRC-32 of the file content
+            span (tuple): ``(offset, length)`` of its records in the new output
+            line (bytes): The serialized records that were written, if they
+                have not been passed to ``write_delta`` already
+        """
+        offset, length = span
+        self.entries[path] = ManifestEntry(size, crc32, offset, length)
+        if line is not None:
+            self.write_delta(path, line)
+
+    def write_delta(self, path, line):
+        """
+        Add a new or modified file's records to the delta output.
+
+        Args:
+            path (str): File path relative to the repository root
+            line (bytes): One or more serialized records of the file
+        """
+        if self.delta_writer is None:
+            return
+        change = "modified" if path in self.previous else "added"
+        # Splice the already serialized records into change entries rather
+        # than encoding them a second time
+        header = json.dumps({"change": change, "path": path}, ensure_ascii=False)
+        prefix = header[:-1].encode("utf-8") + b', "record": '
+        for record in line.split(b"\n"):
+            if record:
+                self.delta_writer.write_bytes(prefix + record + b"}\n")
+
+    def finish(self, output_size):
+        """
+        Emit deletions and persist the new manifest.
+
+        Args:
+            output_size (int): Size of the new output file in bytes
+        """
+        if self.delta_writer is not None:
+            for path in self.previous:
+                if path not in self.entries:
+                    self.delta_writer.write({"change": "deleted", "path": path})
+
+        path = manifest_path(self.output_file)
+        temp_path = path.with_name(path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "fingerprint": self.fingerprint,
+                "output_size": output_size,
+                "files": {p: asdict(entry) for p, entry in self.entries.items()},
+            }, f)
+        os.replace(temp_path, path)
+
+    def close(self):
+        """Release the previous output file."""
+        if self._previous_output is not None:
+            self._previous_output.close()
+            self._previous_output = None
+
+    def summary(self):
+        """
+        Count what changed compared to the previous run.
+
+        Returns:
+            dict: Number of ``unchanged``, ``changed`` and ``deleted`` files
+        """
+        changed = sum(1 for path, entry in self.entries.items()
+                      if self.previous.get(path) is None
+                      or not self.previous[path].matches(entry.size, entry.crc32))
+        return {
+            "unchanged": len(self.entries) - changed,
+            "changed": changed,
+            "deleted": sum(1 for path in self.previous if path not in self.entries),
+        }
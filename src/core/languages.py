@@ -0,0 +1,260 @@
+"""
+Language detection for repository files.
+
+Files are classified by exact filename (``Dockerfile``, ``Makefile``), then
+by extension, using tables built once at import time. Files that neither
+identifies can be classified from their first bytes: a shebang line
+(``#!/usr/bin/env python3``) or an editor modeline (``vim: ft=ruby``,
+``-*- mode: lisp -*-``). Extension lookups are memoized, so detection costs
+about as much as a dictionary lookup per file.
+"""
+
+import re
+from functools import lru_cache
+
+# Returned for files that cannot be classified
+FALLBACK_LANGUAGE = "text"
+
+_LANGUAGE_EXTENSIONS = {
+    "ada": ".ada .adb .ads",
+    "assembly": ".asm .s .nasm",
+    "awk": ".awk",
+    "bash": ".sh .bash .zsh .ksh .fish .bats .command",
+    "batch": ".bat .cmd",
+    "c": ".c .h",
+    "clojure": ".clj .cljs .cljc .edn",
+    "cmake": ".cmake",
+    "cobol": ".cob .cbl .cpy",
+    "coffeescript": ".coffee",
+    "cpp": ".cpp .cc .cxx .c++ .hpp .hh .hxx .h++ .ipp .inl .tpp",
+    "csharp": ".cs .csx",
+    "css": ".css",
+    "csv": ".csv .tsv",
+    "cuda": ".cu .cuh",
+    "d": ".d",
+    "dart": ".dart",
+    "diff": ".diff .patch",
+    "dockerfile": ".dockerfile",
+    "elixir": ".ex .exs",
+    "elm": ".elm",
+    "erlang": ".erl .hrl",
+    "fortran": ".f .f77 .f90 .f95 .f03 .f08 .for",
+    "fsharp": ".fs .fsi .fsx",
+    "gdscript": ".gd",
+    "glsl": ".glsl .vert .frag .geom .comp",
+    "go": ".go",
+    "gradle": ".gradle",
+    "graphql": ".graphql .gql",
+    "groovy": ".groovy .gvy",
+    "haml": ".haml",
+    "handlebars": ".hbs .handlebars .mustache",
+    "haskell": ".hs .lhs",
+    "hcl": ".hcl .tf .tfvars",
+    "html": ".html .htm .xhtml",
+    "ini": ".ini .cfg .conf .properties .editorconfig",
+    "java": ".java",
+    "javascript": ".js .jsx .mjs .cjs",
+    "jinja": ".j2 .jinja .jinja2",
+    "json": ".json .jsonc .json5 .geojson .ipynb",
+    "jsonl": ".jsonl .ndjson",
+    "julia": ".jl",
+    "kotlin": ".kt .kts",
+    "latex": ".tex .sty .cls .bib",
+    "less": ".less",
+    "lisp": ".lisp .lsp .cl .el",
+    "lua": ".lua",
+    "makefile": ".mk .mak",
+    "markdown": ".md .markdown .mdx .mkd",
+    "nim": ".nim",
+    "nix": ".nix",
+    "objective-c": ".m .mm",
+    "ocaml": ".ml .mli",
+    "pascal": ".pas .pp",
+    "perl": ".pl .pm .t .pod",
+    "php": ".php .phtml .php3 .php4 .php5",
+    "powershell": ".ps1 .psm1 .psd1",
+    "protobuf": ".proto",
+    "prolog": ".pro .prolog",
+    "pug": ".pug .jade",
+    "python": ".py .pyw .pyi .pyx .pxd",
+    "r": ".r .rmd",
+    "racket": ".rkt",
+    "restructuredtext": ".rst",
+    "ruby": ".rb .rake .gemspec .ru .erb",
+    "rust": ".rs",
+    "sass": ".sass",
+    "scala": ".scala .sc .sbt",
+    "scheme": ".scm .ss",
+    "scss": ".scss",
+    "solidity": ".sol",
+    "sql": ".sql .psql .plsql",
+    "svelte": ".svelte",
+    "swift": ".swift",
+    "tcl": ".tcl",
+    "text": ".txt .text .log",
+    "toml": ".toml",
+    "typescript": ".ts .tsx .mts .cts",
+    "verilog": ".v .sv .svh .vh",
+    "vhdl": ".vhd .vhdl",
+    "vim": ".vim",
+    "vue": ".vue",
+    "wasm": ".wat .wast",
+    "xml": ".xml .xsd .xsl .xslt .svg .plist .csproj .vcxproj .resx .xaml",
+    "yaml": ".yml .yaml",
+    "zig": ".zig",
+}
+
+_LANGUAGE_FILENAMES = {
+    "bash": ".bashrc .bash_profile .bash_logout .profile .zshrc .zprofile PKGBUILD",
+    "cmake": "CMakeLists.txt",
+    "dockerfile": "Dockerfile Containerfile",
+    "gitconfig": ".gitconfig .gitmodules",
+    "ignore": ".gitignore .dockerignore .npmignore .eslintignore .prettierignore",
+    "groovy": "Jenkinsfile",
+    "ini": ".npmrc .pylintrc .flake8 setup.cfg tox.ini",
+    "json": ".babelrc .eslintrc .prettierrc package.json composer.lock Pipfile.lock",
+    "makefile": "Makefile GNUmakefile makefile",
+    "python": "SConstruct SConscript",
+    "ruby": "Gemfile Rakefile Guardfile Vagrantfile Podfile Brewfile Fastfile",
+    "text": "LICENSE COPYING AUTHORS CONTRIBUTORS NOTICE README",
+    "toml": "Pipfile Cargo.lock poetry.lock",
+    "yaml": ".clang-format .travis.yml",
+}
+
+# Module-level lookup tables, built once
+EXTENSIONS = {ext: language for language, exts in _LANGUAGE_EXTENSIONS.items()
+              for ext in exts.split()}
+FILENAMES = {name: language for language, names in _LANGUAGE_FILENAMES.items()
+             for name in names.split()}
+# Filename prefixes such as Dockerfile.dev or Makefile.am
+FILENAME_PREFIXES = (("Dockerfile.", "dockerfile"), ("Makefile.", "makefile"))
+
+# Interpreters named on shebang lines, after stripping version numbers
+INTERPRETERS = {
+    "python": "python", "pypy": "python", "node": "javascript", "nodejs": "javascript",
+    "deno": "typescript", "ts-node": "typescript", "bash": "bash", "sh": "bash",
+    "zsh": "bash", "ksh": "bash", "dash": "bash", "fish": "bash", "ruby": "ruby",
+    "perl": "perl", "php": "php", "lua": "lua", "luajit": "lua", "rscript": "r",
+    "tclsh": "tcl", "wish": "tcl", "awk": "awk", "gawk": "awk", "groovy": "groovy",
+    "scala": "scala", "julia": "julia", "elixir": "elixir", "escript": "erlang",
+    "swift": "swift", "make": "makefile", "pwsh": "powershell", "racket": "racket",
+    "guile": "scheme", "sbcl": "lisp", "osascript": "applescript",
+}
+
+# Modeline names that differ from the language names above
+MODELINE_ALIASES = {
+    "sh": "bash", "zsh": "bash", "shell-script": "bash", "py": "python",
+    "js": "javascript", "ts": "typescript", "c++": "cpp", "cs": "csharp",
+    "rb": "ruby", "yml": "yaml", "md": "markdown", "make": "makefile",
+    "emacs-lisp": "lisp", "elisp": "lisp", "tex": "latex", "objc": "objective-c",
+    "dosbatch": "batch", "ps1": "powershell", "rst": "restructuredtext",
+    "conf": "ini", "dosini": "ini", "rust-mode": "rust",
+}
+KNOWN_LANGUAGES = frozenset(EXTENSIONS.values()) | frozenset(FILENAMES.values()) \
+    | frozenset(INTERPRETERS.values())
+
+# Only the start of the file is searched for shebangs and modelines
+SNIFF_LINES = 5
+_SHEBANG = re.compile(rb"#![ \t]*(\S+)((?:[ \t]+\S+)*)")
+_VIM_MODELINE = re.compile(rb"\b(?:vi|vim|ex):.*?\b(?:ft|filetype|syntax)=([\w+-]+)")
+_EMACS_MODELINE = re.compile(rb"-\*-(?:.*?\bmode:)?[ \t]*([\w+-]+)[ \t]*(?:;.*?)?-\*-")
+_VERSION_SUFFIX = re.compile(r"[\d.]+$")
+
+
+@lru_cache(maxsize=4096)
+def language_for_extension(extension):
+    """
+    Look up an extension, as it appears in a file name.
+
+    Args:
+        extension (str): Suffix including the dot, e.g. ``".PY"``
+
+    Returns:
+        str: Language, or None if the extension is unknown
+    """
+    return EXTENSIONS.get(extension.lower())
+
+
+def language_from_path(path):
+    """
+    Detect a file's language from its name alone.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        str: Language, or None if the name is not recognized
+    """
+    name = path.rpartition("/")[2]
+    language = FILENAMES.get(name)
+    if language is not None:
+        return language
+    dot = name.rfind(".")
+    if dot > 0:
+        language = language_for_extension(name[dot:])
+        if language is not None:
+            return language
+    for prefix, language in FILENAME_PREFIXES:
+        if name.startswith(prefix):
+            return language
+    return None
+
+
+def _modeline_language(name):
+    name = name.decode("ascii", "ignore").lower()
+    name = MODELINE_ALIASES.get(name, name)
+    return name if name in KNOWN_LANGUAGES else None
+
+
+def _interpreter_language(command, arguments):
+    interpreter = command.rpartition(b"/")[2]
+    if interpreter == b"env":
+        # "#!/usr/bin/env -S python3 -u": the first non-option argument
+        interpreter = next((arg for arg in arguments.split() if not arg.startswith(b"-")), b"")
+    interpreter = _VERSION_SUFFIX.sub("", interpreter.decode("ascii", "ignore").lower())
+    return INTERPRETERS.get(interpreter)
+
+
+def language_from_content(prefix):
+    """
+    Detect a file's language from a shebang or modeline in its first lines.
+
+    Args:
+        prefix (bytes): Start of the file
+
+    Returns:
+        str: Language, or None if there is no recognizable hint
+    """
+    if not prefix:
+        return None
+    head = b"\n".join(prefix.split(b"\n", SNIFF_LINES)[:SNIFF_LINES])
+    if head.startswith(b"#!"):
+        match = _SHEBANG.match(head)
+        language = match and _interpreter_language(match[1], match[2])
+        if language:
+            return language
+    for pattern in (_VIM_MODELINE, _EMACS_MODELINE):
+        match = pattern.search(head)
+        if match:
+            language = _modeline_language(match[1])
+            if language:
+                return language
+    return None
+
+
+def detect_language(path, prefix=None):
+    """
+    Detect a file's language.
+
+    Args:
+        path (str): File path
+        prefix (bytes): Start of the content, used when the name is not
+            recognized
+
+    Returns:
+        str: Language name, ``"text"`` if it could not be determined
+    """
+    language = language_from_path(path)
+    if language is None and prefix:
+        language = language_from_content(prefix)
+    return language or FALLBACK_LANGUAGE
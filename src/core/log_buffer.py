@@ -0,0 +1,64 @@
+"""
+Bounded, thread-safe buffer for log text shown in the GUI.
+
+Extraction threads write log text as it is printed; the GUI thread drains
+everything written since its last timer tick and renders it with a single
+append. Only the newest ``max_lines`` complete lines are kept between two
+ticks, so a burst of output cannot grow memory or stall the event loop.
+"""
+
+import threading
+from collections import deque
+
+DEFAULT_MAX_LINES = 1000
+
+
+class LogBuffer:
+    """Ring buffer of log lines; a file-like target for ``sys.stdout``."""
+
+    def __init__(self, max_lines=DEFAULT_MAX_LINES):
+        """
+        Initialize an empty buffer.
+
+        Args:
+            max_lines (int): Lines kept between two ``drain`` calls; older
+                ones are dropped and counted
+        """
+        self._lines = deque(maxlen=max_lines)
+        self._partial = ""
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        """
+        Add printed text; incomplete lines wait for their newline.
+
+        Returns:
+            int: Number of characters written
+        """
+        with self._lock:
+            lines = (self._partial + text).split("\n")
+            self._partial = lines.pop()
+            overflow = len(self._lines) + len(lines) - self._lines.maxlen
+            if overflow > 0:
+                self._dropped += overflow
+            self._lines.extend(lines)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        """
+        Take the complete lines written since the last call.
+
+        Returns:
+            tuple: ``(text, dropped)`` where ``text`` holds the kept lines
+            joined by newlines (empty if there are none) and ``dropped`` is
+            the number of older lines discarded to stay within ``max_lines``
+        """
+        with self._lock:
+            lines = list(self._lines)
+            self._lines.clear()
+            dropped, self._dropped = self._dropped, 0
+        return "\n".join(lines), dropped
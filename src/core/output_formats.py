@@ -0,0 +1,244 @@
+"""
+Compressed JSONL output and columnar exports.
+
+The JSONL output can be compressed on the fly with gzip (standard library)
+or zstd (``zstandard`` package), and an extracted repository can be exported
+to Parquet or Arrow IPC (``pyarrow`` package) so analytics jobs only scan
+the columns they need. Optional libraries are only required when the
+matching format is asked for.
+"""
+
+import gzip
+import io
+import json
+from contextlib import contextmanager
+
+from src.core.blob_store import rehydrate
+from src.core.jsonl_writer import WRITE_BUFFER_SIZE
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+# File name suffix added to the JSONL output for each compression
+COMPRESSIONS = {
+    None: "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+EXPORT_FORMATS = {
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+# Rows and content bytes buffered before a batch is written to an export
+EXPORT_BATCH_ROWS = 4096
+EXPORT_BATCH_BYTES = 64 * 1024 * 1024
+
+
+def check_compression(compression):
+    """
+    Validate a compression name.
+
+    Args:
+        compression (str): ``None``, ``"gzip"`` or ``"zstd"``
+
+    Raises:
+        ValueError: If the name is unknown or its library is not installed
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown output compression: {compression!r}")
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd output needs the zstandard package to be installed")
+
+
+def check_export_format(export_format):
+    """
+    Validate a columnar export format.
+
+    Args:
+        export_format (str): ``"parquet"`` or ``"arrow"``
+
+    Raises:
+        ValueError: If the format is unknown or pyarrow is not installed
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format!r}")
+    if pyarrow is None:
+        raise ValueError(f"{export_format} export needs the pyarrow package to be installed")
+
+
+def compression_of(path):
+    """str: Compression implied by a file name, or None for plain JSONL."""
+    for compression, suffix in COMPRESSIONS.items():
+        if suffix and str(path).endswith(suffix):
+            return compression
+    return None
+
+
+def is_stream_target(target):
+    """bool: Whether an output target is a file descriptor or open stream rather than a path."""
+    return isinstance(target, int) or hasattr(target, "write")
+
+
+@contextmanager
+def open_output(target, compression=None):
+    """
+    Open a JSONL output for writing, compressing it if asked to.
+
+    Args:
+        target (Path, int or BinaryIO): Destination file, or a file
+            descriptor or binary stream such as ``sys.stdout.buffer`` to
+            stream the records to; descriptors and streams are flushed but
+            left open
+        compression (str): ``None``, ``"gzip"`` or ``"zstd"``
+
+    Yields:
+        BinaryIO: Buffered binary stream; closing it finishes the compressed
+        frame
+    """
+    check_compression(compression)
+    if hasattr(target, "write"):
+        raw = target
+    else:
+        raw = open(target, "wb", buffering=WRITE_BUFFER_SIZE,
+                   closefd=not isinstance(target, int))
+    try:
+        if compression is None:
+            yield raw
+        else:
+            if compression == "gzip":
+                compressed = gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=GZIP_LEVEL)
+            else:
+                compressed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(
+                    raw, closefd=False
+                )
+            # Batch small record writes before they reach the compressor
+            with io.BufferedWriter(compressed, WRITE_BUFFER_SIZE) as stream:
+                yield stream
+        raw.flush()
+    finally:
+        if raw is not target:
+            raw.close()
+
+
+def open_jsonl(path):
+    """
+    Open a JSONL output file for reading, decompressing it if needed.
+
+    Args:
+        path (Path): Plain, ``.gz`` or ``.zst`` JSONL file
+
+    Returns:
+        BinaryIO: Stream of uncompressed JSONL bytes
+    """
+    compression = compression_of(path)
+    check_compression(compression)
+    if compression == "gzip":
+        return gzip.open(path, "rb")
+    if compression == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+    return open(path, "rb")
+
+
+def record_row(record):
+    """
+    Flatten a JSONL record into an export row.
+
+    Args:
+        record (dict): Record as written by the extractor
+
+    Returns:
+        dict: Values for the export columns. ``size`` is the UTF-8 size of
+        the stored content
+    """
+    metadata = record.get("metadata", {})
+    content = record.get("content")
+    return {
+        "path": metadata.get("path", record.get("path")),
+        "type": record["type"],
+        "language": metadata.get("language"),
+        "size": len(content.encode("utf-8")) if content is not None else None,
+        "content": content,
+        "chunk": metadata.get("chunk"),
+        "byte_offset": metadata.get("byte_offset"),
+    }
+
+
+def export_schema():
+    """pyarrow.Schema: Columns of the Parquet and Arrow exports."""
+    return pyarrow.schema([
+        ("path", pyarrow.string()),
+        ("type", pyarrow.string()),
+        ("language", pyarrow.string()),
+        ("size", pyarrow.int64()),
+        ("content", pyarrow.large_string()),
+        ("chunk", pyarrow.int32()),
+        ("byte_offset", pyarrow.int64()),
+    ])
+
+
+def export_columnar(jsonl_path, export_path, export_format="parquet",
+                    batch_rows=EXPORT_BATCH_ROWS, batch_bytes=EXPORT_BATCH_BYTES,
+                    blob_store=None):
+    """
+    Convert an extractor JSONL output into a columnar file.
+
+    The input is streamed and written in batches, so memory use is bounded
+    by the batch size rather than by the size of the repository.
+
+    Args:
+        jsonl_path (Path): JSONL output, optionally compressed
+        export_path (Path): Destination file
+        export_format (str): ``"parquet"`` or ``"arrow"`` (IPC file format)
+        batch_rows (int): Rows per written batch
+        batch_bytes (int): Content bytes after which a batch is written early
+        blob_store (BlobStore): Store holding the content of a deduplicated
+            output, which is then exported in full
+
+    Returns:
+        int: Number of rows exported
+    """
+    check_export_format(export_format)
+    schema = export_schema()
+    if export_format == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(str(export_path), schema, compression="zstd")
+    else:
+        writer = pyarrow.ipc.new_file(str(export_path), schema)
+
+    columns = {name: [] for name in schema.names}
+    buffered = 0
+    count = 0
+
+    def flush():
+        writer.write_table(pyarrow.Table.from_pydict(columns, schema=schema))
+        for values in columns.values():
+            values.clear()
+
+    with writer, open_jsonl(jsonl_path) as source:
+        for line in source:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if blob_store is not None:
+                record = rehydrate(record, blob_store)
+            row = record_row(record)
+            for name, value in row.items():
+                columns[name].append(value)
+            count += 1
+            buffered += row["size"] or 0
+            if len(columns["path"]) >= batch_rows or buffered >= batch_bytes:
+                flush()
+                buffered = 0
+        if columns["path"] or not count:
+            flush()
+    return count
@@ -0,0 +1,329 @@
+"""
+Random-access index for extracted JSONL files.
+
+Next to each uncompressed ``{repo}_contents.jsonl`` the extractor writes a
+sidecar ``{repo}_contents.index.tsv`` mapping every path to the byte offset
+and length of its record(s), plus the record type and language. The index
+lines are sorted by path, so ``OutputReader`` can binary search the
+memory-mapped index and then slice the memory-mapped output: looking up one
+file costs a handful of page reads no matter how large the output is.
+"""
+
+import json
+import mmap
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from src.core.blob_store import rehydrate
+
+INDEX_VERSION = 1
+_HEADER = b"#github-extractor-index"
+
+# Keys are read from the head of each record, so the content is never parsed
+_TYPE = re.compile(rb'^\{"type":\s*"(\w+)"')
+_PATH = re.compile(rb'"path":\s*("(?:[^"\\]|\\.)*")')
+_LANGUAGE = re.compile(rb'"language":\s*("(?:[^"\\]|\\.)*"|null)')
+_HEAD_SIZE = 4096
+
+_ESCAPES = (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r"))
+
+
+def index_path(output_file):
+    """Path of the index kept next to an output file."""
+    output_file = Path(output_file)
+    return output_file.with_name(f"{output_file.stem}.index.tsv")
+
+
+def _escape(path):
+    for char, escaped in _ESCAPES:
+        path = path.replace(char, escaped)
+    return path.encode("utf-8")
+
+
+def _unescape(field):
+    return re.sub(r"\\(.)", lambda m: {"t": "\t", "n": "\n", "r": "\r"}.get(m[1], m[1]),
+                  field.decode("utf-8"))
+
+
+@dataclass
+class IndexEntry:
+    """Where a file's records live in the output."""
+
+    path: str
+    offset: int
+    length: int
+    type: str
+    language: Optional[str] = None
+
+    def to_line(self):
+        fields = [_escape(self.path), b"%d" % self.offset, b"%d" % self.length,
+                  self.type.encode("ascii"), _escape(self.language or "")]
+        return b"\t".join(fields) + b"\n"
+
+    @classmethod
+    def from_line(cls, line):
+        path, offset, length, record_type, language = line.rstrip(b"\n").split(b"\t")
+        return cls(_unescape(path), int(offset), int(length), record_type.decode("ascii"),
+                   _unescape(language) or None)
+
+
+def describe_record(data, start, end):
+    """Get ``(type, path, language)`` of the record at ``data[start:end]``."""
+    head = data[start:min(end, start + _HEAD_SIZE)]
+    record_type, path, language = _TYPE.match(head), _PATH.search(head), _LANGUAGE.search(head)
+    if record_type is None or path is None:
+        # Unusually long metadata, fall back to parsing the whole record
+        record = json.loads(data[start:end])
+        metadata = record.get("metadata", {})
+        return (record["type"], metadata.get("path", record.get("path")),
+                metadata.get("language"))
+    return (record_type[1].decode("ascii"), json.loads(path[1]),
+            json.loads(language[1]) if language else None)
+
+
+def iter_spans(output_file):
+    """
+    Scan an output file for the records of each path.
+
+    Consecutive records of the same path (chunks of one file) are merged
+    into a single span.
+
+    Args:
+        output_file (Path): Uncompressed JSONL output
+
+    Yields:
+        IndexEntry: One entry per path, in output order
+    """
+    with open(output_file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            current = None
+            position = 0
+            size = len(data)
+            while position < size:
+                end = data.find(b"\n", position)
+                end = size if end == -1 else end + 1
+                record_type, path, language = describe_record(data, position, end)
+                if current is not None and current.path == path:
+                    current.length = end - current.offset
+                else:
+                    if current is not None:
+                        yield current
+                    current = IndexEntry(path, position, end - position, record_type, language)
+                position = end
+            if current is not None:
+                yield current
+
+
+class IndexBuilder:
+    """
+    Collects index entries while an output is written.
+
+    Pass it to ``JsonlWriter`` so every write is described from the bytes
+    already in memory, then hand ``entries`` to ``build_index`` instead of
+    scanning the finished output again.
+    """
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, data, offset):
+        """
+        Account for record line(s) written at ``offset``.
+
+        Args:
+            data (bytes): Complete lines, all belonging to one path
+            offset (int): Byte offset of ``data`` in the output
+        """
+        end = data.find(b"\n")
+        end = len(data) if end == -1 else end + 1
+        record_type, path, language = describe_record(data, 0, end)
+        last = self.entries[-1] if self.entries else None
+        if last is not None and last.path == path and last.offset + last.length == offset:
+            last.length += len(data)
+        else:
+            self.entries.append(IndexEntry(path, offset, len(data), record_type, language))
+
+
+def build_index(output_file, entries=None):
+    """
+    Write the sidecar index for an output file.
+
+    Args:
+        output_file (Path): Uncompressed JSONL output
+        entries (Iterable[IndexEntry]): Spans collected by an
+            ``IndexBuilder`` while writing; the output is scanned with
+            ``iter_spans`` if omitted
+
+    Returns:
+        int: Number of indexed paths
+    """
+    output_file = Path(output_file)
+    if entries is None:
+        entries = iter_spans(output_file)
+    entries = sorted(entries, key=lambda entry: _escape(entry.path))
+    path = index_path(output_file)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "wb") as f:
+        f.write(b"%s %d %d\n" % (_HEADER, INDEX_VERSION, output_file.stat().st_size))
+        for entry in entries:
+            f.write(entry.to_line())
+    os.replace(temp_path, path)
+    return len(entries)
+
+
+class OutputReader:
+    """Random access to the records of an indexed JSONL output."""
+
+    def __init__(self, output_file, blob_store=None):
+        """
+        Map an output file and its index.
+
+        Args:
+            output_file (Path): Uncompressed JSONL output with an index
+            blob_store (BlobStore): Store holding the content of a
+                deduplicated output; ``records`` and ``content`` then return
+                regular records
+
+        Raises:
+            ValueError: If the index is missing, of another version, or was
+                built for a different version of the output
+        """
+        self.output_file = Path(output_file)
+        self.blob_store = blob_store
+        self._files = []
+        self._maps = []
+        try:
+            self._output = self._map(self.output_file)
+            self._index = self._map(index_path(self.output_file))
+            header = self._index[:self._index.find(b"\n") + 1]
+            fields = header.split()
+            if (len(fields) != 3 or fields[0] != _HEADER or int(fields[1]) != INDEX_VERSION
+                    or int(fields[2]) != len(self._output)):
+                raise ValueError(f"Index of {self.output_file} is stale, rebuild it")
+            self._start = len(header)
+        except (OSError, ValueError):
+            self.close()
+            raise
+
+    def _map(self, path):
+        f = open(path, "rb")
+        self._files.append(f)
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(data)
+        return data
+
+    def _line_end(self, position):
+        end = self._index.find(b"\n", position)
+        return len(self._index) if end == -1 else end + 1
+
+    def _bisect(self, key):
+        # Offset of the first index line whose path sorts at or after key
+        low, high = self._start, len(self._index)
+        while low < high:
+            middle = (low + high) // 2
+            line = self._index.rfind(b"\n", low, middle) + 1 or low
+            if self._index[line:self._index.find(b"\t", line)] < key:
+                low = self._line_end(line)
+            else:
+                high = line
+        return low
+
+    def get(self, path):
+        """
+        Look up a path in the index.
+
+        Args:
+            path (str): File path relative to the repository root
+
+        Returns:
+            IndexEntry: Its entry, or None if the output has no such file
+        """
+        key = _escape(path)
+        position = self._bisect(key)
+        if position >= len(self._index):
+            return None
+        line = self._index[position:self._line_end(position)]
+        if line.split(b"\t", 1)[0] != key:
+            return None
+        return IndexEntry.from_line(line)
+
+    def raw(self, entry):
+        """bytes: Encoded record line(s) of an index entry."""
+        return self._output[entry.offset:entry.offset + entry.length]
+
+    def records(self, path):
+        """
+        Read the records of one file.
+
+        Args:
+            path (str): File path relative to the repository root
+
+        Returns:
+            list: Its records (several for a chunked file), empty if absent
+        """
+        entry = self.get(path)
+        if entry is None:
+            return []
+        records = [json.loads(line) for line in self.raw(entry).splitlines()]
+        if self.blob_store is not None:
+            records = [rehydrate(record, self.blob_store) for record in records]
+        return records
+
+    def content(self, path):
+        """
+        Read the text content of one file, joining its chunks.
+
+        Args:
+            path (str): File path relative to the repository root
+
+        Returns:
+            str: The content, or None for missing, binary or unreadable files
+        """
+        records = self.records(path)
+        if not records or records[0]["type"] not in ("file", "chunk"):
+            return None
+        return "".join(record["content"] for record in records)
+
+    def query(self, prefix="", language=None):
+        """
+        List indexed files by path prefix and/or language.
+
+        Args:
+            prefix (str): Only paths starting with this, e.g. ``"src/"``
+            language (str): Only text files detected as this language
+
+        Yields:
+            IndexEntry: Matching entries in path order
+        """
+        key = _escape(prefix)
+        position = self._bisect(key)
+        while position < len(self._index):
+            end = self._line_end(position)
+            line = self._index[position:end]
+            if not line.startswith(key):
+                break
+            entry = IndexEntry.from_line(line)
+            if language is None or entry.language == language:
+                yield entry
+            position = end
+
+    def close(self):
+        """Unmap the files."""
+        for data in self._maps:
+            data.close()
+        for f in self._files:
+            f.close()
+        self._maps, self._files = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,83 @@
+"""
+Parallel decoding and serialization of archive members.
+
+Building records (UTF-8 decoding, language detection, JSON encoding) is
+CPU-bound, so for large repositories it is spread across a process pool.
+Each worker opens the downloaded zip itself and reads the members it is
+given by name; only the finished, encoded JSONL lines travel back to the
+parent process, which writes them out.
+"""
+
+import multiprocessing
+import os
+import zipfile
+
+from src.core.archive import ArchiveMember
+from src.core.records import error_record
+
+ORDERS = ("sorted", "completion")
+DEFAULT_CHUNKSIZE = 32
+
+_worker = {}
+
+
+def default_workers():
+    """int: Number of worker processes to use when none is configured."""
+    return os.cpu_count() or 1
+
+
+def _init_worker(zip_path, member_record, encode_record):
+    _worker["zip_ref"] = zipfile.ZipFile(zip_path)
+    _worker["member_record"] = member_record
+    _worker["encode_record"] = encode_record
+
+
+def _process(task):
+    archive_name, path, size = task
+    zip_ref = _worker["zip_ref"]
+    member = ArchiveMember(path, size, opener=lambda: zip_ref.open(archive_name, "r"))
+    try:
+        records = _worker["member_record"](member)
+    except Exception as e:
+        records = error_record(path, e, size)
+    if isinstance(records, dict):
+        records = [records]
+    line = b"".join(_worker["encode_record"](record) for record in records)
+    return path, records[0]["type"], line
+
+
+def map_members(zip_path, members, member_record, encode_record, workers, order="sorted",
+                chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Build and encode records for zip members on a process pool.
+
+    Args:
+        zip_path (Path): Zip archive the members belong to
+        members (Iterable[ArchiveMember]): Members to process
+        member_record (Callable[[ArchiveMember], dict]): Reads a member and
+            builds its record, or a list of records for a chunked file; must
+            be a module-level function (or a partial of one) so it can be
+            pickled
+        encode_record (Callable[[dict], bytes]): Record serializer; must be a
+            module-level function
+        workers (int): Number of worker processes
+        order (str): ``"sorted"`` yields results in the order of
+            ``members``; ``"completion"`` yields them as soon as they are ready
+        chunksize (int): Members handed to a worker at a time
+
+    Yields:
+        tuple: ``(path, record_type, line)`` for each member, where ``line``
+        holds all of the member's encoded records
+    """
+    if order not in ORDERS:
+        raise ValueError(f"Unknown record order: {order!r}")
+    tasks = ((member.archive_name, member.path, member.size) for member in members)
+    with multiprocessing.Pool(
+        workers, initializer=_init_worker,
+        initargs=(str(zip_path), member_record, encode_record),
+    ) as pool:
+        if order == "sorted":
+            results = pool.imap(_process, tasks, chunksize)
+        else:
+            results = pool.imap_unordered(_process, tasks, chunksize)
+        yield from results
@@ -0,0 +1,117 @@
+"""
+Overlapping archive downloads with archive processing.
+
+``DownloadPipe`` moves the network reads onto a background thread and
+exposes the received bytes as a readable file object. A streaming archive
+reader (``tarfile`` in ``"r|gz"`` mode) can then decode entries while the
+rest of the archive is still arriving.
+"""
+
+import queue
+import threading
+
+_EOF = object()
+
+
+class DownloadPipe:
+    """Readable file object fed by a background download thread."""
+
+    def __init__(self, chunks, max_buffered_chunks=256, on_chunk=None):
+        """
+        Initialize the pipe.
+
+        Args:
+            chunks (Iterable[bytes]): Source of downloaded chunks, typically
+                ``response.iter_content(...)``
+            max_buffered_chunks (int): How many chunks may be queued before
+                the download thread blocks
+            on_chunk (Callable[[int], None]): Called from the download thread
+                with the size of every received chunk
+        """
+        self._chunks = chunks
+        self._queue = queue.Queue(maxsize=max_buffered_chunks)
+        self._on_chunk = on_chunk
+        self._buffer = bytearray()
+        self._eof = False
+        self._error = None
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+
+    def start(self):
+        """Start downloading in the background."""
+        self._thread.start()
+        return self
+
+    def _put(self, item):
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _pump(self):
+        try:
+            for chunk in self._chunks:
+                if not chunk:
+                    continue
+                if self._on_chunk:
+                    self._on_chunk(len(chunk))
+                if not self._put(bytes(chunk)):
+                    return
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(_EOF)
+
+    def _fill(self, size):
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            item = self._queue.get()
+            if item is _EOF:
+                self._eof = True
+                if self._error is not None:
+                    raise self._error
+            else:
+                self._buffer += item
+
+    def read(self, size=-1):
+        """
+        Read up to ``size`` bytes, blocking until they have been downloaded.
+
+        Args:
+            size (int): Maximum number of bytes to return, or -1 for all
+
+        Returns:
+            bytes: Downloaded data; empty once the download is complete
+        """
+        if self._closed.is_set():
+            raise ValueError("read from closed DownloadPipe")
+        if size is None:
+            size = -1
+        if size < 0 or len(self._buffer) < size:
+            self._fill(size)
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+    def close(self):
+        """Stop the download thread and drop any buffered data."""
+        self._closed.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join(timeout=1)
+        self._buffer.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
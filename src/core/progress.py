@@ -0,0 +1,209 @@
+"""
+Structured, throttled progress reporting.
+
+The extractors count downloaded bytes and processed files on a
+``ProgressReporter`` instead of printing to stdout. Counting is cheap;
+subscribers receive a ``ProgressEvent`` snapshot at most once per
+``interval`` seconds, plus one on every phase change, so a 100k-file
+repository produces a handful of updates per second rather than one write
+per file or per 8 KB chunk. The CLI renders events with ``ConsoleProgress``
+and the GUIs turn them into progress bar updates.
+"""
+
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+PHASES = ("resolving", "downloading", "processing", "done", "failed", "cancelled")
+FINAL_PHASES = ("done", "failed", "cancelled")
+# Minimum time between two progress events within a phase, in seconds
+DEFAULT_INTERVAL = 0.1
+
+
+@dataclass(frozen=True)
+class ProgressEvent:
+    """Snapshot of an extraction's progress."""
+
+    phase: str
+    downloaded: int
+    download_total: Optional[int]
+    files: int
+    elapsed: float
+    # Download speed in bytes per second, and processed files per second
+    rate: float
+    file_rate: float
+    # Seconds until the download completes, if its size is known
+    eta: Optional[float]
+
+    @property
+    def percent(self):
+        """float: Download progress in percent, or None if the size is unknown."""
+        if not self.download_total:
+            return None
+        return min(100.0, self.downloaded * 100 / self.download_total)
+
+
+class ProgressReporter:
+    """Counts extraction progress and notifies subscribers, throttled.
+
+    The download may run on another thread than the processing (see the tar
+    engine), so counters can be updated from two threads; subscribers are
+    called with a lock held and never concurrently.
+    """
+
+    def __init__(self, callback=None, interval=DEFAULT_INTERVAL, clock=time.monotonic):
+        """
+        Initialize the reporter.
+
+        Args:
+            callback (Callable[[ProgressEvent], None]): Optional first subscriber
+            interval (float): Minimum seconds between events within a phase
+            clock (Callable[[], float]): Monotonic time source
+        """
+        self.interval = interval
+        self.clock = clock
+        self.subscribers = [callback] if callback is not None else []
+        self.phase = PHASES[0]
+        self.downloaded = 0
+        self.download_total = None
+        self.files = 0
+        self._lock = threading.Lock()
+        self._started = clock()
+        self._download_started = None
+        self._files_started = None
+        self._next_event = 0.0
+
+    def subscribe(self, callback):
+        """Add a subscriber called with every ``ProgressEvent``."""
+        self.subscribers.append(callback)
+
+    def start_download(self, total=None):
+        """
+        Enter the ``downloading`` phase.
+
+        Args:
+            total (int): Archive size in bytes, if known
+        """
+        self.download_total = total or None
+        self._download_started = self.clock()
+        self.set_phase("downloading")
+
+    def start_processing(self):
+        """Enter the ``processing`` phase; the download may still be running."""
+        self._files_started = self.clock()
+        self.set_phase("processing")
+
+    def finish(self, success=True, cancelled=False):
+        """Enter the final ``done``, ``failed`` or ``cancelled`` phase."""
+        if cancelled:
+            self.set_phase("cancelled")
+        else:
+            self.set_phase("done" if success else "failed")
+
+    def set_phase(self, phase):
+        """Switch to another phase and notify subscribers immediately."""
+        if phase not in PHASES:
+            raise ValueError(f"Unknown progress phase: {phase!r}")
+        self.phase = phase
+        self.emit()
+
+    def add_bytes(self, count):
+        """Count downloaded bytes; usable directly as an ``on_chunk`` callback."""
+        self.downloaded += count
+        if self.clock() >= self._next_event:
+            self.emit()
+
+    def add_file(self, count=1):
+        """Count processed files."""
+        self.files += count
+        if self.clock() >= self._next_event:
+            self.emit()
+
+    def snapshot(self):
+        """ProgressEvent: The current progress."""
+        now = self.clock()
+        rate = file_rate = 0.0
+        eta = None
+        if self._download_started is not None and now > self._download_started:
+            rate = self.downloaded / (now - self._download_started)
+            if self.download_total and rate:
+                eta = max(0.0, (self.download_total - self.downloaded) / rate)
+        if self._files_started is not None and now > self._files_started:
+            file_rate = self.files / (now - self._files_started)
+        return ProgressEvent(self.phase, self.downloaded, self.download_total, self.files,
+                             now - self._started, rate, file_rate, eta)
+
+    def emit(self):
+        """Notify subscribers of the current progress."""
+        with self._lock:
+            self._next_event = self.clock() + self.interval
+            event = self.snapshot()
+            for callback in self.subscribers:
+                callback(event)
+
+
+def format_bytes(size):
+    """str: Human-readable byte count, e.g. ``"3.2 MB"``."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def describe_event(event):
+    """
+    Render a progress event as one line of text.
+
+    Args:
+        event (ProgressEvent): Event to describe
+
+    Returns:
+        str: e.g. ``"Downloading: 42.0% of 12.5 MB (3.1 MB/s, ETA 2s)"``
+    """
+    if event.phase == "downloading":
+        speed = f"{format_bytes(event.rate)}/s"
+        if event.percent is None:
+            return f"Downloading: {format_bytes(event.downloaded)} ({speed})"
+        eta = f", ETA {event.eta:.0f}s" if event.eta is not None else ""
+        return (f"Downloading: {event.percent:.1f}% of {format_bytes(event.download_total)} "
+                f"({speed}{eta})")
+    if event.phase == "processing":
+        line = f"Processing: {event.files} files ({event.file_rate:.0f} files/s)"
+        if event.download_total and event.downloaded < event.download_total:
+            line += f", downloaded {event.percent:.1f}%"
+        return line
+    if event.phase in FINAL_PHASES:
+        return (f"{event.phase.capitalize()}: {event.files} files, "
+                f"{format_bytes(event.downloaded)} downloaded in {event.elapsed:.1f}s")
+    return f"{event.phase.capitalize()}..."
+
+
+class ConsoleProgress:
+    """Subscriber that redraws a single status line on a text stream."""
+
+    def __init__(self, stream=None):
+        """
+        Initialize the renderer.
+
+        Args:
+            stream (TextIO): Destination, the current ``sys.stdout`` by default
+        """
+        self.stream = stream
+        self._phase = None
+        self._width = 0
+
+    def __call__(self, event):
+        stream = self.stream or sys.stdout
+        if self._phase is not None and event.phase != self._phase:
+            stream.write("\n")
+            self._width = 0
+        self._phase = event.phase
+        line = describe_event(event)
+        # Pad over the rest of a longer previous line
+        stream.write(f"\r{line:<{self._width}}")
+        self._width = len(line)
+        if event.phase in FINAL_PHASES:
+            stream.write("\n")
+        stream.flush()
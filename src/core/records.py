@@ -0,0 +1,121 @@
+"""
+Builders for the JSONL records written by the extractor.
+
+The record layouts here are the on-disk format consumed downstream, so keep
+them stable.
+"""
+
+
+def decode_text(data, errors="strict"):
+    """
+    Decode file bytes the same way ``Path.read_text(encoding="utf-8")`` does.
+
+    Args:
+        data (bytes): Raw file content
+        errors (str): Codec error handler, as for ``bytes.decode``
+
+    Returns:
+        str: Decoded text with universal newlines applied
+
+    Raises:
+        UnicodeDecodeError: If the content is not valid UTF-8
+    """
+    text = data.decode("utf-8", errors)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def count_lines(text):
+    """
+    Count the lines of text the way ``decode_text`` splits them.
+
+    Args:
+        text (str): Decoded text, with or without universal newlines applied
+
+    Returns:
+        int: Number of ``\\n``, ``\\r\\n`` and lone ``\\r`` line breaks
+    """
+    return text.count("\n") + text.count("\r") - text.count("\r\n")
+
+
+def file_record(name, path, language, content, size=None):
+    """Build the record for a text file; ``size`` is the raw file size in bytes."""
+    return {
+        "type": "file",
+        "metadata": {
+            "name": name,
+            "path": path,
+            "language": language,
+            "size": size,
+        },
+        "content": content,
+    }
+
+
+def blob_file_record(name, path, language, digest, size=None):
+    """
+    Build the record for a text file whose content lives in a ``BlobStore``.
+
+    Rehydrating it, by replacing ``blob`` with the stored content, gives the
+    same record as ``file_record``.
+    """
+    return {
+        "type": "file",
+        "metadata": {
+            "name": name,
+            "path": path,
+            "language": language,
+            "size": size,
+        },
+        "blob": digest,
+    }
+
+
+def chunk_record(name, path, language, content, index, byte_offset, line_offset, last,
+                 size=None):
+    """
+    Build the record for one piece of a text file split into chunks.
+
+    ``byte_offset`` is the chunk's position in the raw file and
+    ``line_offset`` the number of lines before it; ``last`` marks the final
+    chunk of the file and ``size`` is the size of the whole file.
+    """
+    return {
+        "type": "chunk",
+        "metadata": {
+            "name": name,
+            "path": path,
+            "language": language,
+            "size": size,
+            "chunk": index,
+            "byte_offset": byte_offset,
+            "line_offset": line_offset,
+            "last": last,
+        },
+        "content": content,
+    }
+
+
+def binary_record(name, path, size=None):
+    """Build the record for a file that could not be decoded as text."""
+    return {
+        "type": "binary",
+        "name": name,
+        "path": path,
+        "size": size,
+        "display": f"// Binary File: {path}",
+        "content": None,
+        "error": "Binary file"
+    }
+
+
+def error_record(path, error, size=None):
+    """Build the record for a file that could not be read."""
+    return {
+        "type": "error",
+        "path": str(path),
+        "size": size,
+        "display": f"// Error in file: {path}",
+        "error": f"Error reading file: {str(error)}"
+    }
@@ -0,0 +1,318 @@
+"""
+Single-pass repository statistics.
+
+``RepositoryStats`` accumulates file counts, bytes and line counts per
+language, the largest files and per-directory totals one file at a time, so
+it can be fed from the archive members, from a JSONL output, or inline
+while the extractor writes its records. Memory use does not grow with the
+number of files: only the top ``top_files`` files and directories up to
+``directory_depth`` levels deep are kept.
+
+Every source classifies and counts files the way the extractor writes them:
+files are binary unless they decode as UTF-8 in full, lines are counted with
+universal newlines, and sizes are those of the raw files. The one exception
+is an output written with ``max_record_size``, where invalid bytes after the
+first chunk are replaced instead of making the file binary.
+"""
+
+import codecs
+import heapq
+import json
+import os
+import re
+import zipfile
+from itertools import chain
+
+from src.core.archive import ArchiveMember, iter_zip_members
+from src.core.binary_detection import SNIFF_SIZE, is_known_binary, looks_binary
+from src.core.blob_store import rehydrate
+from src.core.chunking import iter_blocks
+from src.core.languages import detect_language
+from src.core.output_index import describe_record
+from src.core.records import count_lines
+
+DEFAULT_TOP_FILES = 20
+DEFAULT_DIRECTORY_DEPTH = 2
+# Key under which files at the repository root are counted
+ROOT_DIRECTORY = "."
+
+_CONTENT_KEY = re.compile(rb'"content":\s*"')
+# A "\n" escape that is not itself an escaped backslash followed by "n"
+_ESCAPED_NEWLINE = re.compile(rb'(?<!\\)(?:\\\\)*\\n')
+_BLOB_KEY = re.compile(rb'"blob":\s*"([0-9a-f]+)"')
+
+
+def count_encoded_lines(line, blob_store=None):
+    """
+    Count the newlines in the content of an encoded record without decoding it.
+
+    Args:
+        line (bytes): One or more encoded JSONL records
+        blob_store (BlobStore): Store to read the content of deduplicated
+            records from; they count as empty without one
+
+    Returns:
+        int: Number of newline characters in their ``content`` strings
+    """
+    count = 0
+    for record in line.splitlines():
+        match = _CONTENT_KEY.search(record)
+        if match:
+            count += len(_ESCAPED_NEWLINE.findall(record, match.end()))
+        elif blob_store is not None:
+            match = _BLOB_KEY.search(record)
+            if match:
+                count += blob_store.get(match.group(1).decode("ascii")).count(b"\n")
+    return count
+
+
+def scan_member(member):
+    """
+    Classify an archive member and count its lines without holding it in memory.
+
+    Args:
+        member (ArchiveMember): Member to read
+
+    Returns:
+        tuple: ``(record_type, language, lines)`` with the type the
+        extractor would give its record, ``file`` or ``binary``
+    """
+    if is_known_binary(member.path, member.size):
+        return "binary", None, 0
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    lines = 0
+    ends_with_cr = False
+    with member.open() as handle:
+        prefix = handle.read(SNIFF_SIZE)
+        if looks_binary(prefix):
+            return "binary", None, 0
+        try:
+            for block in chain([prefix], iter_blocks(handle)):
+                text = decoder.decode(block)
+                if not text:
+                    continue
+                lines += count_lines(text)
+                if ends_with_cr and text[0] == "\n":
+                    # A CRLF split between two blocks was counted twice
+                    lines -= 1
+                ends_with_cr = text[-1] == "\r"
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return "binary", None, 0
+    return "file", detect_language(member.path, prefix), lines
+
+
+class RepositoryStats:
+    """Streaming accumulator for repository statistics."""
+
+    def __init__(self, top_files=DEFAULT_TOP_FILES, directory_depth=DEFAULT_DIRECTORY_DEPTH):
+        """
+        Initialize empty statistics.
+
+        Args:
+            top_files (int): Number of largest files to keep
+            directory_depth (int): Deepest directory level with its own totals
+        """
+        self.top_files = top_files
+        self.directory_depth = directory_depth
+        self.files = 0
+        self.bytes = 0
+        self.lines = 0
+        self.types = {}
+        self.languages = {}
+        self.directories = {}
+        # Min-heap of (size, path, language) holding the largest files
+        self._largest = []
+
+    def add(self, path, size, record_type="file", language=None, lines=0):
+        """
+        Count one file.
+
+        Args:
+            path (str): File path relative to the repository root
+            size (int): File size in bytes
+            record_type (str): ``file``/``chunk`` for text, ``binary`` or ``error``
+            language (str): Detected language of a text file
+            lines (int): Number of newlines in the file
+        """
+        if record_type == "chunk":
+            record_type = "file"
+        self.files += 1
+        self.bytes += size
+        self.lines += lines
+        self.types[record_type] = self.types.get(record_type, 0) + 1
+
+        if record_type == "file":
+            totals = self.languages.setdefault(language or "text",
+                                               {"files": 0, "bytes": 0, "lines": 0})
+            totals["files"] += 1
+            totals["bytes"] += size
+            totals["lines"] += lines
+
+        parts = path.split("/")[:-1][:self.directory_depth] or [ROOT_DIRECTORY]
+        for depth in range(1, len(parts) + 1):
+            totals = self.directories.setdefault("/".join(parts[:depth]), {"files": 0, "bytes": 0})
+            totals["files"] += 1
+            totals["bytes"] += size
+
+        entry = (size, path, language)
+        if len(self._largest) < self.top_files:
+            heapq.heappush(self._largest, entry)
+        elif entry > self._largest[0]:
+            heapq.heapreplace(self._largest, entry)
+
+    def add_member(self, member):
+        """
+        Count an archive member, streaming its content to count lines.
+
+        Args:
+            member (ArchiveMember): Member to read
+        """
+        record_type, language, lines = scan_member(member)
+        self.add(member.path, member.size, record_type, language, lines)
+
+    def add_record(self, record, size=None, blob_store=None):
+        """
+        Count a decoded JSONL record.
+
+        Each call counts one file; ``stats_from_jsonl`` combines the chunk
+        records of a file before counting it.
+
+        Args:
+            record (dict): Record as written by the extractor
+            size (int): File size in bytes; defaults to the size recorded in
+                the record, or the UTF-8 size of the content for records
+                written before sizes were recorded
+            blob_store (BlobStore): Store holding the content of
+                deduplicated records
+        """
+        if blob_store is not None:
+            record = rehydrate(record, blob_store)
+        metadata = record.get("metadata", {})
+        content = record.get("content") or ""
+        if size is None:
+            size = metadata.get("size", record.get("size"))
+        if size is None:
+            size = len(content.encode("utf-8"))
+        self.add(metadata.get("path", record.get("path")), size, record["type"],
+                 metadata.get("language"), count_lines(content))
+
+    def add_encoded(self, path, size, line, blob_store=None):
+        """
+        Count a file from its already encoded record(s).
+
+        Used inline by the extractor, which knows the file size from the
+        archive; the content is scanned for newline escapes but not decoded.
+
+        Args:
+            path (str): File path relative to the repository root
+            size (int): File size in bytes
+            line (bytes): The file's encoded record(s)
+            blob_store (BlobStore): Store holding the content of
+                deduplicated records
+        """
+        record_type, _, language = describe_record(line, 0, line.find(b"\n") + 1 or len(line))
+        self.add(path, size, record_type, language, count_encoded_lines(line, blob_store))
+
+    def result(self):
+        """
+        Summarize the statistics.
+
+        Returns:
+            dict: ``files_count``, ``size`` and ``lines`` totals,
+            ``languages`` ordered by bytes, ``by_language``, ``by_type``,
+            ``largest_files`` and ``directories``
+        """
+        by_language = dict(sorted(self.languages.items(),
+                                  key=lambda item: (-item[1]["bytes"], item[0])))
+        return {
+            "files_count": self.files,
+            "languages": list(by_language),
+            "size": self.bytes,
+            "lines": self.lines,
+            "by_language": by_language,
+            "by_type": dict(self.types),
+            "largest_files": [{"path": path, "size": size, "language": language}
+                              for size, path, language in sorted(self._largest, reverse=True)],
+            "directories": dict(sorted(self.directories.items())),
+        }
+
+
+def stats_from_directory(root, stats=None):
+    """
+    Collect statistics for an extracted repository directory.
+
+    Args:
+        root (str): Directory to walk
+        stats (RepositoryStats): Accumulator to add to, a new one by default
+
+    Returns:
+        RepositoryStats: The accumulator
+    """
+    stats = stats or RepositoryStats()
+    for directory, subdirectories, filenames in os.walk(root):
+        subdirectories.sort()
+        for filename in sorted(filenames):
+            file_path = os.path.join(directory, filename)
+            relative_path = os.path.relpath(file_path, root).replace(os.sep, "/")
+            member = ArchiveMember(relative_path, os.path.getsize(file_path),
+                                   opener=lambda p=file_path: open(p, "rb"))
+            stats.add_member(member)
+    return stats
+
+
+def stats_from_zip(zip_path, stats=None):
+    """
+    Collect statistics straight from a repository zip archive.
+
+    Args:
+        zip_path (str): GitHub zip archive
+        stats (RepositoryStats): Accumulator to add to, a new one by default
+
+    Returns:
+        RepositoryStats: The accumulator
+    """
+    stats = stats or RepositoryStats()
+    with zipfile.ZipFile(zip_path) as zip_ref:
+        for member in iter_zip_members(zip_ref):
+            stats.add_member(member)
+    return stats
+
+
+def stats_from_jsonl(stream, stats=None, blob_store=None):
+    """
+    Collect statistics from an extractor JSONL output.
+
+    Args:
+        stream (BinaryIO): Uncompressed JSONL stream, see ``open_jsonl``
+        stats (RepositoryStats): Accumulator to add to, a new one by default
+        blob_store (BlobStore): Store holding the content of a deduplicated
+            output
+
+    Returns:
+        RepositoryStats: The accumulator
+    """
+    stats = stats or RepositoryStats()
+    current = None
+    for line in stream:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if record["type"] == "chunk":
+            # Chunks of one file are consecutive; count the file once
+            metadata = record["metadata"]
+            size = len(record["content"].encode("utf-8"))
+            lines = count_lines(record["content"])
+            if current is not None and current[0] == metadata["path"]:
+                current[1] += size
+                current[2] += lines
+            else:
+                current = [metadata["path"], size, lines, metadata.get("language")]
+            if metadata.get("size") is not None:
+                current[1] = metadata["size"]
+            if metadata.get("last"):
+                stats.add(current[0], current[1], "file", current[3], current[2])
+                current = None
+            continue
+        stats.add_record(record, blob_store=blob_store)
+    return stats
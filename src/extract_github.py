@@ -1,157 +1,318 @@
-import json
+import contextlib
+import os
 import requests
 import sys
+import tarfile
 import tempfile
 import time
 import zipfile
 import shutil
+import zlib
+from collections import deque
+from itertools import chain
+from functools import partial
 from pathlib import Path
 
-def extract_repo(repo_url):
-    # Create storage directory if it doesn't exist
+from src.core.archive import iter_tar_members, iter_zip_members
+from src.core.binary_detection import SNIFF_SIZE, is_known_binary, looks_binary
+from src.core.blob_store import content_digest
+from src.core.cancellation import CancellationToken, Cancelled
+from src.core.chunking import iter_blocks, iter_text_chunks
+from src.core.download import DownloadError, expected_total, iter_resumable, range_start
+from src.core.filters import FilterRules, MemberFilter
+from src.core.incremental import (
+    IncrementalUpdate, delta_path, manifest_path, options_fingerprint
+)
+from src.core.jsonl_writer import WRITE_BUFFER_SIZE, JsonlWriter, get_serializer
+from src.core.languages import detect_language
+from src.core.output_formats import (
+    COMPRESSIONS, EXPORT_FORMATS, check_compression, check_export_format, export_columnar,
+    is_stream_target, open_output
+)
+from src.core.output_index import IndexBuilder, build_index
+from src.core.parallel import ORDERS, default_workers, map_members
+from src.core.pipeline import DownloadPipe
+from src.core.progress import ConsoleProgress, ProgressReporter
+from src.core.records import (
+    binary_record, blob_file_record, chunk_record, decode_text, error_record, file_record
+)
+from src.services.github_archive import normalize_repo_url, request_archive
+from src.services.http_session import get_client, github_token
+
+# Archive format downloaded by each extraction engine. "zip" downloads the
+# whole archive before reading it; "tar" streams a tar.gz and processes
+# entries while the download is still in progress.
+ENGINES = {
+    "zip": "zip",
+    "tar": "tar.gz",
+}
+
+def repo_output_name(repo_url):
+    """
+    Name the outputs of a repository are stored under.
+
+    Args:
+        repo_url (str): Repository URL or ``owner/repo``
+
+    Returns:
+        str: Repository name without owner or ``.git`` suffix, as used in
+        ``extracted_repos/{name}_contents.jsonl``
+    """
+    repo_name = repo_url.rstrip('/').split('/')[-1]
+    if repo_name.endswith('.git'):
+        repo_name = repo_name[:-4]
+    return repo_name
+
+def extract_repo(repo_url, engine="zip", cache=None, incremental=False, delta=False,
+                 staging=None, workers=1, order="sorted", filters=None,
+                 max_record_size=None, serializer=None, compression=None, export=None,
+                 stats=None, blob_store=None, output=None, progress=None, cancel_token=None):
+    """
+    Download a repository and write its files as JSONL records.
+
+    Records go to ``extracted_repos/{repo}_contents.jsonl`` unless
+    ``output`` is given. Failures are reported on the console rather than
+    raised; only invalid options raise.
+
+    Args:
+        repo_url (str): Repository URL or ``owner/repo``
+        engine (str): ``"zip"`` or ``"tar"``, see ``ENGINES``
+        cache (ArchiveCache): Reuse unchanged archives from this cache
+        incremental (bool): Rebuild only the records of changed files
+        delta (bool): With ``incremental``, also write a delta file
+        staging (StagingArea): Keep interrupted zip downloads for resuming
+        workers (int): Worker processes building records (zip engine only)
+        order (str): Record order with several workers, see ``ORDERS``
+        filters (FilterRules): Include/exclude rules
+        max_record_size (int): Split larger text files into chunk records
+        serializer (str): Record encoder, see ``get_serializer``
+        compression (str): ``"gzip"`` or ``"zstd"``
+        export (str): Also export to ``"parquet"`` or ``"arrow"``
+        stats (RepositoryStats): Statistics to collect while writing
+        blob_store (BlobStore): Deduplicate content into this store
+        output (int or BinaryIO): File descriptor or binary stream, such as
+            ``sys.stdout.buffer``, to stream the records to instead of
+            writing a file. Progress messages then go to stderr, so the
+            records can be piped straight into another process. Not
+            supported with ``incremental`` or ``export``
+        progress (ProgressReporter): Receives download and processing
+            progress; by default it is drawn as a status line on the console
+        cancel_token (CancellationToken): Cancelling it stops the download
+            or processing at the next chunk or member; the partial output
+            and temporary files are removed and False is returned
+
+    Returns:
+        bool: True if the repository was extracted
+    """
+    if output is not None and (incremental or export is not None):
+        raise ValueError("Streamed output cannot be combined with incremental updates or exports")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown extraction engine: {engine!r}")
+    if order not in ORDERS:
+        raise ValueError(f"Unknown record order: {order!r}")
+    if workers != 1 and engine != "zip":
+        raise ValueError("Parallel processing needs the whole archive on disk (engine='zip')")
+    # Fail on a missing serializer or format library before downloading anything
+    get_serializer(serializer)
+    check_compression(compression)
+    if export is not None:
+        check_export_format(export)
+    if incremental and compression is not None:
+        raise ValueError("Incremental updates need uncompressed output")
+    # Only whole-file downloads can be staged and resumed in a later run;
+    # the tar engine still resumes dropped connections within the run
+    use_staging = staging is not None and engine == "zip"
+    # Skip rules are checked on archive metadata, before any member is read
+    member_filter = MemberFilter(filters or FilterRules())
+    progress = progress or ProgressReporter(ConsoleProgress())
+    cancel_token = cancel_token or CancellationToken()
+    options = (engine, cache, incremental, delta, staging, use_staging, workers, order,
+               member_filter, max_record_size, serializer, compression, export, stats,
+               blob_store, output, progress, cancel_token)
+    # The records own stdout, so keep progress messages out of the stream
+    log = contextlib.redirect_stdout(sys.stderr) if output is not None else contextlib.nullcontext()
+    with log:
+        ok = _extract_repo(repo_url, *options)
+        progress.finish(ok, cancelled=cancel_token.cancelled)
+    return ok
+
+def _extract_repo(repo_url, engine, cache, incremental, delta, staging, use_staging,
+                  workers, order, member_filter, max_record_size, serializer, compression,
+                  export, stats, blob_store, output, progress, cancel_token):
+    def on_chunk(size):
+        progress.add_bytes(size)
+        cancel_token.raise_if_cancelled()
+
+    archive_ext = ENGINES[engine]
+    # Options besides the serializer that change the records
+    record_options = {
+        "max_record_size": max_record_size,
+        "blob_store": str(blob_store.root.resolve()) if blob_store is not None else None,
+    }
     storage_dir = Path("extracted_repos")
-    storage_dir.mkdir(exist_ok=True)
+    if output is None:
+        # Create storage directory if it doesn't exist
+        storage_dir.mkdir(exist_ok=True)
     
     print("\n🔄 Starting repository extraction...")
     
-    # Extract repo name from URL, removing .git if present
-    repo_name = repo_url.rstrip('/').split('/')[-1]
-    if repo_name.endswith('.git'):
-        repo_name = repo_name[:-4]
+    repo_name = repo_output_name(repo_url)
     
-    # Create temporary directory for zip extraction
+    # Create temporary directory for the downloaded archive
     temp_dir = Path(tempfile.mkdtemp())
     zip_path = temp_dir / f"{repo_name}.zip"
-    extract_path = temp_dir / repo_name
     
-    # Remove .git from the URL if present
-    repo_url = repo_url.rstrip('/')
-    if repo_url.endswith('.git'):
-        repo_url = repo_url[:-4]
-    download_url = f"{repo_url}/archive/master.zip"
-    if not download_url.startswith(('http://', 'https://')):
-        download_url = f"https://github.com/{download_url}"
+    repo_url = normalize_repo_url(repo_url)
     
+    response = None
+    cache_writer = None
     try:
-        # Try master branch first, if it fails try main branch
-        print(f"📥 Attempting to download from: {download_url}")
-        response = requests.get(download_url, stream=True)
-        
-        if response.status_code == 404:
-            # Try main branch instead
-            download_url = f"{repo_url}/archive/main.zip"
-            print(f"📥 Repository not found on master branch, trying main: {download_url}")
-            response = requests.get(download_url, stream=True)
+        # Resolve the default branch once and download its archive
+        print(f"📥 Resolving default branch of {repo_url}")
+        response, download_url = request_archive(
+            repo_url, archive_ext, cache=cache,
+            staging=staging if use_staging else None, stream=True
+        )
+        print(f"📥 Downloading from: {download_url}")
+        cancel_token.raise_if_cancelled()
         
         # Check response status and provide detailed error messages
-        if response.status_code == 404:
+        cached_archive = None
+        if response.status_code == 304:
+            cached_archive = cache.open_cached(download_url)
+            print("📦 Archive unchanged since last run, using cached copy")
+        elif response.status_code == 404:
             print(f"❌ Repository not found. Please check if the URL is correct and the repository exists.")
-            return
+            return False
         elif response.status_code == 403:
             print(f"❌ Access forbidden. This might be a private repository or you've hit GitHub's rate limit.")
-            return
-        elif response.status_code != 200:
+            if github_token() is None:
+                print("💡 Set GITHUB_TOKEN (or GH_TOKEN) for a higher rate limit.")
+            return False
+        elif response.status_code not in (200, 206):
             print(f"❌ Failed to download repository. Status code: {response.status_code}")
             print(f"Error message: {response.text}")
-            return
-        
-        # Continue with download if status is 200
-        print(f"✅ Connected successfully to repository")
-        
-        # Download the zip file with progress indicator
-        dot_count = 0
-        total_size = int(response.headers.get('content-length', 0))
-        block_size = 8192
-        progress = 0
-        
-        with open(zip_path, "wb") as file:
-            for chunk in response.iter_content(chunk_size=block_size):
-                if chunk:
-                    file.write(chunk)
-                    progress += len(chunk)
-                    if total_size > 0:
-                        percentage = (progress * 100) / total_size
-                        sys.stdout.write(f"\rDownloading: {percentage:.1f}%")
-                        sys.stdout.flush()
-                    else:
-                        if dot_count % 3 == 0:
-                            sys.stdout.write(".")
-                            sys.stdout.flush()
-                        dot_count += 1
+            return False
+        else:
+            # Continue with download if status is 200 (or 206 when resuming)
+            print(f"✅ Connected successfully to repository")
+            if response.status_code == 206:
+                print(f"⏯️  Resuming interrupted download at {range_start(response)} bytes")
+            block_size = 8192
+            progress.start_download(expected_total(response))
+            chunks = iter_resumable(get_client(), download_url, response, chunk_size=block_size)
+            etag = response.headers.get("ETag")
+            if cache is not None and etag and not use_staging:
+                cache_writer = cache.writer(download_url, etag, archive_ext)
         
-        print("\n📦 Download complete!")
-        
-        # Extract the downloaded zip file
-        print("📂 Extracting files...")
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(temp_dir)
-        
-        # Process each file and write contents to a JSONL file
-        print("📝 Writing contents to file...")
-        output_file = storage_dir / f"{repo_name}_contents.jsonl"
-
-        with open(output_file, "w", encoding="utf-8") as out_file:
-            # Find the actual extracted directory (it might have a different name)
-            extracted_dirs = [d for d in temp_dir.iterdir() if d.is_dir()]
-            if not extracted_dirs:
-                print("❌ No files found in the extracted directory")
-                return
-        
-            extract_path = extracted_dirs[0]  # Use the first directory found
-            print(f"📂 Processing files from: {extract_path}")
-            
-            for file_path in extract_path.rglob("*"):
-                if file_path.is_file():
-                    try:
-                        relative_path = str(file_path.relative_to(extract_path))
-                        
-                        # Skip certain file types and directories
-                        if any(relative_path.startswith(x) for x in ['.git/', 'node_modules/', '.env']):
-                            continue
-                    
-                        try:
-                            content = file_path.read_text(encoding="utf-8")
-                            # Format the content with proper line breaks
-                            formatted_content = content.replace('\n', '\\n')
-                            # Create a JSON object with formatted display
-                            file_data = {
-                                "type": "file",
-                                "metadata": {
-                                    "name": file_path.name,
-                                    "path": relative_path,
-                                    "language": get_file_language(relative_path),  # New helper function
-                                },
-                                "content": content,
-                            }
-                            json.dump(file_data, out_file, ensure_ascii=False, indent=None)
-                            out_file.write('\n')
-                            sys.stdout.write(".")
-                            sys.stdout.flush()
-                        except UnicodeDecodeError:
-                            # Handle binary files
-                            file_data = {
-                                "type": "binary",
-                                "name": file_path.name,
-                                "path": relative_path,
-                                "display": f"// Binary File: {relative_path}",
-                                "content": None,
-                                "error": "Binary file"
-                            }
-                            json.dump(file_data, out_file, ensure_ascii=False)
-                            out_file.write('\n')
-                    
-                    except Exception as e:
-                        error_data = {
-                            "type": "error",
-                            "path": str(relative_path),
-                            "display": f"// Error in file: {relative_path}",
-                            "error": f"Error reading file: {str(e)}"
-                        }
-                        json.dump(error_data, out_file, ensure_ascii=False)
-                        out_file.write('\n')
+        output_file = storage_dir / f"{repo_name}_contents.jsonl{COMPRESSIONS[compression]}"
+        if output is not None:
+            output_file = output
+        # Spans for the sidecar index are collected while the output is written
+        index = IndexBuilder() if output is None and compression is None else None
+
+        if engine == "tar":
+            if cached_archive is not None:
+                source = open(cached_archive, "rb")
+            else:
+                # Decode and serialize entries while the rest of the archive is
+                # still being downloaded on a background thread
+                print("📝 Writing contents to file while downloading...")
+                if cache_writer is not None:
+                    chunks = cache_writer.tee(chunks)
+                source = DownloadPipe(chunks, on_chunk=on_chunk)
+            progress.start_processing()
+            with source:
+                with tarfile.open(fileobj=source, mode="r|gz") as tar_ref:
+                    count = write_output(
+                        member_filter.apply(iter_tar_members(tar_ref)),
+                        output_file, incremental, delta,
+                        partial(write_members, max_record_size=max_record_size, stats=stats,
+                                blob_store=blob_store, progress=progress,
+                                cancel_token=cancel_token),
+                        serializer, compression, record_options, index
+                    )
+                if cache_writer is not None:
+                    # Pull the archive trailer through so the cached copy is complete
+                    while source.read(65536):
+                        cancel_token.raise_if_cancelled()
+                    cache_writer.commit()
+            if not count:
+                print("❌ No files found in the downloaded archive")
+                return False
+        else:
+            if cached_archive is not None:
+                zip_path = cached_archive
+            elif use_staging:
+                # Keep the partial download if this fails so the next run can resume it
+                zip_path = staging.download(
+                    get_client(), download_url, response, "zip",
+                    on_chunk=on_chunk, chunk_size=block_size
+                )
+                if cache is not None and etag:
+                    zip_path = cache.store_file(download_url, etag, "zip", zip_path)
+                    staging.discard(download_url)
+
+                print("\n📦 Download complete!")
+            else:
+                # Download the zip file with progress indicator
+                sink = cache_writer if cache_writer is not None else open(zip_path, "wb")
+                with sink:
+                    for chunk in chunks:
+                        if chunk:
+                            sink.write(chunk)
+                            on_chunk(len(chunk))
+                if cache_writer is not None:
+                    zip_path = cache_writer.path
 
+                print("\n📦 Download complete!")
+
+            # Read members straight out of the archive instead of extracting
+            # everything to disk and walking it again
+            print("📝 Writing contents to file...")
+            progress.start_processing()
+            process = partial(write_members, max_record_size=max_record_size, stats=stats,
+                              blob_store=blob_store, progress=progress,
+                              cancel_token=cancel_token)
+            if workers != 1:
+                process = partial(
+                    write_members_parallel, zip_path=zip_path, workers=workers, order=order,
+                    max_record_size=max_record_size, stats=stats, blob_store=blob_store,
+                    progress=progress, cancel_token=cancel_token
+                )
+            with zipfile.ZipFile(zip_path, "r") as zip_ref:
+                members = list(iter_zip_members(zip_ref))
+                member_filter.preload(members)
+                count = write_output(
+                    member_filter.apply(members), output_file, incremental, delta, process,
+                    serializer, compression, record_options, index
+                )
+            if use_staging:
+                staging.discard(download_url)
+            if not count:
+                print("❌ No files found in the downloaded archive")
+                return False
+
+        if output is not None:
+            print(f"\n✅ Extraction complete! Streamed {count} files")
+            return True
+        if index is not None:
+            # Sidecar index for random access by path, see OutputReader
+            build_index(output_file, index.entries)
         print(f"\n✅ Extraction complete! Saved to {output_file}")
+        if export is not None:
+            cancel_token.raise_if_cancelled()
+            export_path = storage_dir / f"{repo_name}_contents{EXPORT_FORMATS[export]}"
+            rows = export_columnar(output_file, export_path, export, blob_store=blob_store)
+            print(f"📊 Exported {rows} records to {export_path}")
+        return True
         
+    except Cancelled:
+        print("\n⏹️  Extraction cancelled, partial output removed")
+    except BrokenPipeError:
+        print("❌ Output stream was closed before extraction finished")
+    except DownloadError as e:
+        print(f"❌ Download failed: {str(e)}")
     except requests.exceptions.ConnectionError:
         print("❌ Connection error. Please check your internet connection.")
     except requests.exceptions.Timeout:
@@ -161,30 +322,479 @@ def extract_repo(repo_url):
     except Exception as e:
         print(f"❌ Unexpected error: {str(e)}")
     finally:
+        # Release the pooled connection
+        if response is not None:
+            response.close()
+        # Drop a half-written cache entry
+        if cache_writer is not None and cache_writer.path is None:
+            cache_writer.discard()
         # Clean up temporary files if they exist
         if 'temp_dir' in locals():
             try:
                 shutil.rmtree(temp_dir, ignore_errors=True)
             except Exception as e:
                 print(f"Warning: Could not clean up temporary files: {str(e)}")
+    return False
 
-def get_file_language(file_path):
-    extensions = {
-        '.py': 'python',
-        '.js': 'javascript',
-        '.jsx': 'javascript',
-        '.ts': 'typescript',
-        '.tsx': 'typescript',
-        '.html': 'html',
-        '.css': 'css',
-        '.md': 'markdown',
-        '.json': 'json',
-        '.yml': 'yaml',
-        '.yaml': 'yaml',
-        '.sh': 'bash',
-        '.bash': 'bash',
-        '.sql': 'sql',
-        '.txt': 'text',
-    }
-    ext = Path(file_path).suffix.lower()
-    return extensions.get(ext, 'text')
\ No newline at end of file
+def read_member(member, checksum=False):
+    """
+    Read a member's content unless it is recognisably binary.
+
+    Binary files are detected from their extension or from the first
+    ``SNIFF_SIZE`` bytes, so they are never read (or decompressed) in full.
+    Empty files are always read, and give an empty text record.
+
+    Args:
+        member (ArchiveMember): Member to read
+        checksum (bool): Also compute the CRC-32 when the archive does not
+            store one
+
+    Returns:
+        tuple: ``(data, size, crc32)`` where ``data`` is None for binary
+        files and ``crc32`` is None if it was not requested or available
+    """
+    crc32 = member.crc32
+    known_binary = is_known_binary(member.path, member.size)
+    if known_binary and (crc32 is not None or not checksum):
+        return None, member.size, crc32
+
+    with member.open() as handle:
+        prefix = handle.read(SNIFF_SIZE)
+        if known_binary or looks_binary(prefix):
+            if checksum and crc32 is None:
+                # Checksum the rest without holding it in memory
+                crc32 = zlib.crc32(prefix)
+                for block in iter(lambda: handle.read(1024 * 1024), b""):
+                    crc32 = zlib.crc32(block, crc32)
+            return None, member.size, crc32
+        data = prefix + handle.read()
+
+    if checksum and crc32 is None:
+        crc32 = zlib.crc32(data)
+    return data, len(data), crc32
+
+def build_record(member, data, blob_store=None):
+    """
+    Build the JSONL record for an archive member.
+
+    Args:
+        member (ArchiveMember): Member the data was read from
+        data (bytes): Raw file content, or None if it is known to be binary
+        blob_store (BlobStore): When given, text content is stored there
+            once and the record references it by hash
+
+    Returns:
+        dict: A ``file`` record, or a ``binary`` record if the content is not UTF-8
+    """
+    if data is None:
+        return binary_record(member.name, member.path, member.size)
+    if blob_store is not None:
+        return build_blob_record(member, data, blob_store)
+    try:
+        content = decode_text(data)
+    except UnicodeDecodeError:
+        # Handle binary files
+        return binary_record(member.name, member.path, member.size)
+    return file_record(member.name, member.path, content_language(member, data), content,
+                       member.size)
+
+def build_blob_record(member, data, blob_store):
+    """
+    Build a deduplicated record, storing the content if it is new.
+
+    Content already in the store was decoded successfully when it was
+    added, so it is neither decoded nor serialized again.
+
+    Returns:
+        dict: A ``file`` record referencing the blob, or a ``binary`` record
+    """
+    digest = content_digest(data)
+    if not blob_store.has(digest):
+        try:
+            content = decode_text(data)
+        except UnicodeDecodeError:
+            return binary_record(member.name, member.path, member.size)
+        blob_store.put(digest, content.encode("utf-8"))
+    return blob_file_record(member.name, member.path, content_language(member, data), digest,
+                            member.size)
+
+def is_chunked(member, max_record_size):
+    """bool: Whether a member is split into chunk records instead of one record."""
+    return (max_record_size is not None and member.size > max_record_size
+            and not is_known_binary(member.path, member.size))
+
+def iter_chunk_records(member, max_record_size, totals=None):
+    """
+    Read a large member and build its chunk records on the fly.
+
+    Only one chunk of the file is held in memory at a time. Content that
+    sniffs as binary, or whose first chunk is not UTF-8, gives a single
+    ``binary`` record instead; invalid bytes in later chunks are replaced
+    with U+FFFD because the earlier chunks have already been written.
+
+    Args:
+        member (ArchiveMember): Member to read
+        max_record_size (int): Largest chunk content, in raw file bytes
+        totals (dict): Receives the ``size`` and ``crc32`` of the content
+            once it has been read in full
+
+    Yields:
+        dict: ``chunk`` records in file order, or one ``binary`` record
+    """
+    state = {"size": 0, "crc32": 0}
+
+    def checksummed(blocks):
+        for block in blocks:
+            state["size"] += len(block)
+            state["crc32"] = zlib.crc32(block, state["crc32"])
+            yield block
+
+    with member.open() as handle:
+        blocks = checksummed(chain([handle.read(SNIFF_SIZE)], iter_blocks(handle)))
+        prefix = next(blocks)
+        chunks = iter_text_chunks(chain([prefix], blocks), max_record_size)
+        pending = None
+        if not looks_binary(prefix):
+            try:
+                pending = next(chunks)
+            except UnicodeDecodeError:
+                pass
+
+        if pending is None:
+            # Nothing has been emitted yet; checksum the rest if needed
+            if totals is not None:
+                for _ in blocks:
+                    pass
+            yield binary_record(member.name, member.path, member.size)
+        else:
+            language = content_language(member, prefix)
+            index = 0
+            # Hold one chunk back so the final one can be marked as such
+            for chunk in chunks:
+                yield chunk_record(member.name, member.path, language, pending[2],
+                                   index, pending[0], pending[1], last=False, size=member.size)
+                index += 1
+                pending = chunk
+            yield chunk_record(member.name, member.path, language, pending[2],
+                               index, pending[0], pending[1], last=True, size=member.size)
+
+    if totals is not None:
+        totals["size"] = state["size"]
+        totals["crc32"] = member.crc32 if member.crc32 is not None else state["crc32"]
+
+def member_record(member, max_record_size=None, blob_store=None):
+    """
+    Read a member and build its record. See ``read_member`` and ``build_record``.
+
+    Returns:
+        dict: The record, or a list of chunk records for files larger than
+        ``max_record_size``
+    """
+    if is_chunked(member, max_record_size):
+        return list(iter_chunk_records(member, max_record_size))
+    data, _, _ = read_member(member)
+    return build_record(member, data, blob_store)
+
+def write_chunked(member, writer, max_record_size, incremental=None, stats=None):
+    """
+    Stream a large member's chunk records straight to the output.
+
+    Args:
+        member (ArchiveMember): Member to write
+        writer (JsonlWriter): Destination for the records
+        max_record_size (int): Largest chunk content, in raw file bytes
+        incremental (IncrementalUpdate): Optional tracker for the manifest
+        stats (RepositoryStats): Optional statistics to count the file in
+
+    Returns:
+        str: Type of the records written
+    """
+    totals = {} if incremental else None
+    start = writer.offset
+    record_type = language = None
+    lines = 0
+    for record in iter_chunk_records(member, max_record_size, totals):
+        line = writer.encode(record)
+        writer.write_bytes(line)
+        record_type = record["type"]
+        if record_type == "chunk":
+            language = record["metadata"]["language"]
+            lines += record["content"].count("\n")
+        if incremental:
+            incremental.write_delta(member.path, line)
+    if incremental:
+        incremental.track(member.path, totals["size"], totals["crc32"],
+                          (start, writer.offset - start))
+    if stats is not None:
+        stats.add(member.path, member.size, record_type, language, lines)
+    return record_type
+
+def write_members(members, writer, incremental=None, max_record_size=None, stats=None,
+                  blob_store=None, progress=None, cancel_token=None):
+    """
+    Serialize archive members as JSONL records.
+
+    Args:
+        members (Iterable[ArchiveMember]): Files to write, in output order
+        writer (JsonlWriter): Destination for the records
+        incremental (IncrementalUpdate): When given, records of unchanged
+            files are copied from the previous output instead of rebuilt
+        max_record_size (int): Text files larger than this many bytes are
+            streamed as ``chunk`` records of at most this size
+        stats (RepositoryStats): Statistics to count every file in while
+            it is written
+        blob_store (BlobStore): Store text content there and reference it
+            from the records instead of embedding it; chunked files are
+            still written inline
+        progress (ProgressReporter): Counts every processed file
+        cancel_token (CancellationToken): Checked before every member
+
+    Returns:
+        int: Number of members processed
+
+    Raises:
+        Cancelled: If ``cancel_token`` is cancelled
+    """
+    count = 0
+    for member in members:
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        count += 1
+        relative_path = member.path
+        start = writer.offset
+        try:
+            previous = incremental.lookup(relative_path) if incremental else None
+            if previous and member.crc32 is not None and previous.matches(member.size, member.crc32):
+                # Unchanged according to the archive metadata, no need to read it
+                line = incremental.reuse(relative_path, previous, writer)
+                if stats is not None:
+                    stats.add_encoded(relative_path, previous.size, line, blob_store)
+                continue
+
+            if is_chunked(member, max_record_size):
+                write_chunked(member, writer, max_record_size, incremental, stats)
+            else:
+                data, size, crc32 = read_member(member, checksum=incremental is not None)
+                if previous and previous.matches(size, crc32):
+                    line = incremental.reuse(relative_path, previous, writer)
+                    if stats is not None:
+                        stats.add_encoded(relative_path, previous.size, line, blob_store)
+                    continue
+
+                record = build_record(member, data, blob_store)
+                line = writer.encode(record)
+                span = writer.write_bytes(line)
+                if incremental:
+                    incremental.track(relative_path, size, crc32, span, line)
+                if stats is not None:
+                    stats.add_record(record, size, blob_store)
+
+        except Cancelled:
+            # Raised by the download thread while the member was being read
+            raise
+        except Exception as e:
+            line = writer.encode(error_record(relative_path, e, member.size))
+            writer.write_bytes(line)
+            if incremental and member.crc32 is not None:
+                # Keep the error, with any chunks written before it, so an
+                # unchanged file is not read again on the next run
+                incremental.track(relative_path, member.size, member.crc32,
+                                  (start, writer.offset - start), line)
+            if stats is not None:
+                stats.add(relative_path, member.size, "error")
+        finally:
+            if progress is not None:
+                progress.add_file()
+    return count
+
+def write_members_parallel(members, writer, incremental=None, zip_path=None,
+                           workers=None, order="sorted", max_record_size=None, stats=None,
+                           blob_store=None, progress=None, cancel_token=None):
+    """
+    Serialize zip members as JSONL records using a pool of worker processes.
+
+    Args:
+        members (Iterable[ArchiveMember]): Members of the zip at ``zip_path``
+        writer (JsonlWriter): Destination for the records
+        incremental (IncrementalUpdate): When given, records of unchanged
+            files are copied from the previous output instead of rebuilt
+        zip_path (Path): Zip archive the members are read from
+        workers (int): Number of worker processes, defaults to the CPU count
+        order (str): ``"sorted"`` writes records sorted by path;
+            ``"completion"`` writes them as soon as they are built
+        max_record_size (int): Split text files larger than this into
+            ``chunk`` records. Workers build all chunks of a file before
+            sending them back, so use the serial writer when memory is tight
+        stats (RepositoryStats): Statistics to count every file in while
+            it is written
+        blob_store (BlobStore): Store text content there instead of in the
+            records, see ``write_members``
+        progress (ProgressReporter): Counts every processed file
+        cancel_token (CancellationToken): Checked before every member is
+            written; the worker pool is terminated when it is cancelled
+
+    Returns:
+        int: Number of members processed
+
+    Raises:
+        Cancelled: If ``cancel_token`` is cancelled
+    """
+    def reuse(path, previous):
+        line = incremental.reuse(path, previous, writer)
+        if stats is not None:
+            stats.add_encoded(path, previous.size, line, blob_store)
+        if progress is not None:
+            progress.add_file()
+
+    workers = workers or default_workers()
+    count = 0
+    # Members that need rebuilding, and (when sorted) where reused records go
+    pending = []
+    reused = deque()
+    members = sorted(members, key=lambda m: m.path) if order == "sorted" else members
+    for member in members:
+        count += 1
+        previous = incremental.lookup(member.path) if incremental else None
+        if previous and previous.matches(member.size, member.crc32):
+            if order == "sorted":
+                reused.append((len(pending), member.path, previous))
+            else:
+                reuse(member.path, previous)
+            continue
+        pending.append(member)
+
+    sizes = {member.path: (member.size, member.crc32) for member in pending}
+    results = map_members(
+        zip_path, pending,
+        partial(member_record, max_record_size=max_record_size, blob_store=blob_store),
+        writer.encode, workers, order
+    )
+    for index, (path, record_type, line) in enumerate(results):
+        if cancel_token is not None:
+            cancel_token.raise_if_cancelled()
+        # Reused records that sort before this member come first
+        while reused and reused[0][0] == index:
+            _, reused_path, previous = reused.popleft()
+            reuse(reused_path, previous)
+        span = writer.write_bytes(line)
+        size, crc32 = sizes[path]
+        if incremental and (record_type != "error" or crc32 is not None):
+            incremental.track(path, size, crc32, span, line)
+        if stats is not None:
+            stats.add_encoded(path, size, line, blob_store)
+        if progress is not None:
+            progress.add_file()
+    for _, reused_path, previous in reused:
+        reuse(reused_path, previous)
+    return count
+
+def write_output(members, output_file, incremental=False, delta=False,
+                 process=write_members, serializer=None, compression=None, record_options=None,
+                 index=None):
+    """
+    Write the JSONL output for a repository.
+
+    Args:
+        members (Iterable[ArchiveMember]): Files to write, in output order
+        output_file (Path): Destination JSONL file, or a file descriptor or
+            binary stream to stream the records to
+        incremental (bool): Reuse unchanged records from the previous output
+            and keep a manifest for the next run; needs a file path
+        delta (bool): With ``incremental``, also write the added, modified
+            and deleted files to ``{repo}_contents.delta.jsonl``; otherwise a
+            delta left by an earlier run is removed
+        process (Callable): Strategy that serializes the members, called as
+            ``process(members, writer, incremental)``; ``write_members`` or
+            a bound ``write_members_parallel``
+        serializer (str): Record encoder name, see ``get_serializer``
+        compression (str): ``"gzip"`` or ``"zstd"`` to compress the output
+            while it is written; not supported with ``incremental``
+        record_options (dict): With ``incremental``, the options bound into
+            ``process`` that change records, such as ``max_record_size``. A
+            previous output built with other options or another serializer
+            is rebuilt in full
+        index (IndexBuilder): Collects the span of every record written
+            to a file output, for ``build_index``
+
+    Returns:
+        int: Number of members processed
+
+    Raises:
+        Cancelled: If ``process`` was cancelled. A partially written output
+            file is deleted; an incremental update leaves the previous
+            output untouched and deletes the partial delta file
+    """
+    encode = get_serializer(serializer)
+    if not incremental:
+        if is_stream_target(output_file):
+            with open_output(output_file, compression) as stream:
+                return process(members, JsonlWriter(stream, encode))
+        # A full rewrite invalidates any manifest and delta from an earlier run
+        manifest_path(output_file).unlink(missing_ok=True)
+        delta_path(output_file).unlink(missing_ok=True)
+        try:
+            with open_output(output_file, compression) as stream:
+                return process(members, JsonlWriter(stream, encode, index))
+        except Cancelled:
+            output_file.unlink(missing_ok=True)
+            raise
+
+    if compression is not None or is_stream_target(output_file):
+        raise ValueError("Incremental updates need an uncompressed output file")
+    temp_file = output_file.with_name(output_file.name + ".tmp")
+    delta_stream = open(delta_path(output_file), "wb") if delta else None
+    update = IncrementalUpdate(
+        output_file, JsonlWriter(delta_stream, encode) if delta_stream else None,
+        options_fingerprint(serializer=encode.__name__, **(record_options or {}))
+    )
+    try:
+        with open(temp_file, "wb", buffering=WRITE_BUFFER_SIZE) as stream:
+            writer = JsonlWriter(stream, encode, index)
+            count = process(members, writer, update)
+        update.close()
+        os.replace(temp_file, output_file)
+        update.finish(writer.offset)
+        if not delta:
+            # A delta from an earlier run no longer describes this output
+            delta_path(output_file).unlink(missing_ok=True)
+        changes = update.summary()
+        print(f"\n♻️  Reused {changes['unchanged']} unchanged files, rewrote "
+              f"{changes['changed']}, removed {changes['deleted']}")
+        return count
+    except Cancelled:
+        if delta_stream:
+            delta_stream.close()
+            delta_path(output_file).unlink(missing_ok=True)
+        raise
+    finally:
+        update.close()
+        if delta_stream:
+            delta_stream.close()
+        temp_file.unlink(missing_ok=True)
+
+def get_file_language(file_path, prefix=None):
+    """
+    Detect a file's language from its path.
+
+    Args:
+        file_path (str): File path
+        prefix (bytes): Start of the content, searched for a shebang or
+            modeline when the name is not recognized
+
+    Returns:
+        str: Language name, ``"text"`` if it could not be determined
+    """
+    return detect_language(file_path, prefix)
+
+def content_language(member, prefix):
+    """
+    Detect a member's language, looking at its content if the name is unknown.
+
+    Args:
+        member (ArchiveMember): Member being serialized
+        prefix (bytes): Start of its content
+
+    Returns:
+        str: Language name
+    """
+    return get_file_language(member.path, prefix[:SNIFF_SIZE])
@@ -1,36 +1,115 @@
 import sys
 import os
-import threading
-import queue
+from collections import deque
 from pathlib import Path
 from typing import Optional
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QLabel, QLineEdit, QPushButton, QProgressBar, QTextEdit,
-    QFrame, QFileDialog, QMessageBox, QStatusBar, QTabWidget
+    QFrame, QFileDialog, QMessageBox, QStatusBar, QTabWidget, QScrollArea, QSpinBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QUrl
+from PyQt6.QtCore import Qt, pyqtSignal, QObject, QRunnable, QThreadPool, QTimer, QUrl
 from PyQt6.QtGui import QIcon, QPixmap, QDesktopServices, QFont
 
 # Add the parent directory to sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import from core module
-from src.extract_github import extract_repo
+from src.core.cancellation import CancellationToken
+from src.core.log_buffer import LogBuffer
+from src.core.progress import ProgressReporter, describe_event
+from src.extract_github import extract_repo, repo_output_name
 
+# Extractions running at the same time; further jobs wait in the queue
+DEFAULT_CONCURRENT_JOBS = 2
+# Interval of the timer that renders buffered log text
+LOG_REFRESH_MS = 100
+# Lines kept in the log view, and buffered between two refreshes
+MAX_LOG_LINES = 5000
+# How long closing the window waits for cancelled jobs to clean up
+CLOSE_TIMEOUT_MS = 5000
 
-class LogRedirector:
-    """Redirects stdout to a queue for thread-safe logging in the GUI."""
+
+class JobSignals(QObject):
+    """Signals of one extraction job.
+
+    They are emitted on a pool thread and, being connected to the main
+    window, delivered on the GUI thread, so slots can touch widgets.
+    """
+    progress = pyqtSignal(int, object)
+    finished = pyqtSignal(int, bool, str)
+
+
+class ExtractionJob(QRunnable):
+    """Extracts one repository on a ``QThreadPool`` thread."""
     
-    def __init__(self, queue):
-        self.queue = queue
-        
-    def write(self, text):
-        self.queue.put(text)
+    def __init__(self, job_id, url):
+        super().__init__()
+        self.job_id = job_id
+        self.url = url
+        self.signals = JobSignals()
+        self.cancel_token = CancellationToken()
+        # Jobs writing the same output file never run at the same time
+        self.target = repo_output_name(url)
+        # The window keeps the job until its finished signal is handled, so
+        # cancel_job never reaches a runnable the pool has already deleted
+        self.setAutoDelete(False)
+        
+    def run(self):
+        reporter = ProgressReporter(
+            lambda event: self.signals.progress.emit(self.job_id, event)
+        )
+        try:
+            success = extract_repo(self.url, progress=reporter, cancel_token=self.cancel_token)
+            if self.cancel_token.cancelled:
+                message = "Cancelled"
+            else:
+                message = "" if success else "Extraction failed, see the activity log"
+            self.signals.finished.emit(self.job_id, bool(success), message)
+        except Exception as e:
+            self.signals.finished.emit(self.job_id, False, str(e))
+
+
+class JobRow(QFrame):
+    """Progress row of one queued or running extraction."""
+    
+    def __init__(self, url, on_cancel):
+        super().__init__()
+        self.setObjectName("jobRow")
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
         
-    def flush(self):
-        pass
+        self.url_label = QLabel(url)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.status_label = QLabel("Queued")
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(on_cancel)
+        
+        layout.addWidget(self.url_label, 2)
+        layout.addWidget(self.progress_bar, 2)
+        layout.addWidget(self.status_label, 3)
+        layout.addWidget(self.cancel_button)
+    
+    def show_progress(self, event):
+        """Draw a ProgressEvent of the job."""
+        if event.phase == "downloading" and event.percent is not None:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(int(event.percent))
+        elif event.phase in ("downloading", "processing"):
+            # Busy indicator while the amount of work left is unknown
+            self.progress_bar.setRange(0, 0)
+        self.status_label.setText(describe_event(event))
+    
+    def show_result(self, success, message):
+        """Show how the job ended."""
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(100 if success else 0)
+        self.cancel_button.setEnabled(False)
+        if not success:
+            self.status_label.setText(f"❌ {message}")
 
 
 class ExtractorMainWindow(QMainWindow):
@@ -50,19 +129,30 @@ class ExtractorMainWindow(QMainWindow):
         self.main_layout.setContentsMargins(20, 20, 20, 20)
         self.main_layout.setSpacing(15)
         
+        # Extraction jobs run on a pool; rows keep their progress visible
+        self.job_pool = QThreadPool(self)
+        self.job_pool.setMaxThreadCount(DEFAULT_CONCURRENT_JOBS)
+        self.jobs = {}
+        self.job_rows = {}
+        self.next_job_id = 0
+        # Output name -> id of the job started for it, and the jobs for the
+        # same output waiting for it to finish
+        self.active_targets = {}
+        self.waiting_jobs = {}
+        
         # Init UI components
-        self.extraction_running = False
         self.setup_ui()
         
-        # Set up logging
-        self.log_queue = queue.Queue()
+        # Set up logging: extraction threads print into a bounded buffer
+        # that the timer renders with one append per tick
+        self.log_buffer = LogBuffer(MAX_LOG_LINES)
         self.original_stdout = sys.stdout
-        sys.stdout = LogRedirector(self.log_queue)
+        sys.stdout = self.log_buffer
         
-        # Timer to check the log queue
+        # Timer to render buffered log text
         self.log_timer = QTimer(self)
-        self.log_timer.timeout.connect(self.check_log_queue)
-        self.log_timer.start(100)
+        self.log_timer.timeout.connect(self.flush_log)
+        self.log_timer.start(LOG_REFRESH_MS)
         
         # Set up the status bar
         self.status_bar = QStatusBar()
@@ -136,9 +226,9 @@ class ExtractorMainWindow(QMainWindow):
         input_section.setObjectName("inputSection")
         input_layout = QVBoxLayout(input_section)
         
-        url_label = QLabel("GitHub Repository URL:")
+        url_label = QLabel("GitHub Repository URL(s):")
         self.url_input = QLineEdit()
-        self.url_input.setPlaceholderText("Enter GitHub repository URL (e.g., https://github.com/username/repo)")
+        self.url_input.setPlaceholderText("Enter one or more GitHub repository URLs separated by spaces")
         self.url_input.returnPressed.connect(self.start_extraction)
         
         input_layout.addWidget(url_label)
@@ -164,13 +254,29 @@ class ExtractorMainWindow(QMainWindow):
         progress_section.setObjectName("progressSection")
         progress_layout = QVBoxLayout(progress_section)
         
+        progress_header_container = QWidget()
+        progress_header_layout = QHBoxLayout(progress_header_container)
+        progress_header_layout.setContentsMargins(0, 0, 0, 0)
         progress_header = QLabel("Extraction Progress")
-        self.progress_bar = QProgressBar()
-        self.progress_bar.setRange(0, 100)
-        self.progress_bar.setValue(0)
-        
-        progress_layout.addWidget(progress_header)
-        progress_layout.addWidget(self.progress_bar)
+        self.clear_finished_button = QPushButton("Clear Finished")
+        self.clear_finished_button.clicked.connect(self.clear_finished_jobs)
+        progress_header_layout.addWidget(progress_header)
+        progress_header_layout.addStretch()
+        progress_header_layout.addWidget(self.clear_finished_button)
+        
+        # One row per queued, running or finished job; finished rows stay
+        # until "Clear Finished" removes them
+        jobs_container = QWidget()
+        self.jobs_layout = QVBoxLayout(jobs_container)
+        self.jobs_layout.setContentsMargins(0, 0, 0, 0)
+        self.jobs_layout.addStretch()
+        jobs_scroll = QScrollArea()
+        jobs_scroll.setWidgetResizable(True)
+        jobs_scroll.setMinimumHeight(120)
+        jobs_scroll.setWidget(jobs_container)
+        
+        progress_layout.addWidget(progress_header_container)
+        progress_layout.addWidget(jobs_scroll)
         
         # Log section
         log_section = QFrame()
@@ -181,6 +287,8 @@ class ExtractorMainWindow(QMainWindow):
         self.log_text = QTextEdit()
         self.log_text.setReadOnly(True)
         self.log_text.setMinimumHeight(200)
+        # Oldest lines are discarded so long runs don't slow the view down
+        self.log_text.document().setMaximumBlockCount(MAX_LOG_LINES)
         
         log_layout.addWidget(log_header)
         log_layout.addWidget(self.log_text)
@@ -225,6 +333,23 @@ class ExtractorMainWindow(QMainWindow):
         output_layout.addWidget(output_header)
         output_layout.addWidget(output_folder_container)
         
+        # Number of repositories extracted at the same time
+        jobs_container = QWidget()
+        jobs_layout = QHBoxLayout(jobs_container)
+        jobs_layout.setContentsMargins(0, 0, 0, 0)
+        
+        jobs_label = QLabel("Concurrent extractions:")
+        self.concurrent_jobs_input = QSpinBox()
+        self.concurrent_jobs_input.setRange(1, 8)
+        self.concurrent_jobs_input.setValue(DEFAULT_CONCURRENT_JOBS)
+        self.concurrent_jobs_input.valueChanged.connect(self.job_pool.setMaxThreadCount)
+        
+        jobs_layout.addWidget(jobs_label)
+        jobs_layout.addWidget(self.concurrent_jobs_input)
+        jobs_layout.addStretch()
+        
+        output_layout.addWidget(jobs_container)
+        
         # Add sections to layout
         layout.addWidget(output_section)
         layout.addStretch()
@@ -332,92 +457,108 @@ class ExtractorMainWindow(QMainWindow):
         """)
     
     def start_extraction(self):
-        """Start the repository extraction process."""
-        if self.extraction_running:
-            return
-            
-        url = self.url_input.text().strip()
+        """Queue an extraction job for every URL entered."""
+        urls = self.url_input.text().split()
         
-        if not url:
+        if not urls:
             QMessageBox.warning(self, "Input Error", "Please enter a GitHub repository URL")
             return
             
-        if not url.startswith("https://github.com/"):
+        invalid = [url for url in urls if not url.startswith("https://github.com/")]
+        if invalid:
             QMessageBox.warning(
                 self,
                 "Invalid URL", 
-                "Invalid GitHub URL. Please enter a valid GitHub repository URL"
+                f"Invalid GitHub URL: {invalid[0]}\nPlease enter valid GitHub repository URLs"
             )
             return
         
-        # Clear previous log and reset progress
-        self.log_text.clear()
-        self.progress_bar.setValue(0)
-        
-        # Update UI state
-        self.extraction_running = True
-        self.extract_button.setEnabled(False)
-        self.status_bar.showMessage("Extraction in progress...")
-        
-        # Start extraction in a separate thread
-        threading.Thread(
-            target=self._extraction_thread,
-            args=(url,),
-            daemon=True
-        ).start()
+        self.url_input.clear()
+        for url in urls:
+            self.queue_job(url)
+        self.update_status()
     
-    def _extraction_thread(self, url):
-        """Thread function to handle repository extraction."""
-        try:
-            # Call the extraction function
-            extract_repo(url)
-            
-            # Update UI from the main thread
-            self.progress_bar.setValue(100)
-            self.status_bar.showMessage("Extraction completed successfully")
-            QMessageBox.information(
-                self, 
-                "Success", 
-                "Repository extraction completed successfully!"
-            )
-        except Exception as e:
-            # Handle exceptions
-            error_message = str(e)
-            self.log_text.append(f"\n❌ Error: {error_message}")
-            self.status_bar.showMessage("Extraction failed")
-            QMessageBox.critical(
-                self, 
-                "Extraction Error", 
-                f"An error occurred during extraction:\n\n{error_message}"
-            )
-        finally:
-            # Reset UI state
-            self.extraction_running = False
-            self.extract_button.setEnabled(True)
+    def queue_job(self, url):
+        """Add a progress row for a repository and queue its extraction."""
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        
+        row = JobRow(url, lambda: self.cancel_job(job_id))
+        # Keep the stretch last so rows stack at the top
+        self.jobs_layout.insertWidget(self.jobs_layout.count() - 1, row)
+        self.job_rows[job_id] = row
+        
+        job = ExtractionJob(job_id, url)
+        job.signals.progress.connect(self.on_job_progress)
+        job.signals.finished.connect(self.on_job_finished)
+        self.jobs[job_id] = job
+        if job.target in self.active_targets:
+            self.waiting_jobs.setdefault(job.target, deque()).append(job)
+            row.status_label.setText(f"Waiting for the other {job.target} job")
+        else:
+            self.start_job(job)
     
-    def check_log_queue(self):
-        """Check the log queue and update the log text area."""
-        try:
-            while True:
-                message = self.log_queue.get_nowait()
-                
-                # Update progress bar based on message content
-                if "Downloading:" in message and "%" in message:
-                    try:
-                        # Extract percentage from message
-                        percentage = float(message.split("Downloading:")[1].split("%")[0].strip())
-                        self.progress_bar.setValue(int(percentage))
-                    except (ValueError, IndexError):
-                        pass
-                
-                # Add message to log
-                self.log_text.append(message)
-                self.log_text.ensureCursorVisible()
-                
-                # Handle queue properly
-                self.log_queue.task_done()
-        except queue.Empty:
-            pass
+    def start_job(self, job):
+        """Hand a job to the pool, reserving its output name."""
+        self.active_targets[job.target] = job.job_id
+        self.job_pool.start(job)
+    
+    def cancel_job(self, job_id):
+        """Cancel a job; a queued one is dropped, a running one stops and cleans up."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        waiting = self.waiting_jobs.get(job.target, ())
+        if job in waiting:
+            waiting.remove(job)
+            self.on_job_finished(job_id, False, "Cancelled")
+            return
+        if self.job_pool.tryTake(job):
+            self.on_job_finished(job_id, False, "Cancelled")
+            return
+        job.cancel_token.cancel()
+        self.job_rows[job_id].status_label.setText("Cancelling...")
+        self.job_rows[job_id].cancel_button.setEnabled(False)
+    
+    def on_job_progress(self, job_id, event):
+        """Draw a job's progress; runs on the GUI thread."""
+        self.job_rows[job_id].show_progress(event)
+    
+    def on_job_finished(self, job_id, success, message):
+        """Record a job's result; runs on the GUI thread."""
+        self.job_rows[job_id].show_result(success, message)
+        job = self.jobs.pop(job_id, None)
+        if job is not None and self.active_targets.get(job.target) == job_id:
+            del self.active_targets[job.target]
+            waiting = self.waiting_jobs.get(job.target)
+            if waiting:
+                self.start_job(waiting.popleft())
+            if not waiting:
+                self.waiting_jobs.pop(job.target, None)
+        self.update_status()
+    
+    def clear_finished_jobs(self):
+        """Remove the rows of jobs that are no longer queued or running."""
+        for job_id in [job_id for job_id in self.job_rows if job_id not in self.jobs]:
+            row = self.job_rows.pop(job_id)
+            self.jobs_layout.removeWidget(row)
+            row.deleteLater()
+    
+    def update_status(self):
+        """Summarize the job queue in the status bar."""
+        if self.jobs:
+            self.status_bar.showMessage(f"{len(self.jobs)} extraction(s) queued or running...")
+        else:
+            self.status_bar.showMessage("All extractions finished")
+    
+    def flush_log(self):
+        """Render the log text buffered since the last tick with one append."""
+        text, dropped = self.log_buffer.drain()
+        if dropped:
+            self.log_text.append(f"... {dropped} lines skipped ...")
+        if text:
+            self.log_text.append(text)
+            self.log_text.ensureCursorVisible()
     
     def browse_output_folder(self):
         """Open dialog to select output folder."""
@@ -446,6 +587,12 @@ class ExtractorMainWindow(QMainWindow):
     
     def closeEvent(self, event):
         """Handle window close event."""
+        # Drop jobs that have not started yet and let running ones clean up
+        self.waiting_jobs.clear()
+        self.job_pool.clear()
+        for job in self.jobs.values():
+            job.cancel_token.cancel()
+        self.job_pool.waitForDone(CLOSE_TIMEOUT_MS)
         # Restore original stdout
         sys.stdout = self.original_stdout
         event.accept()
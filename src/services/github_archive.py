@@ -0,0 +1,208 @@
+"""
+Locating and requesting GitHub repository archives.
+
+Instead of probing ``main``, ``master`` and ``HEAD`` one after another, the
+default branch is resolved with a single ``HEAD`` request to
+``/archive/HEAD.zip``: GitHub answers with a redirect whose target names the
+branch. Resolved branches are cached on disk with a TTL so later runs skip
+the lookup entirely.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from src.services.http_session import get_client
+
+DEFAULT_CACHE_DIR = Path(os.path.expanduser("~")) / ".github_extractor"
+DEFAULT_BRANCH_TTL = 24 * 60 * 60
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+# codeload.github.com/<owner>/<repo>/<format>/[refs/heads/]<branch>
+_CODELOAD_REF = re.compile(r"/(?:legacy\.)?(?:zip|tar\.gz|tar)/(?:refs/heads/)?(?P<ref>[^?#]+)$")
+
+
+def normalize_repo_url(repo_url):
+    """
+    Turn a repository URL or ``owner/repo`` shorthand into a base URL.
+
+    Args:
+        repo_url (str): Repository URL, optionally ending in ``.git``
+
+    Returns:
+        str: URL without trailing slash or ``.git`` suffix
+    """
+    repo_url = repo_url.rstrip('/')
+    if repo_url.endswith('.git'):
+        repo_url = repo_url[:-4]
+    if not repo_url.startswith(('http://', 'https://')):
+        repo_url = f"https://github.com/{repo_url}"
+    return repo_url
+
+
+def archive_url(repo_url, ref, archive_ext):
+    """
+    Build the archive download URL for a branch.
+
+    Args:
+        repo_url (str): Normalized repository URL
+        ref (str): Branch name, or ``"HEAD"`` for the default branch
+        archive_ext (str): ``"zip"`` or ``"tar.gz"``
+
+    Returns:
+        str: Archive URL
+    """
+    if ref == "HEAD":
+        return f"{repo_url}/archive/HEAD.{archive_ext}"
+    return f"{repo_url}/archive/refs/heads/{ref}.{archive_ext}"
+
+
+class BranchResolver:
+    """Resolves and caches the default branch of repositories."""
+
+    def __init__(self, client=None, cache_file=None, ttl=DEFAULT_BRANCH_TTL, clock=time.time):
+        """
+        Initialize the resolver.
+
+        Args:
+            client (HttpClient): Client used for lookups, defaults to the
+                shared client
+            cache_file (Path): JSON file the cache is persisted to, or None
+                to keep it in memory only
+            ttl (float): Seconds a resolved branch stays valid
+            clock (Callable[[], float]): Returns the current Unix time
+        """
+        self.client = client
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cache = None
+
+    def _load(self):
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_file and self.cache_file.exists():
+                try:
+                    self._cache = json.loads(self.cache_file.read_text(encoding="utf-8"))
+                except (OSError, ValueError) as e:
+                    logging.warning(f"Ignoring unreadable branch cache {self.cache_file}: {e}")
+        return self._cache
+
+    def _save(self):
+        if not self.cache_file:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f)
+            os.replace(temp_path, self.cache_file)
+        except OSError as e:
+            logging.warning(f"Could not write branch cache {self.cache_file}: {e}")
+
+    def _probe(self, repo_url):
+        client = self.client or get_client()
+        response = client.head(f"{repo_url}/archive/HEAD.zip", allow_redirects=False)
+        response.close()
+        location = response.headers.get("Location", "")
+        if response.status_code in REDIRECT_STATUSES and location:
+            match = _CODELOAD_REF.search(location)
+            if match and match.group("ref") != "HEAD":
+                return match.group("ref")
+        return None
+
+    def resolve(self, repo_url):
+        """
+        Find the default branch of a repository.
+
+        Args:
+            repo_url (str): Normalized repository URL
+
+        Returns:
+            str: Branch name, or None if it could not be determined
+        """
+        with self._lock:
+            entry = self._load().get(repo_url)
+            if entry and self._clock() - entry["resolved_at"] < self.ttl:
+                return entry["branch"]
+
+        branch = self._probe(repo_url)
+        if branch:
+            with self._lock:
+                self._load()[repo_url] = {"branch": branch, "resolved_at": self._clock()}
+                self._save()
+        return branch
+
+    def invalidate(self, repo_url):
+        """Forget the cached branch of a repository."""
+        with self._lock:
+            if self._load().pop(repo_url, None) is not None:
+                self._save()
+
+
+_default_resolver = None
+_default_resolver_lock = threading.Lock()
+
+
+def get_branch_resolver():
+    """
+    Get the process-wide branch resolver, creating it on first use.
+
+    Returns:
+        BranchResolver: Shared resolver persisting to the user cache directory
+    """
+    global _default_resolver
+    with _default_resolver_lock:
+        if _default_resolver is None:
+            _default_resolver = BranchResolver(cache_file=DEFAULT_CACHE_DIR / "branches.json")
+        return _default_resolver
+
+
+def request_archive(repo_url, archive_ext, client=None, resolver=None, cache=None,
+                    staging=None, **kwargs):
+    """
+    Request the default-branch archive of a repository.
+
+    Args:
+        repo_url (str): Normalized repository URL
+        archive_ext (str): ``"zip"`` or ``"tar.gz"``
+        client (HttpClient): Client to use, defaults to the shared client
+        resolver (BranchResolver): Resolver to use, defaults to the shared one
+        cache (ArchiveCache): When given, the request is made conditional on
+            the cached copy and may be answered with ``304 Not Modified``
+        staging (StagingArea): When given, a partial download left by an
+            earlier run is resumed and may be answered with ``206``
+        **kwargs: Passed through to ``HttpClient.get``
+
+    Returns:
+        tuple: ``(response, download_url)``
+    """
+    client = client or get_client()
+    resolver = resolver or get_branch_resolver()
+    extra_headers = kwargs.pop("headers", None) or {}
+
+    def get(download_url):
+        headers = dict(extra_headers)
+        if cache is not None:
+            headers.update(cache.conditional_headers(download_url))
+        if staging is not None:
+            headers.update(staging.resume_headers(download_url))
+        return client.get(download_url, headers=headers, **kwargs)
+
+    branch = resolver.resolve(repo_url)
+    download_url = archive_url(repo_url, branch or "HEAD", archive_ext)
+    response = get(download_url)
+
+    if response.status_code == 404 and branch:
+        # The cached branch was renamed or deleted; let GitHub redirect us
+        response.close()
+        resolver.invalidate(repo_url)
+        download_url = archive_url(repo_url, "HEAD", archive_ext)
+        response = get(download_url)
+    return response, download_url
@@ -0,0 +1,430 @@
+"""
+Shared HTTP client for archive downloads.
+
+All downloads go through one pooled ``requests.Session`` so batch runs reuse
+keep-alive connections instead of paying a TLS handshake per request. Every
+request carries explicit connect/read timeouts and is retried with
+exponential backoff and jitter on server errors and dropped connections.
+GitHub rate-limit responses (403/429) are retried once the quota resets,
+as advertised by ``Retry-After`` or ``X-RateLimit-Reset``.
+
+Requests from every worker are paced by one shared ``RateLimiter``: a token
+bucket that keeps under GitHub's secondary limits and spreads the remaining
+quota reported in ``X-RateLimit-*`` headers over the time left until it
+resets, so a large batch queues instead of running into 403s. A token from
+``GITHUB_TOKEN`` (or ``GH_TOKEN``) is sent to GitHub for a higher quota.
+"""
+
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (10, 60)
+DEFAULT_POOL_SIZE = 16
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+RATE_LIMIT_STATUSES = frozenset({403, 429})
+# Sustained request rate and burst, well below GitHub's secondary limits
+DEFAULT_REQUESTS_PER_SECOND = 10
+DEFAULT_BURST = 20
+TOKEN_VARIABLES = ("GITHUB_TOKEN", "GH_TOKEN")
+# Hosts the auth token is sent to
+GITHUB_HOSTS = frozenset({"github.com", "api.github.com", "codeload.github.com"})
+
+
+@dataclass
+class RetryPolicy:
+    """How failed requests are retried."""
+
+    max_retries: int = 4
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    # Longest rate-limit reset we are willing to sleep through before giving
+    # the 403/429 response back to the caller
+    max_rate_limit_wait: float = 300.0
+
+    def backoff(self, attempt):
+        """
+        Delay before the given retry, using exponential backoff with full jitter.
+
+        Args:
+            attempt (int): Zero-based retry number
+
+        Returns:
+            float: Seconds to wait
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def retry_delay(self, status, headers, attempt):
+        """
+        Delay before retrying a response, if it should be retried at all.
+
+        Args:
+            status (int): HTTP status code
+            headers (Mapping): Response headers
+            attempt (int): Zero-based retry number
+
+        Returns:
+            float: Seconds to wait, or None to hand the response back
+        """
+        if status in RETRY_STATUSES:
+            delay = rate_limit_delay(headers)
+            return self.backoff(attempt) if delay is None else delay
+
+        if status in RATE_LIMIT_STATUSES:
+            delay = rate_limit_delay(headers)
+            if delay is None:
+                # A 403 without rate-limit headers means access is denied
+                return self.backoff(attempt) if status == 429 else None
+            if delay > self.max_rate_limit_wait:
+                logging.warning(f"Rate limit resets in {delay:.0f}s, not waiting")
+                return None
+            return delay
+        return None
+
+
+def rate_limit_delay(headers, now=None):
+    """
+    Work out how long GitHub asked us to wait before retrying.
+
+    Args:
+        headers (Mapping): Response headers, read for ``Retry-After`` and
+            an exhausted ``X-RateLimit-Remaining``/``X-RateLimit-Reset``
+        now (float): Current Unix time, defaults to ``time.time()``
+
+    Returns:
+        float: Seconds to wait, or None if the response carries no hint
+    """
+    now = time.time() if now is None else now
+
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                retry_at = email.utils.parsedate_to_datetime(retry_after).timestamp()
+                return max(0.0, retry_at - now)
+            except (TypeError, ValueError):
+                pass
+
+    if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+        try:
+            return max(0.0, float(headers["X-RateLimit-Reset"]) - now)
+        except ValueError:
+            pass
+    return None
+
+
+def github_token(environ=None):
+    """
+    Read a GitHub auth token from the environment.
+
+    Args:
+        environ (Mapping): Environment to read, defaults to ``os.environ``
+
+    Returns:
+        str: The first non-empty of ``GITHUB_TOKEN`` and ``GH_TOKEN``, or None
+    """
+    environ = os.environ if environ is None else environ
+    for name in TOKEN_VARIABLES:
+        token = environ.get(name, "").strip()
+        if token:
+            return token
+    return None
+
+
+def auth_headers(url, token):
+    """
+    Headers authenticating a request, if it goes to GitHub.
+
+    Args:
+        url (str): URL about to be requested
+        token (str): Auth token, or None
+
+    Returns:
+        dict: ``Authorization`` header, or empty for other hosts or no token
+    """
+    if token and urlparse(url).hostname in GITHUB_HOSTS:
+        return {"Authorization": f"Bearer {token}"}
+    return {}
+
+
+class _HostBudget:
+    """Pacing state of one host."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        # Time at which the bucket will be full again
+        self.full_at = 0.0
+        # No request may start before this time while the quota is exhausted
+        self.paused_until = 0.0
+        # Quota left and the monotonic time it resets, while one is known
+        self.remaining = None
+        self.reset_at = None
+
+
+class RateLimiter:
+    """Thread-safe token bucket pacing the requests of every worker sharing it.
+
+    Each host gets its own bucket, so the quotas of ``github.com``,
+    ``api.github.com`` and a local mirror never mix.
+    """
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND, burst=DEFAULT_BURST,
+                 clock=time.monotonic, wall_clock=time.time, sleep=time.sleep):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_second (float): Highest sustained request rate per host
+            burst (int): Requests that may be sent at once after an idle period
+            clock (Callable[[], float]): Monotonic time in seconds
+            wall_clock (Callable[[], float]): Current Unix time, used to read
+                ``X-RateLimit-Reset``
+            sleep (Callable[[float], None]): Used by ``acquire`` to wait
+        """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    def _budget(self, host, now):
+        budget = self._hosts.get(host)
+        if budget is None:
+            budget = self._hosts[host] = _HostBudget(self.requests_per_second, self.burst)
+        elif budget.reset_at is not None and now >= budget.reset_at:
+            # The quota window is over; pace at the full rate until the
+            # next response reports the new one
+            budget.rate, budget.burst = self.requests_per_second, self.burst
+            budget.remaining = budget.reset_at = None
+        return budget
+
+    def rate(self, host=None):
+        """
+        Current request rate of a host, lowered to what its quota allows.
+
+        Args:
+            host (str): Host name, or None for requests without one
+
+        Returns:
+            float: Requests per second
+        """
+        with self._lock:
+            return self._budget(host, self._clock()).rate
+
+    def reserve(self, host=None):
+        """
+        Claim the next request slot without waiting for it.
+
+        While a quota is known, no more requests than it allows are let
+        through before it resets, and the burst never exceeds it.
+
+        Args:
+            host (str): Host the request goes to
+
+        Returns:
+            float: Seconds the caller must wait before sending its request
+        """
+        with self._lock:
+            now = self._clock()
+            budget = self._budget(host, now)
+            start = max(now, budget.paused_until)
+            rate, burst = budget.rate, budget.burst
+            if budget.remaining is not None:
+                if budget.remaining > 0:
+                    budget.remaining -= 1
+                else:
+                    start = max(start, budget.reset_at)
+                if start >= budget.reset_at:
+                    # Sent in the next quota window
+                    rate, burst = self.requests_per_second, self.burst
+            interval = 1 / rate
+            budget.full_at = max(budget.full_at, start) + interval
+            return max(0.0, start - now, budget.full_at - now - burst * interval)
+
+    def acquire(self, host=None):
+        """Block until the caller may send its request to ``host``."""
+        delay = self.reserve(host)
+        if delay > 0:
+            self._sleep(delay)
+
+    def update(self, status, headers, host=None):
+        """
+        Adjust a host's budget to the rate-limit state a response reported.
+
+        A remaining quota is spread evenly over the time left until it
+        resets; an exhausted quota or a rate-limit response pauses every
+        request to the host until the advertised reset time. Responses
+        without rate-limit headers leave the budget unchanged.
+
+        Args:
+            status (int): HTTP status code
+            headers (Mapping): Response headers
+            host (str): Host the response came from
+        """
+        now = self._wall_clock()
+        quota = None
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            window = float(headers["X-RateLimit-Reset"]) - now
+            if window > 0:
+                quota = (max(0, remaining), window)
+        except (KeyError, ValueError):
+            pass
+
+        pause = None
+        if status in RATE_LIMIT_STATUSES or headers.get("X-RateLimit-Remaining") == "0":
+            pause = rate_limit_delay(headers, now)
+        with self._lock:
+            clock = self._clock()
+            budget = self._budget(host, clock)
+            if quota is not None:
+                remaining, window = quota
+                budget.remaining = remaining
+                budget.reset_at = clock + window
+                budget.rate = min(self.requests_per_second, max(remaining, 1) / window)
+                budget.burst = max(1, min(self.burst, remaining))
+            if pause:
+                logging.warning(f"Rate limit of {host} reached, pausing requests for {pause:.0f}s")
+                budget.paused_until = max(budget.paused_until, clock + pause)
+
+
+class HttpClient:
+    """Pooled HTTP session with timeouts and retries."""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 retry=None, sleep=time.sleep, rate_limiter=None, token=None):
+        """
+        Initialize the client.
+
+        Args:
+            pool_size (int): Maximum number of pooled connections per host
+            timeout (tuple): Default ``(connect, read)`` timeouts in seconds
+            retry (RetryPolicy): Retry settings, defaults to ``RetryPolicy()``
+            sleep (Callable[[float], None]): Used to wait between attempts
+            rate_limiter (RateLimiter): Paces every attempt and learns from
+                every response, or None to send requests unpaced
+            token (str): Auth token sent with requests to GitHub
+        """
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self._sleep = sleep
+        self.rate_limiter = rate_limiter
+        self.token = token
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request, retrying transient failures.
+
+        Args:
+            method (str): HTTP method
+            url (str): URL to request
+            **kwargs: Passed through to ``requests.Session.request``
+
+        Returns:
+            requests.Response: The final response
+
+        Raises:
+            requests.exceptions.RequestException: If the request still fails
+                after all retries
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlparse(url).hostname
+        auth = auth_headers(url, self.token)
+        if auth:
+            kwargs["headers"] = {**auth, **(kwargs.get("headers") or {})}
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(host)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.retry.max_retries:
+                    raise
+                delay = self.retry.backoff(attempt)
+                logging.warning(f"{method} {url} failed ({e}), retrying in {delay:.1f}s")
+            else:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.update(response.status_code, response.headers,
+                                             urlparse(response.url).hostname or host)
+                delay = None
+                if attempt < self.retry.max_retries:
+                    delay = self.retry.retry_delay(response.status_code, response.headers,
+                                                   attempt)
+                if delay is None:
+                    return response
+                logging.warning(
+                    f"{method} {url} returned {response.status_code}, retrying in {delay:.1f}s"
+                )
+                response.close()
+            self._sleep(delay)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        """Send a GET request. See ``request``."""
+        return self.request("GET", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        """Send a HEAD request. See ``request``."""
+        return self.request("HEAD", url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+_default_client = None
+_default_rate_limiter = None
+_default_client_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """
+    Get the process-wide rate limiter, creating it on first use.
+
+    Returns:
+        RateLimiter: Limiter shared by every client of this process
+    """
+    global _default_rate_limiter
+    with _default_client_lock:
+        if _default_rate_limiter is None:
+            _default_rate_limiter = RateLimiter()
+        return _default_rate_limiter
+
+
+def get_client():
+    """
+    Get the process-wide shared client, creating it on first use.
+
+    The client is paced by the shared rate limiter and authenticates with
+    the token from ``GITHUB_TOKEN`` or ``GH_TOKEN`` when one is set.
+
+    Returns:
+        HttpClient: Shared client instance
+    """
+    global _default_client
+    rate_limiter = get_rate_limiter()
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(rate_limiter=rate_limiter, token=github_token())
+        return _default_client
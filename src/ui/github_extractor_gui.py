@@ -11,7 +11,9 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QIcon
 
+from src.core.cancellation import CancellationToken
 from src.core.extract_github import extract_repository
+from src.core.progress import ProgressReporter, describe_event
 from src.utils.file_utils import ensure_directory
 
 # Path to store user settings
@@ -20,17 +22,28 @@ SETTINGS_FILE = os.path.join(os.path.expanduser("~"), ".github_extractor_setting
 class ExtractionWorker(QThread):
     """Worker thread for repository extraction."""
     finished = pyqtSignal(bool, str)
-    progress = pyqtSignal(int)
+    # Throttled ProgressEvent snapshots, see ProgressReporter
+    progress = pyqtSignal(object)
     
     def __init__(self, repo_url, output_dir):
         super().__init__()
         self.repo_url = repo_url
         self.output_dir = output_dir
+        self.cancel_token = CancellationToken()
+        
+    def cancel(self):
+        """Ask the extraction to stop; it removes its partial output."""
+        self.cancel_token.cancel()
         
     def run(self):
         try:
-            success = extract_repository(self.repo_url, self.output_dir)
-            self.finished.emit(success, self.output_dir)
+            reporter = ProgressReporter(self.progress.emit)
+            success = extract_repository(self.repo_url, self.output_dir, progress=reporter,
+                                         cancel_token=self.cancel_token)
+            if self.cancel_token.cancelled:
+                self.finished.emit(False, "Extraction cancelled")
+            else:
+                self.finished.emit(success, self.output_dir)
         except Exception as e:
             self.finished.emit(False, str(e))
 
@@ -86,10 +99,16 @@ class GitHubExtractorWindow(QMainWindow):
         dir_layout.addWidget(self.browse_button)
         main_layout.addLayout(dir_layout)
         
-        # Extract button
+        # Extract and cancel buttons
+        button_layout = QHBoxLayout()
         self.extract_button = QPushButton("Extract Repository")
         self.extract_button.clicked.connect(self.extract_repo)
-        main_layout.addWidget(self.extract_button)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_extraction)
+        button_layout.addWidget(self.extract_button)
+        button_layout.addWidget(self.cancel_button)
+        main_layout.addLayout(button_layout)
         
         # Progress bar
         self.progress_bar = QProgressBar()
@@ -137,6 +156,7 @@ class GitHubExtractorWindow(QMainWindow):
         
         # Disable UI elements during extraction
         self.extract_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         
@@ -146,9 +166,22 @@ class GitHubExtractorWindow(QMainWindow):
         self.worker.progress.connect(self.update_progress)
         self.worker.start()
         
-    def update_progress(self, value):
-        """Update the progress bar."""
-        self.progress_bar.setValue(value)
+    def cancel_extraction(self):
+        """Cancel the running extraction."""
+        self.worker.cancel()
+        self.cancel_button.setEnabled(False)
+        self.log_output.append("Cancelling extraction...")
+        
+    def update_progress(self, event):
+        """Update the progress bar from a ProgressEvent."""
+        if event.phase == "downloading" and event.percent is not None:
+            self.progress_bar.setRange(0, 100)
+            self.progress_bar.setValue(int(event.percent))
+        elif event.phase in ("downloading", "processing"):
+            # Busy indicator while the amount of work left is unknown
+            self.progress_bar.setRange(0, 0)
+        self.progress_bar.setFormat(describe_event(event))
+        self.statusBar().showMessage(describe_event(event))
         
     def extraction_finished(self, success, message):
         """Handle extraction completion."""
@@ -159,6 +192,8 @@ class GitHubExtractorWindow(QMainWindow):
             
         # Re-enable UI elements
         self.extract_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.progress_bar.setRange(0, 100)
         self.progress_bar.setVisible(False)
     
     def load_settings(self):
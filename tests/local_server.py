@@ -0,0 +1,72 @@
+"""
+Local HTTP stand-in for GitHub used by the download tests.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LocalServer:
+    """Serves canned responses from a background thread.
+
+    ``routes`` maps a request path to a callable taking the request handler;
+    the callable is responsible for sending the whole response.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _dispatch(self):
+                server.requests.append((self.command, self.path, dict(self.headers)))
+                route = server.routes.get(self.path.split("?")[0])
+                if route is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                route(self)
+
+            do_GET = _dispatch
+            do_HEAD = _dispatch
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def send_bytes(handler, data, status=200, headers=None, chunk_size=None, delay=0.0):
+    """Send ``data`` to the client, optionally throttled chunk by chunk."""
+    handler.send_response(status)
+    handler.send_header("Content-Length", str(len(data)))
+    for key, value in (headers or {}).items():
+        handler.send_header(key, value)
+    handler.end_headers()
+    if handler.command == "HEAD":
+        return
+    chunk_size = chunk_size or len(data) or 1
+    for offset in range(0, len(data), chunk_size):
+        handler.wfile.write(data[offset:offset + chunk_size])
+        handler.wfile.flush()
+        if delay:
+            time.sleep(delay)
@@ -0,0 +1,78 @@
+import io
+import json
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from src.core.archive import iter_zip_members, strip_archive_root
+from src.core.filters import MemberFilter
+from src.core.jsonl_writer import JsonlWriter
+from src.extract_github import get_file_language, write_members
+
+
+def build_zip(files, root="sample-repo-main"):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zip_ref:
+        zip_ref.writestr(f"{root}/", "")
+        for path, data in files.items():
+            zip_ref.writestr(f"{root}/{path}", data)
+    buffer.seek(0)
+    return buffer
+
+
+SAMPLE_FILES = {
+    "README.md": "# Sample\r\nwindows line endings\r\n",
+    "src/app.py": "print('héllo')\n",
+    "assets/logo.png": b"\x89PNG\r\n\x1a\n\x00\xff\xfe",
+    "node_modules/dep/index.js": "module.exports = {};\n",
+    ".env": "SECRET=1\n",
+}
+
+
+class TestArchive(unittest.TestCase):
+    def test_strip_archive_root(self):
+        self.assertEqual(strip_archive_root("repo-main/src/a.py"), "src/a.py")
+        self.assertIsNone(strip_archive_root("repo-main/"))
+        self.assertIsNone(strip_archive_root("pax_global_header"))
+
+    def test_iter_zip_members_skips_directories(self):
+        with zipfile.ZipFile(build_zip(SAMPLE_FILES)) as zip_ref:
+            paths = [member.path for member in iter_zip_members(zip_ref)]
+        self.assertEqual(paths, list(SAMPLE_FILES))
+
+    def test_matches_extractall_output(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with zipfile.ZipFile(build_zip(SAMPLE_FILES)) as zip_ref:
+                zip_ref.extractall(temp_dir)
+            root = Path(temp_dir) / "sample-repo-main"
+            expected = {}
+            for file_path in root.rglob("*"):
+                if not file_path.is_file():
+                    continue
+                relative_path = str(file_path.relative_to(root))
+                if any(relative_path.startswith(x) for x in ['.git/', 'node_modules/', '.env']):
+                    continue
+                try:
+                    expected[relative_path] = file_path.read_text(encoding="utf-8")
+                except UnicodeDecodeError:
+                    expected[relative_path] = None
+
+        out_file = io.BytesIO()
+        with zipfile.ZipFile(build_zip(SAMPLE_FILES)) as zip_ref:
+            write_members(MemberFilter().apply(iter_zip_members(zip_ref)), JsonlWriter(out_file))
+        records = [json.loads(line) for line in out_file.getvalue().splitlines()]
+
+        actual = {}
+        for record in records:
+            if record["type"] == "file":
+                path = record["metadata"]["path"]
+                self.assertEqual(record["metadata"]["language"], get_file_language(path))
+                actual[path] = record["content"]
+            else:
+                actual[record["path"]] = record["content"]
+        self.assertEqual(actual, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
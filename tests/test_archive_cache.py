@@ -0,0 +1,110 @@
+import io
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from src.core.archive_cache import ArchiveCache
+from src.extract_github import extract_repo
+from tests.local_server import LocalServer, send_bytes
+from tests.test_pipeline import build_tar_gz
+
+COMMIT = "0123456789abcdef0123456789abcdef01234567"
+
+
+def conditional(data, etag):
+    def route(handler):
+        if handler.headers.get("If-None-Match") == etag:
+            send_bytes(handler, b"", status=304, headers={"ETag": etag})
+        else:
+            send_bytes(handler, data, headers={"ETag": etag})
+    return route
+
+
+class TestArchiveCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.now = 0.0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_cache(self, max_bytes=1024):
+        return ArchiveCache(Path(self.temp_dir.name) / "cache", max_bytes, clock=lambda: self.now)
+
+    def store(self, cache, key, etag, data):
+        with cache.writer(key, etag, "zip") as writer:
+            writer.write(data)
+        return writer.path
+
+    def test_commit_etag_names_the_archive(self):
+        cache = self.make_cache()
+        path = self.store(cache, "https://example/a.zip", f'"{COMMIT}"', b"data")
+        self.assertEqual(path.name, f"{COMMIT}.zip")
+        reopened = self.make_cache()
+        self.assertEqual(reopened.conditional_headers("https://example/a.zip"),
+                         {"If-None-Match": f'"{COMMIT}"'})
+
+    def test_evicts_least_recently_used(self):
+        cache = self.make_cache(max_bytes=250)
+        self.store(cache, "a", '"a"', b"a" * 100)
+        self.now = 1
+        self.store(cache, "b", '"b"', b"b" * 100)
+        self.now = 2
+        cache.open_cached("a")
+        self.now = 3
+        self.store(cache, "c", '"c"', b"c" * 100)
+
+        self.assertIsNotNone(cache.lookup("a"))
+        self.assertIsNone(cache.lookup("b"))
+        self.assertIsNotNone(cache.lookup("c"))
+        self.assertEqual(cache.total_size(), 200)
+
+    def test_failed_download_leaves_no_entry(self):
+        cache = self.make_cache()
+        with self.assertRaises(RuntimeError):
+            with cache.writer("a", '"a"', "zip") as writer:
+                writer.write(b"partial")
+                raise RuntimeError("connection dropped")
+        self.assertIsNone(cache.lookup("a"))
+        self.assertEqual(list((Path(self.temp_dir.name) / "cache" / "objects").iterdir()), [])
+
+
+class TestCachedExtraction(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+        self.cache = ArchiveCache("cache")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def run_twice(self, engine, route_path, data):
+        etag = f'"{COMMIT}"'
+        with LocalServer({route_path: conditional(data, etag)}) as server:
+            outputs = []
+            for _ in range(2):
+                extract_repo(f"{server.url}/user/repo", engine=engine, cache=self.cache)
+                outputs.append(Path("extracted_repos/repo_contents.jsonl").read_text())
+            statuses = [headers.get("If-None-Match")
+                        for method, _, headers in server.requests if method == "GET"]
+        self.assertEqual(statuses, [None, etag])
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertIn("README.md", outputs[0])
+
+    def test_zip_engine_reuses_cached_archive(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as zip_ref:
+            zip_ref.writestr("repo-HEAD/README.md", "# Repo\n")
+        self.run_twice("zip", "/user/repo/archive/HEAD.zip", buffer.getvalue())
+
+    def test_tar_engine_reuses_cached_archive(self):
+        data = build_tar_gz({"README.md": b"# Repo\n"}, root="repo-HEAD")
+        self.run_twice("tar", "/user/repo/archive/HEAD.tar.gz", data)
+
+
+if __name__ == "__main__":
+    unittest.main()
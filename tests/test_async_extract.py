@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from src.core import async_extract
+from src.core.async_extract import AsyncExtractor, BandwidthLimiter, extract_repository_async
+from src.core.cancellation import CancellationToken
+from src.core.progress import ProgressReporter
+from src.services.http_session import RateLimiter, RetryPolicy
+from tests.local_server import LocalServer, send_bytes
+from tests.test_archive import build_zip
+
+FILES = {f"pkg/module{i:03}.py": f"value = {i}\n" for i in range(50)}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += delay
+
+
+class TestBandwidthLimiter(unittest.TestCase):
+    def test_waits_once_the_burst_is_used(self):
+        clock = FakeClock()
+        limiter = BandwidthLimiter(1000, burst=500, clock=clock, sleep=clock.sleep)
+
+        async def receive():
+            for _ in range(4):
+                await limiter.consume(500)
+
+        asyncio.run(receive())
+        # 2000 bytes at 1000 B/s, less the 500 byte burst
+        self.assertAlmostEqual(clock.now, 1.5)
+        self.assertEqual(clock.sleeps[0], 0.5)
+
+    def test_idle_time_refills_only_up_to_the_burst(self):
+        clock = FakeClock()
+        limiter = BandwidthLimiter(1000, burst=500, clock=clock, sleep=clock.sleep)
+
+        async def receive():
+            await limiter.consume(500)
+            clock.now += 10
+            await limiter.consume(500)
+            await limiter.consume(500)
+
+        asyncio.run(receive())
+        self.assertEqual(clock.sleeps, [0.5])
+
+
+@unittest.skipIf(async_extract.aiohttp is None, "aiohttp is not installed")
+class TestAsyncExtract(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name)
+        self.archive = build_zip(FILES, root="repo-main").getvalue()
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+        self.temp_dir.cleanup()
+
+    def test_extracts_repository(self):
+        routes = {"/user/repo/archive/HEAD.zip": lambda h: send_bytes(h, self.archive)}
+        events = []
+        with LocalServer(routes) as server:
+            ok = asyncio.run(extract_repository_async(
+                f"{server.url}/user/repo", self.output_dir,
+                progress=ProgressReporter(events.append, interval=0)))
+        self.assertTrue(ok)
+        self.assertEqual((self.output_dir / "repo-main/pkg/module007.py").read_text(),
+                         "value = 7\n")
+        self.assertEqual(events[-1].phase, "done")
+        # Every member, including the root directory entry
+        self.assertEqual(events[-1].files, len(FILES) + 1)
+        self.assertEqual(events[-1].downloaded, len(self.archive))
+
+    def test_missing_repository(self):
+        with LocalServer({}) as server:
+            ok = asyncio.run(extract_repository_async(f"{server.url}/user/missing",
+                                                      self.output_dir))
+        self.assertFalse(ok)
+
+    def test_server_errors_are_retried(self):
+        attempts = []
+
+        def flaky(handler):
+            attempts.append(handler.path)
+            send_bytes(handler, self.archive, status=503 if len(attempts) == 1 else 200)
+
+        async def run(url):
+            retry = RetryPolicy(max_retries=2, backoff_factor=0.01)
+            async with AsyncExtractor(retry=retry) as extractor:
+                return await extract_repository_async(url, self.output_dir, extractor=extractor)
+
+        with LocalServer({"/user/repo/archive/HEAD.zip": flaky}) as server:
+            self.assertTrue(asyncio.run(run(f"{server.url}/user/repo")))
+        self.assertEqual(len(attempts), 2)
+
+    def test_rate_limits_are_waited_for(self):
+        attempts = []
+
+        def limited(handler):
+            attempts.append(handler.path)
+            if len(attempts) == 1:
+                send_bytes(handler, b"", status=429, headers={"Retry-After": "0"})
+            elif len(attempts) == 2:
+                send_bytes(handler, b"", status=403, headers={
+                    "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()))})
+            else:
+                send_bytes(handler, self.archive)
+
+        async def run(url):
+            async with AsyncExtractor(rate_limiter=RateLimiter()) as extractor:
+                return await extractor.extract(url, self.output_dir)
+
+        with LocalServer({"/user/repo/archive/HEAD.zip": limited}) as server:
+            self.assertTrue(asyncio.run(run(f"{server.url}/user/repo")))
+        self.assertEqual(len(attempts), 3)
+
+    def test_distant_rate_limit_reset_is_not_waited_for(self):
+        reset = str(int(time.time()) + 3600)
+        routes = {"/user/repo/archive/HEAD.zip": lambda h: send_bytes(
+            h, b"", status=403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})}
+
+        async def run(url):
+            async with AsyncExtractor(rate_limiter=RateLimiter()) as extractor:
+                return await extractor.extract(url, self.output_dir)
+
+        with LocalServer(routes) as server:
+            self.assertFalse(asyncio.run(run(f"{server.url}/user/repo")))
+            self.assertEqual(len(server.requests), 1)
+
+    def test_connections_are_capped(self):
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def slow(handler):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.05)
+            handler.send_response(200)
+            handler.send_header("Content-Length", str(len(self.archive)))
+            handler.end_headers()
+            handler.wfile.write(self.archive[:-1])
+            # Done before the last byte: the client can only reuse or free
+            # the connection once it has received the whole body
+            with lock:
+                active[0] -= 1
+            handler.wfile.write(self.archive[-1:])
+
+        routes = {f"/user/repo{i}/archive/HEAD.zip": slow for i in range(6)}
+
+        async def run(base_url):
+            async with AsyncExtractor(max_connections=2) as extractor:
+                return await extractor.extract_all(
+                    [f"{base_url}/user/repo{i}" for i in range(6)], self.output_dir)
+
+        with LocalServer(routes) as server:
+            results = asyncio.run(run(server.url))
+        self.assertTrue(all(result.success for result in results))
+        self.assertEqual([r.repo_url.rsplit("/", 1)[1] for r in results],
+                         [f"repo{i}" for i in range(6)])
+        self.assertLessEqual(active[1], 2)
+
+    def test_bandwidth_is_capped(self):
+        archive = os.urandom(256 * 1024)
+        routes = {"/user/repo/archive/HEAD.zip": lambda h: send_bytes(h, archive)}
+
+        async def run(url):
+            async with AsyncExtractor(max_bytes_per_second=512 * 1024) as extractor:
+                # Not a zip, so the extraction itself fails after the download
+                return await extractor.extract(url, self.output_dir)
+
+        with LocalServer(routes) as server:
+            started = time.monotonic()
+            asyncio.run(run(f"{server.url}/user/repo"))
+            elapsed = time.monotonic() - started
+        # 256 KB at 512 KB/s after a 64 KB burst takes at least 0.375 s
+        self.assertGreater(elapsed, 0.3)
+
+    def test_cancel_removes_extracted_files(self):
+        routes = {"/user/repo/archive/HEAD.zip": lambda h: send_bytes(h, self.archive)}
+        token = CancellationToken()
+
+        def cancel_midway(event):
+            if event.files >= 10:
+                token.cancel()
+
+        with LocalServer(routes) as server:
+            ok = asyncio.run(extract_repository_async(
+                f"{server.url}/user/repo", self.output_dir, cancel_token=token,
+                progress=ProgressReporter(cancel_midway, interval=0)))
+        self.assertFalse(ok)
+        self.assertEqual(os.listdir(self.output_dir), [])
+        # The per-extraction child token was released again
+        self.assertEqual(token._children, {})
+
+    def test_cancelling_the_task_stops_the_download(self):
+        archive = os.urandom(1024 * 1024)
+        routes = {"/user/repo/archive/HEAD.zip":
+                  lambda h: send_bytes(h, archive, chunk_size=16 * 1024, delay=0.01)}
+
+        async def run(url):
+            task = asyncio.create_task(extract_repository_async(url, self.output_dir))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with LocalServer(routes) as server:
+            started = time.monotonic()
+            asyncio.run(run(f"{server.url}/user/repo"))
+            self.assertLess(time.monotonic() - started, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import threading
+import time
+import unittest
+
+from src.core.batch import CANCELLED, extract_batch, read_repo_urls
+from src.core.cancellation import CancellationToken
+
+
+class TestBatch(unittest.TestCase):
+    def test_read_repo_urls_skips_blanks_and_comments(self):
+        lines = ["# nightly\n", "user/one\n", "\n", "  https://github.com/user/two  \n"]
+        self.assertEqual(read_repo_urls(lines), ["user/one", "https://github.com/user/two"])
+
+    def test_results_in_input_order_with_bounded_concurrency(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def fake_extract(repo_url, output_dir):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            if repo_url == "user/broken":
+                raise RuntimeError("boom")
+            return repo_url != "user/missing"
+
+        urls = [f"user/repo{i}" for i in range(6)] + ["user/missing", "user/broken"]
+        results = extract_batch(urls, "out", workers=3, extract=fake_extract)
+
+        self.assertEqual([result.repo_url for result in results], urls)
+        self.assertLessEqual(state["peak"], 3)
+        self.assertEqual([result.success for result in results], [True] * 6 + [False, False])
+        self.assertEqual(results[-1].error, "boom")
+
+    def test_cancelled_token_skips_every_repository(self):
+        calls = []
+        token = CancellationToken()
+        token.cancel()
+        urls = [f"user/repo{i}" for i in range(20)]
+        results = extract_batch(urls, "out", workers=4, cancel_token=token,
+                                extract=lambda url, out: calls.append(url) or True)
+        self.assertEqual(calls, [])
+        self.assertEqual({result.error for result in results}, {CANCELLED})
+
+    def test_cancelling_skips_queued_repositories(self):
+        calls = []
+        token = CancellationToken()
+
+        def cancel_first(repo_url, output_dir):
+            calls.append(repo_url)
+            token.cancel()
+            return False
+
+        urls = [f"user/repo{i}" for i in range(20)]
+        reported = []
+        results = extract_batch(urls, "out", workers=1, extract=cancel_first,
+                                on_result=reported.append, cancel_token=token)
+        self.assertEqual(calls, ["user/repo0"])
+        self.assertEqual([result.repo_url for result in results], urls)
+        self.assertTrue(all(result.error == CANCELLED for result in results))
+        self.assertEqual(len(reported), 20)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import io
+import unittest
+import zlib
+
+from src.core.archive import ArchiveMember
+from src.core.binary_detection import SNIFF_SIZE, has_binary_extension, looks_binary
+from src.extract_github import build_record, read_member
+
+
+class GuardedStream(io.BytesIO):
+    """Stream that records how many bytes were read from it."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def member_for(path, data, crc32=None):
+    stream = GuardedStream(data)
+    return ArchiveMember(path, len(data), opener=lambda: stream, crc32=crc32), stream
+
+
+class TestBinaryDetection(unittest.TestCase):
+    def test_extension_table(self):
+        self.assertTrue(has_binary_extension("assets/Logo.PNG"))
+        self.assertFalse(has_binary_extension("src/main.py"))
+        self.assertFalse(has_binary_extension("Makefile"))
+        # Also used for text files
+        self.assertFalse(has_binary_extension("models/cube.obj"))
+        self.assertFalse(has_binary_extension("env/lib/site.pth"))
+
+    def test_prefix_sniffing(self):
+        self.assertTrue(looks_binary(b"\x89PNG\r\n\x1a\n...."))
+        self.assertTrue(looks_binary(b"\xff\xfe latin-1 \xe9"))
+        # Valid UTF-8, which decodes like any other text
+        self.assertFalse(looks_binary(b"%PDF-1.7\n"))
+        self.assertFalse(looks_binary(b"text with a \x00 byte"))
+        self.assertFalse(looks_binary(b"MZ is also how this README starts"))
+        self.assertFalse(looks_binary("café".encode("utf-8")[:-1]))
+        self.assertFalse(looks_binary(b""))
+
+    def test_binary_blob_is_not_read_in_full(self):
+        blob = b"\x7fELF\x02\x01\x01" + b"\x00\xe8" * (5 * SNIFF_SIZE)
+        member, stream = member_for("bin/tool", blob)
+        data, size, _ = read_member(member)
+        self.assertIsNone(data)
+        self.assertEqual(size, len(blob))
+        self.assertLessEqual(stream.bytes_read, SNIFF_SIZE)
+        self.assertEqual(build_record(member, data)["type"], "binary")
+
+    def test_known_extension_is_not_opened(self):
+        member = ArchiveMember("img/photo.jpg", 10, opener=lambda: self.fail("opened"))
+        self.assertEqual(read_member(member), (None, 10, None))
+
+    def test_empty_file_with_binary_extension_is_text(self):
+        member, _ = member_for("assets/placeholder.png", b"")
+        record = build_record(member, read_member(member)[0])
+        self.assertEqual(record["type"], "file")
+        self.assertEqual(record["content"], "")
+
+    def test_known_extension_wins_over_decodable_content(self):
+        member, stream = member_for("docs/minimal.pdf", b"%PDF-1.1\n%%EOF\n")
+        self.assertEqual(build_record(member, read_member(member)[0])["type"], "binary")
+        self.assertEqual(stream.bytes_read, 0)
+
+    def test_invalid_byte_after_prefix_is_still_binary(self):
+        data = b"a" * (SNIFF_SIZE * 3) + b"\xff"
+        member, _ = member_for("data/log.txt", data)
+        record = build_record(member, read_member(member)[0])
+        self.assertEqual(record["type"], "binary")
+
+    def test_text_with_ambiguous_extension_is_kept(self):
+        for path, data in [("models/cube.obj", b"v 0.0 0.0 0.0\nf 1 2 3\n"),
+                           ("data/fixture.bin", b"header\x00\x00payload\n")]:
+            member, _ = member_for(path, data)
+            record = build_record(member, read_member(member)[0])
+            self.assertEqual(record["type"], "file")
+            self.assertEqual(record["content"], data.decode("utf-8"))
+
+    def test_checksum_streams_binary_content(self):
+        blob = b"\x00\xff" * SNIFF_SIZE
+        member, _ = member_for("blob.dat", blob)
+        self.assertEqual(read_member(member, checksum=True), (None, len(blob), zlib.crc32(blob)))
+
+
+if __name__ == "__main__":
+    unittest.main()
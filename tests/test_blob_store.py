@@ -0,0 +1,108 @@
+import io
+import json
+import pickle
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from src.core.archive import iter_zip_members
+from src.core.blob_store import BlobStore, content_digest, iter_records, rehydrate
+from src.core.jsonl_writer import JsonlWriter
+from src.core.output_index import OutputReader, build_index
+from src.core.stats import RepositoryStats, stats_from_jsonl
+from src.extract_github import write_members, write_members_parallel
+from tests.test_archive import build_zip
+
+LIBRARY = {f"vendor/lib/module{i}.py": f"def f{i}():\n    return {i}\n" * 50 for i in range(20)}
+FORK_A = dict(LIBRARY, **{"README.md": "# Fork A\r\n", "logo.png": b"\x89PNG\r\n\x1a\n\x00"})
+FORK_B = dict(LIBRARY, **{"README.md": "# Fork B\n", "latin1.txt": b"caf\xe9\n"})
+
+
+class TestBlobStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.store = BlobStore(self.root / "blobs")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def extract(self, files, blob_store=None, name="repo", process=write_members, **kwargs):
+        zip_path = self.root / f"{name}.zip"
+        zip_path.write_bytes(build_zip(files).getvalue())
+        out_file = io.BytesIO()
+        with zipfile.ZipFile(zip_path) as zip_ref:
+            members = sorted(iter_zip_members(zip_ref), key=lambda m: m.path)
+            if process is write_members_parallel:
+                kwargs.update(zip_path=zip_path, workers=2)
+            process(members, JsonlWriter(out_file), blob_store=blob_store, **kwargs)
+        return out_file.getvalue()
+
+    def store_size(self):
+        return sum(path.stat().st_size for path in self.store.objects_dir.rglob("*")
+                   if path.is_file())
+
+    def test_put_and_get(self):
+        digest = content_digest(b"x = 1\n")
+        self.assertTrue(self.store.put(digest, b"x = 1\n"))
+        self.assertFalse(self.store.put(digest, b"x = 1\n"))
+        self.assertEqual(self.store.get(digest), b"x = 1\n")
+        self.assertEqual(pickle.loads(pickle.dumps(self.store)).get(digest), b"x = 1\n")
+        with self.assertRaises(KeyError):
+            self.store.get(content_digest(b"missing"))
+
+    def test_rehydrated_output_matches_the_regular_output(self):
+        for files in (FORK_A, FORK_B):
+            deduplicated = self.extract(files, self.store)
+            records = list(iter_records(io.BytesIO(deduplicated), self.store))
+            regular = [json.loads(line) for line in self.extract(files).splitlines()]
+            self.assertEqual(records, regular)
+            self.assertEqual([r["type"] for r in records].count("binary"), 1)
+
+    def test_forks_share_blobs(self):
+        first = self.extract(FORK_A, self.store, "a")
+        stored = self.store_size()
+        second = self.extract(FORK_B, self.store, "b")
+        # Only the second README is new
+        self.assertEqual(self.store_size() - stored, len(b"# Fork B\n"))
+        self.assertLess(len(first) + len(second) + self.store_size(),
+                        len(self.extract(FORK_A)) + len(self.extract(FORK_B)))
+
+    def test_stored_blobs_are_not_decoded_again(self):
+        self.extract(FORK_A, self.store)
+        with mock.patch("src.extract_github.decode_text") as decode, \
+                mock.patch.object(BlobStore, "put") as put:
+            self.extract(FORK_A, self.store)
+        decode.assert_not_called()
+        put.assert_not_called()
+
+    def test_parallel_matches_serial(self):
+        serial = self.extract(FORK_A, self.store)
+        self.assertEqual(self.extract(FORK_A, self.store, process=write_members_parallel), serial)
+
+    def test_stats_and_reader_use_the_store(self):
+        expected = RepositoryStats()
+        self.extract(FORK_A, stats=expected)
+        stats = RepositoryStats()
+        output = self.extract(FORK_A, self.store, stats=stats)
+        self.assertEqual(stats.result(), expected.result())
+        self.assertEqual(stats_from_jsonl(io.BytesIO(output), blob_store=self.store).result()
+                         ["lines"], expected.result()["lines"])
+
+        output_file = self.root / "repo_contents.jsonl"
+        output_file.write_bytes(output)
+        build_index(output_file)
+        with OutputReader(output_file, blob_store=self.store) as reader:
+            self.assertEqual(reader.content("README.md"), "# Fork A\n")
+            self.assertEqual(reader.content("vendor/lib/module3.py"),
+                             FORK_A["vendor/lib/module3.py"])
+
+    def test_rehydrate_leaves_inline_records_alone(self):
+        record = {"type": "binary", "metadata": {"path": "a.png"}}
+        self.assertIs(rehydrate(record, self.store), record)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,188 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+import unittest
+import zipfile
+from functools import partial
+from pathlib import Path
+from unittest import mock
+
+from src.core.archive import iter_zip_members
+from src.core.cancellation import CancellationToken, Cancelled
+from src.core.extract_github import extract_members, extract_repository, remove_extracted
+from src.core.incremental import delta_path
+from src.core.progress import ProgressReporter
+from src.extract_github import extract_repo, write_members, write_members_parallel, write_output
+from tests.local_server import LocalServer, send_bytes
+from tests.test_archive import build_zip
+
+FILES = {f"pkg/module{i:03}.py": f"value = {i}\n" for i in range(100)}
+
+
+class CancelAfter:
+    """Members iterable that cancels a token after yielding ``count`` members."""
+
+    def __init__(self, members, token, count):
+        self.members = members
+        self.token = token
+        self.count = count
+
+    def __iter__(self):
+        for index, member in enumerate(self.members):
+            if index == self.count:
+                self.token.cancel()
+            yield member
+
+
+class CancelOnFile:
+    """Progress stand-in that cancels a token once ``count`` files are done."""
+
+    def __init__(self, token, count):
+        self.token = token
+        self.count = count
+        self.files = 0
+
+    def add_file(self):
+        self.files += 1
+        if self.files == self.count:
+            self.token.cancel()
+
+
+class TestCancellation(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.zip_path = self.root / "repo.zip"
+        self.zip_path.write_bytes(build_zip(FILES).getvalue())
+        self.output_file = self.root / "repo_contents.jsonl"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, token, cancel_after, process=write_members, **kwargs):
+        with zipfile.ZipFile(self.zip_path) as zip_ref:
+            members = CancelAfter(list(iter_zip_members(zip_ref)), token, cancel_after)
+            return write_output(members, self.output_file,
+                                process=partial(process, cancel_token=token, **kwargs))
+
+    def test_token(self):
+        token = CancellationToken()
+        token.raise_if_cancelled()
+        self.assertFalse(token.wait(0))
+        token.cancel()
+        self.assertTrue(token.cancelled)
+        self.assertTrue(token.wait(0))
+        with self.assertRaises(Cancelled):
+            token.raise_if_cancelled()
+
+    def test_child_tokens(self):
+        token = CancellationToken()
+        first, second = token.child(), token.child()
+        first.cancel()
+        self.assertFalse(token.cancelled)
+        self.assertFalse(second.cancelled)
+        token.cancel()
+        self.assertTrue(second.cancelled)
+        self.assertTrue(token.child().cancelled)
+
+    def test_detached_children_are_released(self):
+        token = CancellationToken()
+        children = [token.child() for _ in range(3)]
+        for child in children:
+            child.detach()
+        self.assertEqual(token._children, {})
+        token.cancel()
+        self.assertFalse(any(child.cancelled for child in children))
+
+    def test_partial_output_is_removed(self):
+        with self.assertRaises(Cancelled):
+            self.write(CancellationToken(), 10)
+        self.assertFalse(self.output_file.exists())
+
+    def test_parallel_writer_stops(self):
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(Cancelled):
+            self.write(token, 0, write_members_parallel, zip_path=self.zip_path, workers=2)
+        self.assertFalse(self.output_file.exists())
+
+    def test_incremental_update_keeps_previous_output(self):
+        with zipfile.ZipFile(self.zip_path) as zip_ref:
+            write_output(iter_zip_members(zip_ref), self.output_file, incremental=True)
+        previous = self.output_file.read_bytes()
+
+        token = CancellationToken()
+        with zipfile.ZipFile(self.zip_path) as zip_ref, self.assertRaises(Cancelled):
+            members = CancelAfter(list(iter_zip_members(zip_ref)), token, 5)
+            write_output(members, self.output_file, incremental=True, delta=True,
+                         process=partial(write_members, cancel_token=token))
+        self.assertEqual(self.output_file.read_bytes(), previous)
+        self.assertFalse(delta_path(self.output_file).exists())
+        self.assertEqual(sorted(p.name for p in self.root.iterdir()),
+                         sorted(["repo.zip", "repo_contents.jsonl", "repo_contents.manifest.json"]))
+
+    def test_remove_extracted(self):
+        output_dir = self.root / "out"
+        (output_dir / "existing").mkdir(parents=True)
+        token = CancellationToken()
+        extracted = []
+        with self.assertRaises(Cancelled):
+            extract_members(self.zip_path, output_dir, cancel_token=token, extracted=extracted,
+                            progress=CancelOnFile(token, 5))
+        remove_extracted(extracted, output_dir)
+        self.assertEqual(os.listdir(output_dir), ["existing"])
+
+    def test_remove_extracted_keeps_existing_files(self):
+        output_dir = self.root / "out"
+        extract_members(self.zip_path, output_dir)
+        kept = output_dir / "sample-repo-main/pkg/module000.py"
+        token = CancellationToken()
+        extracted = []
+        with self.assertRaises(Cancelled):
+            extract_members(self.zip_path, output_dir, cancel_token=token, extracted=extracted,
+                            progress=CancelOnFile(token, 5))
+        self.assertEqual(extracted, [])
+        remove_extracted(extracted, output_dir)
+        self.assertEqual(kept.read_text(), "value = 0\n")
+
+
+class TestCancelDownload(unittest.TestCase):
+    def test_cancelled_token_sends_no_request(self):
+        token = CancellationToken()
+        token.cancel()
+        with mock.patch("src.core.extract_github.request_archive") as request_archive, \
+                self.assertLogs(level="WARNING"):
+            self.assertFalse(extract_repository("user/repo", "out", cancel_token=token))
+        request_archive.assert_not_called()
+
+    def test_cancel_during_download(self):
+        archive = os.urandom(2 * 1024 * 1024)
+        routes = {"/user/big-repo/archive/HEAD.zip":
+                  lambda h: send_bytes(h, archive, chunk_size=16 * 1024, delay=0.01)}
+        token = CancellationToken()
+
+        def cancel_once_started(event):
+            if event.downloaded >= 64 * 1024:
+                token.cancel()
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as temp_dir, LocalServer(routes) as server:
+            os.chdir(temp_dir)
+            try:
+                started = time.monotonic()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    ok = extract_repo(f"{server.url}/user/big-repo", cancel_token=token,
+                                      progress=ProgressReporter(cancel_once_started, interval=0))
+                elapsed = time.monotonic() - started
+                self.assertFalse(ok)
+                # Well before the ~1.3 s the whole download takes
+                self.assertLess(elapsed, 1.0)
+                self.assertEqual(os.listdir("extracted_repos"), [])
+            finally:
+                os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import io
+import json
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from src.core.archive import iter_zip_members
+from src.core.chunking import iter_text_chunks, split_point
+from src.core.jsonl_writer import JsonlWriter
+from src.core.records import decode_text
+from src.extract_github import write_members, write_members_parallel, write_output
+from tests.test_archive import build_zip
+
+
+def blocks_of(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestTextChunks(unittest.TestCase):
+    def test_split_point(self):
+        self.assertEqual(split_point(bytearray(b"ab\ncd\nef"), 5), 3)
+        # Hard cuts never split a character or a CRLF pair
+        self.assertEqual(split_point(bytearray("aé".encode("utf-8")), 2), 1)
+        self.assertEqual(split_point(bytearray(b"abc\r\nx"), 4), 3)
+
+    def test_chunks_reassemble_to_the_decoded_file(self):
+        data = ("line é one\r\n" * 50 + "x" * 300 + "\nlast").encode("utf-8")
+        chunks = list(iter_text_chunks(blocks_of(data, 7), 64))
+        self.assertTrue(all(len(text.encode("utf-8")) <= 64 for _, _, text in chunks))
+        self.assertEqual("".join(text for _, _, text in chunks), decode_text(data))
+
+        for byte_offset, line_offset, text in chunks:
+            self.assertTrue(decode_text(data[byte_offset:]).startswith(text))
+            self.assertEqual(line_offset, decode_text(data[:byte_offset]).count("\n"))
+
+    def test_only_the_first_chunk_is_strict(self):
+        with self.assertRaises(UnicodeDecodeError):
+            list(iter_text_chunks([b"\xff" + b"a" * 20], 8))
+        chunks = list(iter_text_chunks([b"a" * 20 + b"\xff"], 8))
+        self.assertEqual(chunks[-1][2], "aaaa�")
+
+
+class TestChunkedRecords(unittest.TestCase):
+    FILES = {
+        "small.py": "x = 1\n",
+        "gen/huge.js": "".join(f"var v{i} = {i};\n" for i in range(2000)),
+        "gen/latin1.txt": b"\xe9" * 5000,
+    }
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.zip_path = Path(self.temp_dir.name) / "repo.zip"
+        self.zip_path.write_bytes(build_zip(self.FILES).getvalue())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def serialize(self, process):
+        out_file = io.BytesIO()
+        with zipfile.ZipFile(self.zip_path) as zip_ref:
+            process(iter_zip_members(zip_ref), JsonlWriter(out_file))
+        return [json.loads(line) for line in out_file.getvalue().splitlines()]
+
+    def test_large_files_become_ordered_chunks(self):
+        records = self.serialize(lambda m, w: write_members(m, w, max_record_size=4096))
+        types = {}
+        for record in records:
+            path = record.get("path") or record["metadata"]["path"]
+            types.setdefault(path, set()).add(record["type"])
+        self.assertEqual(types, {"small.py": {"file"}, "gen/huge.js": {"chunk"},
+                                 "gen/latin1.txt": {"binary"}})
+
+        chunks = [r for r in records if r["type"] == "chunk"]
+        self.assertEqual([c["metadata"]["chunk"] for c in chunks], list(range(len(chunks))))
+        self.assertEqual([c["metadata"]["last"] for c in chunks],
+                         [False] * (len(chunks) - 1) + [True])
+        self.assertEqual("".join(c["content"] for c in chunks), self.FILES["gen/huge.js"])
+        self.assertTrue(all(len(c["content"]) <= 4096 for c in chunks))
+        self.assertEqual(chunks[1]["metadata"]["line_offset"],
+                         chunks[0]["content"].count("\n"))
+
+    def test_parallel_matches_serial(self):
+        serial = self.serialize(lambda m, w: write_members(
+            sorted(m, key=lambda member: member.path), w, max_record_size=4096))
+        parallel = self.serialize(lambda m, w: write_members_parallel(
+            m, w, zip_path=self.zip_path, workers=2, max_record_size=4096))
+        self.assertEqual(parallel, serial)
+
+    def test_incremental_reuses_all_chunks(self):
+        output_file = Path(self.temp_dir.name) / "repo_contents.jsonl"
+
+        def process(members, writer, incremental=None):
+            return write_members(members, writer, incremental, max_record_size=4096)
+
+        outputs = []
+        for _ in range(2):
+            with zipfile.ZipFile(self.zip_path) as zip_ref:
+                write_output(iter_zip_members(zip_ref), output_file, incremental=True,
+                             delta=True, process=process)
+            outputs.append(output_file.read_bytes())
+        self.assertEqual(outputs[0], outputs[1])
+        delta = Path(self.temp_dir.name) / "repo_contents.delta.jsonl"
+        self.assertEqual(delta.read_bytes(), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
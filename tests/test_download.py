@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+
+from src.core.download import DownloadError, StagingArea, iter_resumable
+from src.core.extract_github import spool_archive
+from src.services.http_session import HttpClient, RetryPolicy
+from tests.local_server import LocalServer
+
+ETAG = '"0123456789abcdef0123456789abcdef01234567"'
+
+
+def flaky_archive(data, drop_at, supports_range=True):
+    """Route that drops the first full response after ``drop_at`` bytes."""
+    state = {"dropped": False}
+
+    def route(handler):
+        requested = handler.headers.get("Range")
+        if requested and supports_range and handler.headers.get("If-Range") == ETAG:
+            start = int(requested.split("=")[1].rstrip("-"))
+            handler.send_response(206)
+            handler.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+            body = data[start:]
+        else:
+            handler.send_response(200)
+            body = data
+        handler.send_header("Content-Length", str(len(body)))
+        handler.send_header("ETag", ETAG)
+        if supports_range:
+            handler.send_header("Accept-Ranges", "bytes")
+        handler.end_headers()
+        if not requested and not state["dropped"]:
+            state["dropped"] = True
+            handler.wfile.write(body[:drop_at])
+            handler.wfile.flush()
+            handler.close_connection = True
+            handler.connection.shutdown(2)
+            return
+        handler.wfile.write(body)
+
+    return route
+
+
+class TestResumableDownload(unittest.TestCase):
+    def setUp(self):
+        self.data = os.urandom(200_000)
+        self.client = HttpClient(retry=RetryPolicy(max_retries=0), sleep=lambda _: None)
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.client.close()
+        self.temp_dir.cleanup()
+
+    def test_resumes_dropped_connection_within_run(self):
+        routes = {"/archive.zip": flaky_archive(self.data, drop_at=70_000)}
+        with LocalServer(routes) as server:
+            url = f"{server.url}/archive.zip"
+            response = self.client.get(url, stream=True)
+            body = b"".join(iter_resumable(self.client, url, response))
+            ranges = [headers.get("Range") for _, _, headers in server.requests]
+        self.assertEqual(body, self.data)
+        self.assertEqual(ranges[0], None)
+        self.assertTrue(ranges[1].startswith("bytes="))
+
+    def test_without_range_support_fails_cleanly(self):
+        routes = {"/archive.zip": flaky_archive(self.data, drop_at=70_000, supports_range=False)}
+        with LocalServer(routes) as server:
+            url = f"{server.url}/archive.zip"
+            response = self.client.get(url, stream=True)
+            with self.assertRaises(DownloadError):
+                b"".join(iter_resumable(self.client, url, response))
+
+    def test_staged_partial_is_resumed_by_next_run(self):
+        staging = StagingArea(self.temp_dir.name)
+        routes = {"/archive.tar.gz": flaky_archive(self.data, drop_at=70_000)}
+        with LocalServer(routes) as server:
+            url = f"{server.url}/archive.tar.gz"
+
+            # First run: the connection drops and resuming is not allowed
+            response = self.client.get(url, stream=True, headers=staging.resume_headers(url))
+            with self.assertRaises(DownloadError):
+                staging.download(self.client, url, response, "tar.gz", max_resumes=0)
+
+            # Second run picks up where the first one stopped
+            headers = staging.resume_headers(url)
+            staged = sum(os.path.getsize(os.path.join(self.temp_dir.name, name))
+                         for name in os.listdir(self.temp_dir.name) if name.endswith(".part"))
+            self.assertGreater(staged, 0)
+            self.assertEqual(headers["Range"], f"bytes={staged}-")
+            response = self.client.get(url, stream=True, headers=headers)
+            self.assertEqual(response.status_code, 206)
+            path = staging.download(self.client, url, response, "tar.gz")
+
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_invalid_zip_is_rejected(self):
+        staging = StagingArea(self.temp_dir.name)
+        routes = {"/archive.zip": flaky_archive(self.data, drop_at=len(self.data) + 1)}
+        with LocalServer(routes) as server:
+            url = f"{server.url}/archive.zip"
+            response = self.client.get(url, stream=True)
+            with self.assertRaises(DownloadError):
+                staging.download(self.client, url, response, "zip")
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_spool_archive_rolls_over_to_disk(self):
+        routes = {"/archive.zip": flaky_archive(self.data, drop_at=len(self.data) + 1)}
+        with LocalServer(routes) as server:
+            url = f"{server.url}/archive.zip"
+            small = spool_archive(self.client.get(url, stream=True), url,
+                                  memory_threshold=len(self.data) * 2, client=self.client)
+            large = spool_archive(self.client.get(url, stream=True), url,
+                                  memory_threshold=64 * 1024, client=self.client)
+        with small, large:
+            self.assertFalse(small._rolled)
+            self.assertTrue(large._rolled)
+            self.assertEqual(large.read(), self.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.archive import ArchiveMember
+from src.core.filters import FilterRules, MemberFilter, PathPattern
+from src.extract_github import extract_repo
+from tests.local_server import LocalServer, send_bytes
+from tests.test_archive import build_zip
+
+
+def member(path, size=10):
+    return ArchiveMember(path, size, opener=lambda: (_ for _ in ()).throw(AssertionError(path)))
+
+
+def kept(member_filter, paths):
+    return [path for path in paths if member_filter.accepts(member(path))]
+
+
+class TestPathPattern(unittest.TestCase):
+    def test_unanchored_pattern_matches_at_any_depth(self):
+        pattern = PathPattern.parse("node_modules/")
+        self.assertTrue(pattern.matches("node_modules/dep/index.js"))
+        self.assertTrue(pattern.matches("web/node_modules/dep/index.js"))
+        self.assertFalse(pattern.matches("src/node_modules.py"))
+
+    def test_anchored_and_double_star_patterns(self):
+        self.assertTrue(PathPattern.parse("/docs/*.md").matches("docs/a.md"))
+        self.assertFalse(PathPattern.parse("/docs/*.md").matches("src/docs/a.md"))
+        self.assertFalse(PathPattern.parse("docs/*.md").matches("docs/api/a.md"))
+        self.assertTrue(PathPattern.parse("docs/**/*.md").matches("docs/api/v1/a.md"))
+        self.assertTrue(PathPattern.parse("**/test_*.py").matches("test_a.py"))
+        self.assertTrue(PathPattern.parse("*.min.js").matches("static/app.min.js"))
+
+
+class TestMemberFilter(unittest.TestCase):
+    def test_default_excludes(self):
+        paths = [".env", "api/.env.local", ".git/config", "lib/node_modules/x.js",
+                 ".github/workflows/ci.yml", "src/app.py"]
+        self.assertEqual(kept(MemberFilter(), paths), [".github/workflows/ci.yml", "src/app.py"])
+
+    def test_include_exclude_negation_and_size(self):
+        rules = FilterRules(include=("*.py", "*.md"), exclude=("tests/", "!tests/conftest.py"),
+                            max_file_size=100)
+        member_filter = MemberFilter(rules)
+        paths = ["README.md", "src/app.py", "src/app.js", "tests/test_app.py",
+                 "tests/conftest.py"]
+        self.assertEqual(kept(member_filter, paths),
+                         ["README.md", "src/app.py", "tests/conftest.py"])
+        self.assertFalse(member_filter.accepts(member("src/big.py", size=101)))
+
+    def test_gitattributes_linguist(self):
+        self.assertFalse(MemberFilter().uses_attributes)
+        member_filter = MemberFilter(FilterRules(exclude_vendored=True, exclude_generated=True))
+        member_filter.load_gitattributes(".gitattributes", (
+            b"# comment\n"
+            b"vendor/** linguist-vendored\n"
+            b"*.pb.go linguist-generated=true\n"
+            b"vendor/ours/** -linguist-vendored\n"
+        ))
+        member_filter.load_gitattributes("api/.gitattributes", b"*.pb.go -linguist-generated\n")
+        paths = ["vendor/lib.c", "vendor/ours/lib.c", "proto/a.pb.go", "api/a.pb.go", "main.go"]
+        self.assertEqual(kept(member_filter, paths), ["vendor/ours/lib.c", "api/a.pb.go", "main.go"])
+
+
+class TestExtractWithFilters(unittest.TestCase):
+    FILES = {
+        ".gitattributes": "third_party/** linguist-vendored\n",
+        "src/app.py": "print('hi')\n",
+        "third_party/lib.py": "x = 1\n",
+        "docs/big.md": "#" * 5000,
+    }
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def test_excluded_members_are_never_read(self):
+        archive = build_zip(self.FILES).getvalue()
+        routes = {"/user/sample-repo/archive/HEAD.zip": lambda h: send_bytes(h, archive)}
+        opened = []
+        original_open = zipfile.ZipFile.open
+
+        def tracking_open(zip_ref, name, *args, **kwargs):
+            opened.append(getattr(name, "filename", name))
+            return original_open(zip_ref, name, *args, **kwargs)
+
+        with LocalServer(routes) as server, \
+                patch.object(zipfile.ZipFile, "open", tracking_open):
+            extract_repo(f"{server.url}/user/sample-repo",
+                         filters=FilterRules(max_file_size=1000, exclude_vendored=True))
+
+        output_file = Path("extracted_repos") / "sample-repo_contents.jsonl"
+        records = [json.loads(line) for line in output_file.read_text().splitlines()]
+        self.assertEqual([r["metadata"]["path"] for r in records],
+                         [".gitattributes", "src/app.py"])
+        self.assertFalse([name for name in opened if name.endswith(("lib.py", "big.md"))])
+
+
+if __name__ == "__main__":
+    unittest.main()
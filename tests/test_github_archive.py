@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.services.github_archive import (
+    BranchResolver, archive_url, normalize_repo_url, request_archive,
+)
+from src.services.http_session import HttpClient
+from tests.local_server import LocalServer, send_bytes
+
+
+def redirect_to(location):
+    def route(handler):
+        send_bytes(handler, b"", status=302, headers={"Location": location})
+    return route
+
+
+class TestBranchResolver(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = Path(self.temp_dir.name) / "branches.json"
+        self.client = HttpClient()
+        self.now = 1000.0
+
+    def tearDown(self):
+        self.client.close()
+        self.temp_dir.cleanup()
+
+    def resolver(self):
+        return BranchResolver(self.client, self.cache_file, ttl=60, clock=lambda: self.now)
+
+    def test_normalize_repo_url(self):
+        self.assertEqual(normalize_repo_url("user/repo.git"), "https://github.com/user/repo")
+        self.assertEqual(archive_url("https://github.com/u/r", "dev", "zip"),
+                         "https://github.com/u/r/archive/refs/heads/dev.zip")
+
+    def test_resolves_from_redirect_and_caches_on_disk(self):
+        routes = {"/user/repo/archive/HEAD.zip":
+                  redirect_to("https://codeload.github.com/user/repo/zip/refs/heads/master")}
+        with LocalServer(routes) as server:
+            repo_url = f"{server.url}/user/repo"
+            self.assertEqual(self.resolver().resolve(repo_url), "master")
+            # A fresh resolver (a later run) reads the cache instead of probing
+            self.assertEqual(self.resolver().resolve(repo_url), "master")
+            self.assertEqual(len(server.requests), 1)
+            self.assertEqual(server.requests[0][0], "HEAD")
+
+            self.now += 61
+            self.resolver().resolve(repo_url)
+            self.assertEqual(len(server.requests), 2)
+
+    def test_stale_branch_falls_back_to_head_archive(self):
+        routes = {
+            "/user/repo/archive/HEAD.zip": lambda handler: send_bytes(handler, b"zip"),
+        }
+        with LocalServer(routes) as server:
+            repo_url = f"{server.url}/user/repo"
+            resolver = self.resolver()
+            resolver._load()[repo_url] = {"branch": "old", "resolved_at": self.now}
+
+            response, download_url = request_archive(repo_url, "zip", self.client, resolver)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(download_url.endswith("/archive/HEAD.zip"))
+        self.assertNotIn(repo_url, resolver._load())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import threading
+import unittest
+
+import requests
+
+from src.services.http_session import (
+    HttpClient, RateLimiter, RetryPolicy, auth_headers, github_token, rate_limit_delay
+)
+from tests.local_server import LocalServer, send_bytes
+
+
+def sequence(*responses):
+    """Route that replays (status, headers) pairs, then keeps serving 200."""
+    remaining = list(responses)
+
+    def route(handler):
+        status, headers = remaining.pop(0) if remaining else (200, {})
+        send_bytes(handler, b"ok" if status == 200 else b"", status=status, headers=headers)
+
+    return route
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, delay):
+        with self.lock:
+            self.now += delay
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.delays = []
+        self.client = HttpClient(retry=RetryPolicy(max_retries=3), sleep=self.delays.append)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_retries_server_errors_with_backoff(self):
+        routes = {"/archive": sequence((503, {}), (502, {}))}
+        with LocalServer(routes) as server:
+            response = self.client.get(f"{server.url}/archive")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.delays), 2)
+        self.assertTrue(all(0 <= delay <= 1.0 for delay in self.delays))
+
+    def test_honours_retry_after_on_rate_limit(self):
+        routes = {"/archive": sequence((429, {"Retry-After": "7"}))}
+        with LocalServer(routes) as server:
+            response = self.client.get(f"{server.url}/archive")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.delays, [7.0])
+
+    def test_plain_forbidden_is_not_retried(self):
+        routes = {"/archive": sequence((403, {}))}
+        with LocalServer(routes) as server:
+            response = self.client.get(f"{server.url}/archive")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.delays, [])
+
+    def test_gives_up_after_max_retries(self):
+        routes = {"/archive": sequence(*[(500, {})] * 10)}
+        with LocalServer(routes) as server:
+            response = self.client.get(f"{server.url}/archive")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(len(self.delays), 3)
+
+    def test_connection_errors_are_retried(self):
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.client.get("http://127.0.0.1:1/archive")
+        self.assertEqual(len(self.delays), 3)
+
+    def test_rate_limit_reset_header(self):
+        headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1060"}
+        self.assertEqual(rate_limit_delay(headers, now=1000), 60)
+        headers["X-RateLimit-Remaining"] = "12"
+        self.assertIsNone(rate_limit_delay(headers, now=1000))
+
+    def test_client_updates_its_limiter(self):
+        clock = FakeClock()
+        limiter = RateLimiter(clock=clock, wall_clock=lambda: 1000.0, sleep=clock.sleep)
+        client = HttpClient(rate_limiter=limiter, token="abc")
+        headers = {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": "1100"}
+        routes = {"/archive": sequence((200, headers))}
+        try:
+            with LocalServer(routes) as server:
+                client.get(f"{server.url}/archive")
+                self.assertNotIn("Authorization", server.requests[0][2])
+        finally:
+            client.close()
+        self.assertAlmostEqual(limiter.rate("127.0.0.1"), 0.1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.wall_clock = FakeClock(1000.0)
+        self.limiter = RateLimiter(requests_per_second=10, burst=5, clock=self.clock,
+                                   wall_clock=self.wall_clock, sleep=self.clock.sleep)
+
+    def test_burst_then_steady_rate(self):
+        delays = [self.limiter.reserve() for _ in range(15)]
+        self.assertEqual(delays[:5], [0.0] * 5)
+        self.assertAlmostEqual(delays[-1], 1.0)
+
+    def test_quota_is_spread_until_reset(self):
+        self.limiter.update(200, {"X-RateLimit-Remaining": "100", "X-RateLimit-Reset": "1200"})
+        self.assertAlmostEqual(self.limiter.rate(), 0.5)
+        # Responses without rate-limit headers keep the quota
+        self.limiter.update(404, {})
+        self.assertAlmostEqual(self.limiter.rate(), 0.5)
+        # A fresh quota lifts the cap again
+        self.limiter.update(200, {"X-RateLimit-Remaining": "5000", "X-RateLimit-Reset": "1060"})
+        self.assertEqual(self.limiter.rate(), 10)
+
+    def test_small_quota_is_not_spent_in_one_burst(self):
+        self.limiter.update(200, {"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": "1060"})
+        delays = [self.limiter.reserve() for _ in range(20)]
+        self.assertEqual(delays[:3], [0.0] * 3)
+        # The rest wait for the quota to reset
+        self.assertTrue(all(delay >= 60 for delay in delays[3:]))
+
+    def test_hosts_have_separate_quotas(self):
+        self.limiter.update(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1030"},
+                            host="api.github.com")
+        self.assertAlmostEqual(self.limiter.reserve("api.github.com"), 30.0)
+        self.assertEqual(self.limiter.reserve("github.com"), 0.0)
+
+    def test_exhausted_quota_pauses_every_request(self):
+        self.limiter.update(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1030"})
+        self.assertAlmostEqual(self.limiter.reserve(), 30.0)
+        self.assertAlmostEqual(self.limiter.reserve(), 30.0)
+        self.limiter.update(429, {"Retry-After": "60"})
+        self.assertAlmostEqual(self.limiter.reserve(), 60.0)
+
+    def test_plain_forbidden_does_not_pause(self):
+        self.limiter.update(403, {})
+        self.assertEqual(self.limiter.reserve(), 0.0)
+
+    def test_shared_between_threads(self):
+        def worker():
+            for _ in range(10):
+                self.limiter.acquire()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # 40 requests at 10/s after a burst of 5: the last one waits 3.5 s
+        self.assertGreaterEqual(self.clock.now, 3.5)
+
+
+class TestAuthToken(unittest.TestCase):
+    def test_read_from_environment(self):
+        self.assertEqual(github_token({"GH_TOKEN": "abc"}), "abc")
+        self.assertEqual(github_token({"GITHUB_TOKEN": "first", "GH_TOKEN": "second"}), "first")
+        self.assertIsNone(github_token({"GITHUB_TOKEN": " "}))
+
+    def test_only_sent_to_github(self):
+        self.assertEqual(auth_headers("https://github.com/user/repo/archive/HEAD.zip", "abc"),
+                         {"Authorization": "Bearer abc"})
+        self.assertEqual(auth_headers("http://127.0.0.1:8000/user/repo", "abc"), {})
+        self.assertEqual(auth_headers("https://github.com/user/repo", None), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
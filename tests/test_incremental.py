@@ -0,0 +1,110 @@
+import json
+import tempfile
+import unittest
+import zipfile
+from functools import partial
+from pathlib import Path
+from unittest.mock import patch
+
+from src import extract_github
+from src.core import languages
+from src.core.archive import iter_zip_members
+from src.core.incremental import delta_path, manifest_path
+from src.extract_github import write_members, write_output
+from tests.test_archive import build_zip
+
+
+def run(files, output_file, delta=True, max_record_size=None):
+    process = partial(write_members, max_record_size=max_record_size)
+    with zipfile.ZipFile(build_zip(files)) as zip_ref:
+        write_output(iter_zip_members(zip_ref), output_file, incremental=True, delta=delta,
+                     process=process, record_options={"max_record_size": max_record_size})
+    return [json.loads(line) for line in output_file.read_text(encoding="utf-8").splitlines()]
+
+
+class TestIncremental(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_file = Path(self.temp_dir.name) / "repo_contents.jsonl"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_only_changed_files_are_rebuilt(self):
+        run({"a.py": "a = 1\n", "b.py": "b = 1\n", "c.py": "c = 1\n"}, self.output_file)
+
+        with patch.object(extract_github, "build_record",
+                          wraps=extract_github.build_record) as build:
+            records = run({"a.py": "a = 1\n", "b.py": "b = 2\n", "d.py": "d = 1\n"},
+                          self.output_file)
+
+        self.assertEqual(sorted(call.args[0].path for call in build.call_args_list),
+                         ["b.py", "d.py"])
+        self.assertEqual({r["metadata"]["path"]: r["content"] for r in records},
+                         {"a.py": "a = 1\n", "b.py": "b = 2\n", "d.py": "d = 1\n"})
+
+        changes = [json.loads(line) for line in
+                   delta_path(self.output_file).read_text(encoding="utf-8").splitlines()]
+        self.assertEqual([(c["change"], c["path"]) for c in changes],
+                         [("modified", "b.py"), ("added", "d.py"), ("deleted", "c.py")])
+
+    def test_failed_files_are_not_retried_while_unchanged(self):
+        build_record = extract_github.build_record
+
+        def fail_on_b(member, *args, **kwargs):
+            if member.path == "b.py":
+                raise ValueError("unreadable")
+            return build_record(member, *args, **kwargs)
+
+        files = {"a.py": "a = 1\n", "b.py": "b = 1\n"}
+        with patch.object(extract_github, "build_record", side_effect=fail_on_b):
+            first = run(files, self.output_file)
+        with patch.object(extract_github, "build_record", wraps=build_record) as build:
+            second = run(files, self.output_file)
+        self.assertEqual(build.call_count, 0)
+        self.assertEqual(second, first)
+        self.assertEqual(second[1]["type"], "error")
+
+        # A modified file is tried again
+        second = run({"a.py": "a = 1\n", "b.py": "b = 2\n"}, self.output_file)
+        self.assertEqual(second[1]["content"], "b = 2\n")
+
+    def test_run_without_delta_removes_a_stale_one(self):
+        run({"a.py": "a = 1\n"}, self.output_file)
+        self.assertTrue(delta_path(self.output_file).exists())
+        run({"a.py": "a = 2\n"}, self.output_file, delta=False)
+        self.assertFalse(delta_path(self.output_file).exists())
+
+    def test_full_rewrite_drops_the_manifest(self):
+        run({"a.py": "a = 1\n"}, self.output_file, delta=False)
+        self.assertTrue(manifest_path(self.output_file).exists())
+        with zipfile.ZipFile(build_zip({"a.py": "a = 2\n"})) as zip_ref:
+            write_output(iter_zip_members(zip_ref), self.output_file)
+        self.assertFalse(manifest_path(self.output_file).exists())
+
+    def test_output_edited_since_manifest_triggers_rebuild(self):
+        run({"a.py": "a = 1\n"}, self.output_file)
+        with open(self.output_file, "a", encoding="utf-8") as f:
+            f.write("\n")
+        records = run({"a.py": "a = 1\n"}, self.output_file)
+        self.assertEqual(len(records), 1)
+
+    def test_changed_options_trigger_rebuild(self):
+        files = {"a.py": "".join(f"a{i} = {i}\n" for i in range(20))}
+        self.assertEqual(len(run(files, self.output_file)), 1)
+        records = run(files, self.output_file, max_record_size=64)
+        self.assertGreater(len(records), 1)
+        self.assertTrue(all(r["type"] == "chunk" for r in records))
+
+    def test_changed_language_table_triggers_rebuild(self):
+        run({"a.py": "a = 1\n"}, self.output_file)
+        extensions = dict(languages.EXTENSIONS, **{".py": "snake"})
+        with patch.object(languages, "EXTENSIONS", extensions), \
+                patch.object(extract_github, "build_record",
+                             wraps=extract_github.build_record) as build:
+            run({"a.py": "a = 1\n"}, self.output_file)
+        self.assertEqual(build.call_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
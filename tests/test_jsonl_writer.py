@@ -0,0 +1,77 @@
+import io
+import json
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core import jsonl_writer
+from src.core.archive import iter_zip_members
+from src.core.jsonl_writer import (
+    JsonlWriter, available_serializers, encode_record, get_serializer
+)
+from src.core.records import binary_record, chunk_record, error_record, file_record
+from src.extract_github import write_members, write_members_parallel, write_output
+from tests.test_archive import SAMPLE_FILES, build_zip
+
+RECORDS = [
+    file_record("app.py", "src/app.py", "python", "print('héllo')\n\t\"quoted\"  "),
+    binary_record("logo.png", "assets/logo.png"),
+    error_record("broken.txt", ValueError("bad")),
+    chunk_record("big.js", "gen/big.js", "javascript", "x\n", 3, 4096, 120, True),
+]
+
+
+class TestSerializers(unittest.TestCase):
+    def test_every_available_serializer_round_trips(self):
+        self.assertIn("json", available_serializers())
+        for name in available_serializers():
+            encode = get_serializer(name)
+            for record in RECORDS:
+                line = encode(record)
+                self.assertTrue(line.endswith(b"\n"))
+                self.assertEqual(line.count(b"\n"), 1)
+                self.assertEqual(json.loads(line), record, name)
+
+    def test_default_and_lookup_errors(self):
+        self.assertIs(get_serializer(), encode_record)
+        with self.assertRaises(ValueError):
+            get_serializer("yaml")
+        with patch.dict(jsonl_writer._MODULES, {"orjson": None, "msgspec": None}):
+            self.assertIs(get_serializer("auto"), encode_record)
+            with self.assertRaises(ValueError):
+                get_serializer("orjson")
+
+    def test_writer_uses_its_encoder(self):
+        stream = io.BytesIO()
+        writer = JsonlWriter(stream, encode=lambda record: b"x\n")
+        self.assertEqual(writer.write({"a": 1}), (0, 2))
+        self.assertEqual(stream.getvalue(), b"x\n")
+
+
+@unittest.skipUnless("orjson" in available_serializers(), "orjson is not installed")
+class TestOrjsonOutput(unittest.TestCase):
+    def test_same_records_as_stdlib_serial_and_parallel(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            zip_path = Path(temp_dir) / "repo.zip"
+            zip_path.write_bytes(build_zip(SAMPLE_FILES).getvalue())
+            outputs = {}
+            for name, process in (
+                ("json", write_members),
+                ("orjson", write_members),
+                ("orjson-parallel", lambda m, w, i=None: write_members_parallel(
+                    m, w, i, zip_path=zip_path, workers=2, order="completion")),
+            ):
+                output_file = Path(temp_dir) / f"{name}.jsonl"
+                with zipfile.ZipFile(zip_path) as zip_ref:
+                    write_output(iter_zip_members(zip_ref), output_file, process=process,
+                                 serializer=name.split("-")[0])
+                outputs[name] = sorted(map(json.loads, output_file.read_text().splitlines()),
+                                       key=json.dumps)
+        self.assertEqual(outputs["orjson"], outputs["json"])
+        self.assertEqual(outputs["orjson-parallel"], outputs["json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
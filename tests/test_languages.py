@@ -0,0 +1,60 @@
+import unittest
+
+from src.core.archive import ArchiveMember
+from src.core.languages import (
+    EXTENSIONS, detect_language, language_from_content, language_from_path
+)
+from src.extract_github import build_record, get_file_language
+
+
+class TestLanguages(unittest.TestCase):
+    def test_previous_mappings_are_unchanged(self):
+        previous = {
+            '.py': 'python', '.js': 'javascript', '.jsx': 'javascript', '.ts': 'typescript',
+            '.tsx': 'typescript', '.html': 'html', '.css': 'css', '.md': 'markdown',
+            '.json': 'json', '.yml': 'yaml', '.yaml': 'yaml', '.sh': 'bash', '.bash': 'bash',
+            '.sql': 'sql', '.txt': 'text',
+        }
+        for extension, language in previous.items():
+            self.assertEqual(get_file_language(f"dir/file{extension.upper()}"), language)
+        self.assertEqual(get_file_language("no_extension"), "text")
+        self.assertGreater(len(EXTENSIONS), 200)
+
+    def test_names_and_extensions(self):
+        cases = {
+            "src/main.rs": "rust", "cmd/server/main.go": "go", "lib/a.hpp": "cpp",
+            "Main.java": "java", "Dockerfile": "dockerfile", "docker/Dockerfile.dev": "dockerfile",
+            "Makefile": "makefile", "CMakeLists.txt": "cmake", "Gemfile": "ruby",
+            ".bashrc": "bash", ".env": None, "archive.tar.gz": None, "data/weights.mat": None,
+        }
+        for path, language in cases.items():
+            self.assertEqual(language_from_path(path), language, path)
+
+    def test_shebangs_and_modelines(self):
+        cases = {
+            b"#!/usr/bin/env python3\nprint()\n": "python",
+            b"#!/usr/bin/env -S node --harmony\n": "javascript",
+            b"#! /bin/sh -e\n": "bash",
+            b"#!/usr/local/bin/ruby2.7\n": "ruby",
+            b"#!/opt/custom/interpreter\n": None,
+            b"line\n# vim: set ts=4 ft=perl :\n": "perl",
+            b"/* -*- mode: c++; indent-tabs-mode: nil -*- */\n": "cpp",
+            b"# -*- coding: utf-8 -*-\n": None,
+            b"\n\n\n\n\n\n# vim: ft=python\n": None,
+            b"": None,
+        }
+        for prefix, language in cases.items():
+            self.assertEqual(language_from_content(prefix), language, prefix)
+
+    def test_content_is_only_used_for_unknown_names(self):
+        self.assertEqual(detect_language("bin/deploy", b"#!/bin/bash\n"), "bash")
+        self.assertEqual(detect_language("setup.py", b"#!/bin/bash\n"), "python")
+        self.assertEqual(detect_language("bin/deploy"), "text")
+
+        data = b"#!/usr/bin/env python\nprint('hi')\n"
+        member = ArchiveMember("scripts/run", len(data), opener=None)
+        self.assertEqual(build_record(member, data)["metadata"]["language"], "python")
+
+
+if __name__ == "__main__":
+    unittest.main()
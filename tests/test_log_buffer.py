@@ -0,0 +1,46 @@
+import threading
+import unittest
+
+from src.core.log_buffer import LogBuffer
+
+
+class TestLogBuffer(unittest.TestCase):
+    def test_drains_complete_lines(self):
+        buffer = LogBuffer()
+        print("\n🔄 Starting", file=buffer)
+        buffer.write("partial")
+        self.assertEqual(buffer.drain(), ("\n🔄 Starting", 0))
+        self.assertEqual(buffer.drain(), ("", 0))
+        buffer.write(" line\n")
+        self.assertEqual(buffer.drain(), ("partial line", 0))
+
+    def test_keeps_only_the_newest_lines(self):
+        buffer = LogBuffer(max_lines=100)
+        for i in range(1000):
+            print(f"line {i}", file=buffer)
+        text, dropped = buffer.drain()
+        lines = text.split("\n")
+        self.assertEqual(len(lines), 100)
+        self.assertEqual(lines[-1], "line 999")
+        self.assertEqual(dropped, 900)
+
+    def test_concurrent_writers(self):
+        buffer = LogBuffer(max_lines=10_000)
+
+        def write(name):
+            for i in range(1000):
+                buffer.write(f"{name} {i}\n")
+
+        threads = [threading.Thread(target=write, args=(f"job{n}",)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        text, dropped = buffer.drain()
+        self.assertEqual(dropped, 0)
+        self.assertEqual(sorted(text.split("\n")),
+                         sorted(f"job{n} {i}" for n in range(4) for i in range(1000)))
+
+
+if __name__ == "__main__":
+    unittest.main()
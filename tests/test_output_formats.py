@@ -0,0 +1,113 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core import output_formats
+from src.core.archive import iter_zip_members
+from src.core.output_formats import (
+    check_export_format, compression_of, export_columnar, open_jsonl, record_row
+)
+from src.core.records import binary_record, chunk_record, file_record
+from src.extract_github import write_output
+from tests.test_archive import SAMPLE_FILES, build_zip
+
+
+class TestOutputFormats(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.zip_path = Path(self.temp_dir.name) / "repo.zip"
+        self.zip_path.write_bytes(build_zip(SAMPLE_FILES).getvalue())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, **kwargs):
+        output_file = Path(self.temp_dir.name) / name
+        with zipfile.ZipFile(self.zip_path) as zip_ref:
+            write_output(iter_zip_members(zip_ref), output_file, **kwargs)
+        return output_file
+
+    def test_gzip_output_matches_plain_output(self):
+        plain = self.write("repo_contents.jsonl")
+        compressed = self.write("repo_contents.jsonl.gz", compression="gzip")
+        self.assertEqual(compression_of(compressed), "gzip")
+        self.assertEqual(gzip.decompress(compressed.read_bytes()), plain.read_bytes())
+        with open_jsonl(compressed) as source:
+            self.assertEqual(source.read(), plain.read_bytes())
+
+    @unittest.skipIf(output_formats.zstandard is None, "zstandard is not installed")
+    def test_zstd_output_matches_plain_output(self):
+        plain = self.write("repo_contents.jsonl")
+        compressed = self.write("repo_contents.jsonl.zst", compression="zstd")
+        with open_jsonl(compressed) as source:
+            self.assertEqual(source.read(), plain.read_bytes())
+
+    def test_stream_targets(self):
+        plain = self.write("repo_contents.jsonl").read_bytes()
+        stream = io.BytesIO()
+        with zipfile.ZipFile(self.zip_path) as zip_ref:
+            write_output(iter_zip_members(zip_ref), stream)
+        self.assertEqual(stream.getvalue(), plain)
+        self.assertFalse(stream.closed)
+
+        with zipfile.ZipFile(self.zip_path) as zip_ref, \
+                open(Path(self.temp_dir.name) / "fd.jsonl.gz", "w+b") as f:
+            write_output(iter_zip_members(zip_ref), f.fileno(), compression="gzip")
+            # The descriptor is left open for the caller
+            f.seek(0)
+            self.assertEqual(gzip.decompress(f.read()), plain)
+            os.fstat(f.fileno())
+
+        with self.assertRaises(ValueError):
+            with zipfile.ZipFile(self.zip_path) as zip_ref:
+                write_output(iter_zip_members(zip_ref), io.BytesIO(), incremental=True)
+
+    def test_unsupported_combinations(self):
+        with self.assertRaises(ValueError):
+            self.write("repo_contents.jsonl.gz", compression="gzip", incremental=True)
+        with self.assertRaises(ValueError):
+            self.write("repo_contents.jsonl.bz2", compression="bzip2")
+        with patch.object(output_formats, "pyarrow", None):
+            with self.assertRaises(ValueError):
+                check_export_format("parquet")
+        with patch.object(output_formats, "zstandard", None):
+            with self.assertRaises(ValueError):
+                self.write("repo_contents.jsonl.zst", compression="zstd")
+
+    def test_record_rows(self):
+        self.assertEqual(record_row(file_record("a.py", "src/a.py", "python", "é\n")), {
+            "path": "src/a.py", "type": "file", "language": "python", "size": 3,
+            "content": "é\n", "chunk": None, "byte_offset": None,
+        })
+        self.assertEqual(record_row(binary_record("a.png", "a.png"))["size"], None)
+        row = record_row(chunk_record("b.js", "b.js", "javascript", "x", 2, 10, 1, True))
+        self.assertEqual((row["chunk"], row["byte_offset"]), (2, 10))
+
+    @unittest.skipIf(output_formats.pyarrow is None, "pyarrow is not installed")
+    def test_columnar_exports(self):
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        source = self.write("repo_contents.jsonl.gz", compression="gzip")
+        expected = [record_row(json.loads(line))
+                    for line in gzip.decompress(source.read_bytes()).splitlines()]
+        parquet_path = Path(self.temp_dir.name) / "repo.parquet"
+        self.assertEqual(export_columnar(source, parquet_path, "parquet", batch_rows=2),
+                         len(expected))
+        table = pyarrow.parquet.read_table(parquet_path, columns=["path", "language"])
+        self.assertEqual(table.column("path").to_pylist(), [r["path"] for r in expected])
+
+        arrow_path = Path(self.temp_dir.name) / "repo.arrow"
+        export_columnar(source, arrow_path, "arrow")
+        with pyarrow.ipc.open_file(arrow_path) as reader:
+            self.assertEqual(reader.read_all().to_pylist(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
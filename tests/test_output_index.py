@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from src.core.archive import iter_zip_members
+from src.core.output_index import (
+    IndexBuilder, OutputReader, build_index, index_path, iter_spans
+)
+from src.extract_github import extract_repo, write_members, write_output
+from tests.local_server import LocalServer, send_bytes
+from tests.test_archive import build_zip
+
+FILES = {
+    "README.md": "# Sample\n",
+    "src/app.py": "print('hi')\n",
+    "src/lib/util.py": "x = 1\n",
+    "src/lib/util.js": "var x;\n",
+    "src/weird\tname\n.py": "y = 2\n",
+    "srcs/other.py": "z = 3\n",
+    "assets/logo.png": b"\x89PNG\r\n\x1a\n\x00",
+    "gen/huge.js": "".join(f"var v{i};\n" for i in range(600)),
+}
+
+
+class TestOutputIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        zip_path = Path(self.temp_dir.name) / "repo.zip"
+        zip_path.write_bytes(build_zip(FILES).getvalue())
+        self.zip_path = zip_path
+        self.output_file = Path(self.temp_dir.name) / "repo_contents.jsonl"
+        self.index = self.write()
+        self.assertEqual(build_index(self.output_file, self.index.entries), len(FILES))
+
+    def write(self, incremental=False):
+        def process(members, writer, incremental=None):
+            return write_members(members, writer, incremental, max_record_size=1024)
+
+        index = IndexBuilder()
+        with zipfile.ZipFile(self.zip_path) as zip_ref:
+            write_output(iter_zip_members(zip_ref), self.output_file, incremental=incremental,
+                         process=process, index=index)
+        return index
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_spans_cover_the_output(self):
+        spans = list(iter_spans(self.output_file))
+        self.assertEqual(sum(span.length for span in spans), self.output_file.stat().st_size)
+        self.assertEqual({span.path for span in spans}, set(FILES))
+
+    def test_spans_collected_while_writing_match_a_scan(self):
+        self.assertEqual(self.index.entries, list(iter_spans(self.output_file)))
+        # Records copied from the previous output by an incremental update
+        self.write(incremental=True)
+        index = self.write(incremental=True)
+        self.assertEqual(index.entries, list(iter_spans(self.output_file)))
+
+    def test_lookup(self):
+        with OutputReader(self.output_file) as reader:
+            self.assertEqual(reader.content("src/lib/util.py"), "x = 1\n")
+            self.assertEqual(reader.content("src/weird\tname\n.py"), "y = 2\n")
+            self.assertEqual(reader.content("gen/huge.js"), FILES["gen/huge.js"])
+            self.assertGreater(len(reader.records("gen/huge.js")), 1)
+            self.assertEqual(reader.get("src/app.py").language, "python")
+            self.assertEqual(reader.get("assets/logo.png").type, "binary")
+            self.assertIsNone(reader.content("assets/logo.png"))
+            self.assertIsNone(reader.get("src"))
+            self.assertIsNone(reader.get("zzz"))
+            self.assertEqual(reader.records("missing.py"), [])
+
+    def test_query(self):
+        with OutputReader(self.output_file) as reader:
+            self.assertEqual([e.path for e in reader.query("src/")],
+                             ["src/app.py", "src/lib/util.js", "src/lib/util.py",
+                              "src/weird\tname\n.py"])
+            self.assertEqual([e.path for e in reader.query("src/", language="python")],
+                             ["src/app.py", "src/lib/util.py", "src/weird\tname\n.py"])
+            self.assertEqual([e.path for e in reader.query(language="javascript")],
+                             ["gen/huge.js", "src/lib/util.js"])
+            self.assertEqual(len(list(reader.query())), len(FILES))
+
+    def test_stale_index_is_rejected(self):
+        with open(self.output_file, "ab") as f:
+            f.write(json.dumps({"type": "error", "path": "x"}).encode() + b"\n")
+        with self.assertRaises(ValueError):
+            OutputReader(self.output_file)
+        index_path(self.output_file).unlink()
+        with self.assertRaises(OSError):
+            OutputReader(self.output_file)
+
+
+class TestExtractWritesIndex(unittest.TestCase):
+    def test_extract_repo_writes_index(self):
+        archive = build_zip(FILES).getvalue()
+        routes = {"/user/sample-repo/archive/HEAD.zip": lambda h: send_bytes(h, archive)}
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as temp_dir, LocalServer(routes) as server:
+            os.chdir(temp_dir)
+            try:
+                extract_repo(f"{server.url}/user/sample-repo", serializer="auto")
+                with OutputReader("extracted_repos/sample-repo_contents.jsonl") as reader:
+                    self.assertEqual(reader.content("srcs/other.py"), "z = 3\n")
+            finally:
+                os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    unittest.main()
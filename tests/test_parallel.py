@@ -0,0 +1,70 @@
+import io
+import json
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from src.core.archive import iter_zip_members
+from src.core.filters import MemberFilter
+from src.core.jsonl_writer import JsonlWriter
+from src.extract_github import write_members, write_members_parallel, write_output
+from tests.test_archive import SAMPLE_FILES, build_zip
+
+
+class TestParallel(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.zip_path = Path(self.temp_dir.name) / "repo.zip"
+        files = dict(SAMPLE_FILES)
+        files.update({f"pkg/module{i:03}.py": f"value = {i}\n" for i in range(200, 0, -1)})
+        self.zip_path.write_bytes(build_zip(files).getvalue())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def serialize(self, process):
+        out_file = io.BytesIO()
+        with zipfile.ZipFile(self.zip_path) as zip_ref:
+            process(iter_zip_members(zip_ref), JsonlWriter(out_file))
+        return out_file.getvalue().splitlines()
+
+    def test_sorted_order_matches_sorted_serial_output(self):
+        def serial(members, writer):
+            return write_members(sorted(members, key=lambda m: m.path), writer)
+
+        def parallel(members, writer):
+            return write_members_parallel(members, writer, zip_path=self.zip_path, workers=3)
+
+        self.assertEqual(self.serialize(parallel), self.serialize(serial))
+
+    def test_completion_order_has_the_same_records(self):
+        def parallel(members, writer):
+            return write_members_parallel(members, writer, zip_path=self.zip_path,
+                                          workers=3, order="completion")
+
+        def serial(members, writer):
+            return write_members(members, writer)
+
+        self.assertEqual(sorted(self.serialize(parallel)), sorted(self.serialize(serial)))
+
+    def test_incremental_reuse_keeps_sorted_order(self):
+        output_file = Path(self.temp_dir.name) / "repo_contents.jsonl"
+
+        def parallel(members, writer, incremental=None):
+            return write_members_parallel(members, writer, incremental,
+                                          zip_path=self.zip_path, workers=2)
+
+        for _ in range(2):
+            with zipfile.ZipFile(self.zip_path) as zip_ref:
+                write_output(MemberFilter().apply(iter_zip_members(zip_ref)), output_file,
+                             incremental=True,
+                             process=parallel)
+        paths = [record.get("path") or record["metadata"]["path"]
+                 for record in map(json.loads, output_file.read_text().splitlines())]
+        self.assertEqual(paths, sorted(paths))
+        self.assertEqual(len(paths), 203)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import contextlib
+import io
+import json
+import os
+import tarfile
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from src.core.pipeline import DownloadPipe
+from src.extract_github import extract_repo, get_file_language
+from tests.local_server import LocalServer, send_bytes
+
+
+def build_tar_gz(files, root="sample-repo-HEAD"):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar_ref:
+        for path, data in files.items():
+            info = tarfile.TarInfo(f"{root}/{path}")
+            info.size = len(data)
+            tar_ref.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class TestDownloadPipe(unittest.TestCase):
+    def test_reads_across_chunks(self):
+        with DownloadPipe(iter([b"abc", b"", b"defg", b"h"])) as pipe:
+            self.assertEqual(pipe.read(2), b"ab")
+            self.assertEqual(pipe.read(4), b"cdef")
+            self.assertEqual(pipe.read(), b"gh")
+            self.assertEqual(pipe.read(1), b"")
+
+    def test_propagates_download_errors(self):
+        def chunks():
+            yield b"abc"
+            raise ConnectionError("reset")
+
+        with DownloadPipe(chunks()) as pipe:
+            with self.assertRaises(ConnectionError):
+                pipe.read()
+
+
+class TestTarEngine(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.temp_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.temp_dir.cleanup()
+
+    def test_records_emitted_while_downloading(self):
+        # Incompressible padding after the first file keeps the throttled
+        # transfer running well after the first entry has been written.
+        files = {"README.md": b"# Sample\n", "data/blob.bin": os.urandom(64 * 1024)}
+        archive = build_tar_gz(files)
+        output_file = Path("extracted_repos") / "sample-repo_contents.jsonl"
+        seen = {}
+
+        def serve(handler):
+            send_bytes(handler, archive, chunk_size=4096, delay=0.02)
+            seen["finished"] = time.monotonic()
+
+        def detect_language(path, prefix=None):
+            seen.setdefault("first_record", time.monotonic())
+            return get_file_language(path, prefix)
+
+        routes = {"/user/sample-repo/archive/HEAD.tar.gz": serve}
+        with LocalServer(routes) as server, \
+                patch("src.extract_github.get_file_language", side_effect=detect_language):
+            extract_repo(f"{server.url}/user/sample-repo", engine="tar")
+            # The reader stops at the tar end marker, so the server may still
+            # be sending the gzip trailer
+            deadline = time.monotonic() + 2
+            while "finished" not in seen and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        records = [json.loads(line) for line in output_file.read_text().splitlines()]
+        self.assertEqual([r.get("path") or r["metadata"]["path"] for r in records],
+                         ["README.md", "data/blob.bin"])
+        self.assertLess(seen["first_record"], seen["finished"] - 0.1)
+
+    def test_streams_records_to_a_pipe(self):
+        archive = build_tar_gz({"README.md": b"# Sample\n", "src/app.py": b"x = 1\n"})
+        routes = {"/user/sample-repo/archive/HEAD.tar.gz": lambda h: send_bytes(h, archive)}
+        read_fd, write_fd = os.pipe()
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with LocalServer(routes) as server, os.fdopen(read_fd, "rb") as reader:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                ok = extract_repo(f"{server.url}/user/sample-repo", engine="tar",
+                                  output=write_fd)
+            os.close(write_fd)
+            records = [json.loads(line) for line in reader.read().splitlines()]
+
+        self.assertTrue(ok)
+        self.assertEqual([r["metadata"]["path"] for r in records], ["README.md", "src/app.py"])
+        # Progress goes to stderr and no output file is written
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertIn("Extraction complete", stderr.getvalue())
+        self.assertFalse(Path("extracted_repos").exists())
+
+    def test_streaming_rejects_file_only_options(self):
+        with self.assertRaises(ValueError):
+            extract_repo("user/sample-repo", output=io.BytesIO(), incremental=True)
+        with self.assertRaises(ValueError):
+            extract_repo("user/sample-repo", output=io.BytesIO(), export="parquet")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import io
+import unittest
+import zipfile
+
+from src.core.archive import iter_zip_members
+from src.core.jsonl_writer import JsonlWriter
+from src.core.progress import ConsoleProgress, ProgressReporter, describe_event
+from src.extract_github import write_members
+from tests.test_archive import SAMPLE_FILES, build_zip
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestProgressReporter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.events = []
+        self.reporter = ProgressReporter(self.events.append, interval=0.1, clock=self.clock)
+
+    def test_updates_are_throttled(self):
+        self.reporter.start_download(100_000)
+        for _ in range(1000):
+            self.clock.now += 0.001
+            self.reporter.add_bytes(100)
+        # One event for the phase change, then one per 0.1 s of the 1 s download
+        self.assertLessEqual(len(self.events), 11)
+        self.assertEqual(self.reporter.snapshot().downloaded, 100_000)
+
+    def test_phase_changes_are_reported_immediately(self):
+        self.reporter.start_download()
+        self.reporter.start_processing()
+        self.reporter.add_file()
+        self.reporter.finish()
+        self.assertEqual([event.phase for event in self.events],
+                         ["downloading", "processing", "done"])
+        self.assertEqual(self.events[-1].files, 1)
+        with self.assertRaises(ValueError):
+            self.reporter.set_phase("unpacking")
+
+    def test_rate_and_eta(self):
+        self.reporter.start_download(1000)
+        self.clock.now = 2.0
+        self.reporter.add_bytes(500)
+        event = self.events[-1]
+        self.assertEqual(event.rate, 250)
+        self.assertEqual(event.eta, 2)
+        self.assertEqual(event.percent, 50)
+        self.assertEqual(describe_event(event),
+                         "Downloading: 50.0% of 1000 B (250 B/s, ETA 2s)")
+
+    def test_unknown_size(self):
+        self.reporter.start_download(None)
+        self.clock.now = 1.0
+        self.reporter.add_bytes(2048)
+        self.assertIsNone(self.events[-1].percent)
+        self.assertIsNone(self.events[-1].eta)
+        self.assertEqual(describe_event(self.events[-1]), "Downloading: 2.0 KB (2.0 KB/s)")
+
+    def test_console_redraws_one_line_per_phase(self):
+        stream = io.StringIO()
+        self.reporter.subscribe(ConsoleProgress(stream))
+        self.reporter.start_download(1000)
+        self.clock.now = 1.0
+        self.reporter.add_bytes(1000)
+        self.reporter.start_processing()
+        self.reporter.finish()
+        lines = stream.getvalue().split("\n")
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith("\rDownloading: 0.0%"))
+        self.assertIn("\rDownloading: 100.0%", lines[0])
+        self.assertTrue(lines[2].startswith("\rDone: 0 files"))
+
+    def test_write_members_counts_every_file(self):
+        self.reporter.start_processing()
+        with zipfile.ZipFile(build_zip(SAMPLE_FILES)) as zip_ref:
+            count = write_members(iter_zip_members(zip_ref), JsonlWriter(io.BytesIO()),
+                                  progress=self.reporter)
+        self.assertEqual(self.reporter.files, count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import io
+import json
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from src.core.archive import ArchiveMember, iter_zip_members
+from src.core.binary_detection import SNIFF_SIZE
+from src.core.extract_github import analyze_repository
+from src.core.jsonl_writer import JsonlWriter, encode_record
+from src.core.records import file_record
+from src.core.stats import (
+    RepositoryStats, count_encoded_lines, scan_member, stats_from_jsonl
+)
+from src.extract_github import write_members, write_members_parallel, write_output
+from tests.test_archive import build_zip
+
+FILES = {
+    "README.md": "# Sample\n\nText\n",
+    "src/app.py": "import os\nprint(os.sep)\n",
+    "src/pkg/deep/mod.py": "x = '\\\\n'\n",
+    "web/app.js": "".join(f"var v{i};\n" for i in range(300)),
+    "assets/logo.png": b"\x89PNG\r\n\x1a\n\x00\n\n",
+}
+
+
+class TestRepositoryStats(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.zip_path = Path(self.temp_dir.name) / "repo.zip"
+        self.zip_path.write_bytes(build_zip(FILES).getvalue())
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def inline(self, process, incremental=False):
+        stats = RepositoryStats()
+        output_file = Path(self.temp_dir.name) / "repo_contents.jsonl"
+        with zipfile.ZipFile(self.zip_path) as zip_ref:
+            write_output(iter_zip_members(zip_ref), output_file, incremental=incremental,
+                         process=lambda m, w, i=None: process(m, w, i, stats=stats))
+        return stats.result(), output_file
+
+    def test_result(self):
+        result = analyze_repository(str(self.zip_path))
+        self.assertEqual(result["files_count"], 5)
+        self.assertEqual(result["size"], sum(len(v) for v in FILES.values()))
+        self.assertEqual(result["lines"], 3 + 2 + 1 + 300)
+        self.assertEqual(result["languages"], ["javascript", "python", "markdown"])
+        self.assertEqual(result["by_language"]["python"], {"files": 2, "bytes": 34, "lines": 3})
+        self.assertEqual(result["by_type"], {"file": 4, "binary": 1})
+        self.assertEqual(result["largest_files"][0]["path"], "web/app.js")
+        self.assertEqual(result["directories"]["src"]["files"], 2)
+        self.assertEqual(result["directories"]["src/pkg"]["files"], 1)
+        self.assertNotIn("src/pkg/deep", result["directories"])
+        self.assertEqual(result["directories"]["."]["files"], 1)
+
+    def test_all_sources_agree(self):
+        expected = analyze_repository(str(self.zip_path))
+        serial, output_file = self.inline(
+            lambda m, w, i, stats: write_members(m, w, i, max_record_size=512, stats=stats))
+        self.assertEqual(serial, expected)
+        self.assertEqual(analyze_repository(str(output_file))["by_language"],
+                         expected["by_language"])
+
+        parallel, _ = self.inline(lambda m, w, i, stats: write_members_parallel(
+            m, w, i, zip_path=self.zip_path, workers=2, max_record_size=512, stats=stats))
+        self.assertEqual(parallel, expected)
+
+        extracted = Path(self.temp_dir.name) / "extracted"
+        with zipfile.ZipFile(self.zip_path) as zip_ref:
+            zip_ref.extractall(extracted)
+        self.assertEqual(analyze_repository(str(extracted / "sample-repo-main")), expected)
+
+    def test_sources_classify_and_count_like_the_extractor(self):
+        files = {
+            "crlf.txt": b"one\r\ntwo\r\n",
+            "cr.txt": b"one\rtwo\rthree",
+            "late.log": b"x\n" * 4500 + b"\xff",
+            "u.py": "s = 'é'\n".encode("utf-8"),
+        }
+        zip_path = Path(self.temp_dir.name) / "mixed.zip"
+        zip_path.write_bytes(build_zip(files).getvalue())
+        from_zip = analyze_repository(str(zip_path))
+        self.assertEqual(from_zip["size"], sum(len(data) for data in files.values()))
+        self.assertEqual(from_zip["lines"], 2 + 2 + 1)
+        self.assertEqual(from_zip["by_type"], {"file": 3, "binary": 1})
+
+        extracted = Path(self.temp_dir.name) / "mixed"
+        with zipfile.ZipFile(zip_path) as zip_ref:
+            zip_ref.extractall(extracted)
+        self.assertEqual(analyze_repository(str(extracted / "sample-repo-main")), from_zip)
+
+        stats = RepositoryStats()
+        output_file = Path(self.temp_dir.name) / "mixed_contents.jsonl"
+        with zipfile.ZipFile(zip_path) as zip_ref:
+            write_output(iter_zip_members(zip_ref), output_file,
+                         process=lambda m, w, i=None: write_members(m, w, i, stats=stats))
+        self.assertEqual(stats.result(), from_zip)
+        self.assertEqual(analyze_repository(str(output_file)), from_zip)
+
+    def test_crlf_split_between_blocks_is_one_line(self):
+        content = b"a" * (SNIFF_SIZE - 1) + b"\r\nb\r"
+        member = ArchiveMember("split.txt", len(content), opener=lambda: io.BytesIO(content))
+        self.assertEqual(scan_member(member), ("file", "text", 2))
+
+    def test_incremental_reuse_is_counted(self):
+        process = lambda m, w, i, stats: write_members(m, w, i, stats=stats)  # noqa: E731
+        first, _ = self.inline(process, incremental=True)
+        second, _ = self.inline(process, incremental=True)
+        self.assertEqual(first, second)
+
+    def test_encoded_line_count(self):
+        for content in ["", "a\nb\n", "a\\nb", "\\\n", "\n\n\n", 'q"\\\\n"\n']:
+            line = encode_record(file_record("a\nb", "x/a\nb", "text", content))
+            self.assertEqual(count_encoded_lines(line), content.count("\n"), content)
+
+    def test_bounded_top_files(self):
+        stats = RepositoryStats(top_files=3)
+        for i in range(1000):
+            stats.add(f"d{i % 7}/f{i}", i, "file", "python", 1)
+        result = stats.result()
+        self.assertEqual([f["size"] for f in result["largest_files"]], [999, 998, 997])
+        self.assertEqual(len(result["directories"]), 7)
+
+    def test_jsonl_chunks_count_as_one_file(self):
+        out_file = io.BytesIO()
+        with zipfile.ZipFile(self.zip_path) as zip_ref:
+            write_members(iter_zip_members(zip_ref), JsonlWriter(out_file), max_record_size=256)
+        records = [json.loads(line) for line in out_file.getvalue().splitlines()]
+        self.assertGreater(sum(r["type"] == "chunk" for r in records), 1)
+        result = stats_from_jsonl(io.BytesIO(out_file.getvalue())).result()
+        self.assertEqual(result["files_count"], 5)
+        self.assertEqual(result["by_language"]["javascript"]["lines"], 300)
+
+
+if __name__ == "__main__":
+    unittest.main()